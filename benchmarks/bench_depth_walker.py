@@ -0,0 +1,47 @@
+"""
+Compares the Decimal depth walker in utils with the NumPy BookSideArrays backend.
+
+Run from the repository root:
+    python benchmarks/bench_depth_walker.py
+"""
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from utils import get_base_amount_for_quote_volume  # noqa: E402
+from vectorized_order_book_analyzer import BookSideArrays  # noqa: E402
+
+from synthetic_books import make_ask_entries  # noqa: E402
+
+LEVELS = (20, 500, 5000)
+
+def bench(levels: int, number: int = 200):
+    entries = make_ask_entries(levels)
+    # Query half of the book's notional so the Decimal loop walks half of the levels.
+    quote_volume = sum(price * amount for price, amount in entries) / 2
+    arrays = BookSideArrays.from_entries(entries)
+    quote_volume_float = float(quote_volume)
+
+    decimal_time = timeit.timeit(lambda: get_base_amount_for_quote_volume(entries, quote_volume), number=number)
+    build_time = timeit.timeit(lambda: BookSideArrays.from_entries(entries), number=number)
+    query_time = timeit.timeit(lambda: arrays.base_for_quote_volume(quote_volume_float), number=number)
+    return {
+        "levels": levels,
+        "decimal_us": decimal_time / number * 1e6,
+        "numpy_build_us": build_time / number * 1e6,
+        "numpy_query_us": query_time / number * 1e6,
+    }
+
+def main():
+    print(f"{'levels':>8} {'decimal loop':>14} {'numpy build':>14} {'numpy query':>14} {'speedup':>9}")
+    for levels in LEVELS:
+        result = bench(levels)
+        speedup = result["decimal_us"] / result["numpy_query_us"]
+        print(f"{levels:>8} {result['decimal_us']:>12.1f}us {result['numpy_build_us']:>12.1f}us "
+              f"{result['numpy_query_us']:>12.1f}us {speedup:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
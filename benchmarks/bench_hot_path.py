@@ -0,0 +1,141 @@
+"""
+Times the strategy hot path on synthetic order books at several depths and saves the results as JSON.
+
+Run from the repository root:
+    python benchmarks/bench_hot_path.py --output benchmarks/results/$(git rev-parse --short HEAD).json
+    python benchmarks/compare.py baseline.json current.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from decimal import Decimal
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import numpy  # noqa: E402
+from hummingbot.core.data_type.common import TradeType  # noqa: E402
+
+from backtest import BacktestStrategy  # noqa: E402
+from config import TriangularArbitrageConfig  # noqa: E402
+from order_book_analyzer import DefaultOrderBookAnalyzer  # noqa: E402
+from utils import get_base_amount_for_quote_volume  # noqa: E402
+
+from synthetic_books import make_order_book_rows, make_triangle_connector  # noqa: E402
+
+DEPTHS = (20, 200, 2000)
+
+def make_strategy(levels: int, **config_overrides) -> BacktestStrategy:
+    # A threshold no route reaches, so on_tick evaluates both directions without trading.
+    config = TriangularArbitrageConfig(connector_name="simulated", first_pair="ADA-USDT", second_pair="ADA-BTC",
+                                       third_pair="BTC-USDT", holding_asset="USDT",
+                                       min_profitability=Decimal("100"), order_amount_in_holding_asset=Decimal("20"),
+                                       **config_overrides)
+    strategy = BacktestStrategy(config, make_triangle_connector(levels))
+    strategy.on_tick()
+    return strategy
+
+def touch_book(strategy: BacktestStrategy) -> Callable[[], None]:
+    """
+    :return: A callable that rewrites the best ADA-USDT ask with a new update id, so every call sees a
+             changed book like a live tick would
+    """
+    book = strategy.connector.get_order_book("ADA-USDT")
+    price, amount, _ = book.ask_entries()[0]
+    update_ids = iter(range(2, 1 << 62))
+    return lambda: book.apply_diff(True, price, amount, next(update_ids))
+
+def hot_path_cases(levels: int) -> Dict[str, Callable[[], object]]:
+    rows = make_order_book_rows(levels)
+    quote_volume = Decimal(str(sum(row.price * row.amount for row in rows) / 2))
+
+    # The prefilter would prune every route at this threshold, so the full path is timed without it.
+    strategy = make_strategy(levels, top_of_book_filter_enabled=False)
+    prefiltered_strategy = make_strategy(levels)
+    analyzer = DefaultOrderBookAnalyzer(strategy.connector)
+    pairs, sides = strategy.trading_pair["direct"], strategy.order_side["direct"]
+    order_amount = strategy.config.order_amount_in_holding_asset
+    touch = touch_book(strategy)
+    touch_prefiltered = touch_book(prefiltered_strategy)
+
+    def on_tick():
+        touch()
+        strategy.on_tick()
+
+    def find_arbitrage_opportunity():
+        touch()
+        strategy.book_version_cache.start_tick()
+        return strategy.find_arbitrage_opportunity()
+
+    def find_arbitrage_opportunity_prefiltered():
+        touch_prefiltered()
+        prefiltered_strategy.book_version_cache.start_tick()
+        return prefiltered_strategy.find_arbitrage_opportunity()
+
+    return {
+        "get_base_amount_for_quote_volume": lambda: get_base_amount_for_quote_volume(rows, quote_volume),
+        "get_order_amount_from_exchanged_amount":
+            lambda: analyzer.get_order_amount_from_exchanged_amount("ADA-USDT", TradeType.BUY, order_amount),
+        "calculate_profit": lambda: strategy.calculate_profit(pairs, sides),
+        "find_arbitrage_opportunity": find_arbitrage_opportunity,
+        "find_arbitrage_opportunity_prefiltered": find_arbitrage_opportunity_prefiltered,
+        "on_tick": on_tick,
+    }
+
+def time_case(func: Callable[[], object], repeat: int, min_time: float) -> Dict[str, float]:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    runs = [elapsed / number * 1e6 for elapsed in timer.repeat(repeat=repeat, number=number)]
+    runs.sort()
+    return {"min_us": runs[0], "median_us": runs[len(runs) // 2], "number": number, "repeat": repeat}
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def run(depths=DEPTHS, repeat: int = 5, min_time: float = 0.2, selected=None) -> Dict[str, object]:
+    results = {}
+    for levels in depths:
+        for name, func in hot_path_cases(levels).items():
+            if selected and name not in selected:
+                continue
+            results[f"{name}[depth={levels}]"] = time_case(func, repeat, min_time)
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "results": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the strategy hot path on synthetic order books.")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--depth", type=int, action="append", help="Book depth to benchmark, repeatable")
+    parser.add_argument("--case", action="append", help="Only run the named benchmark, repeatable")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Approximate seconds per repetition")
+    args = parser.parse_args()
+
+    report = run(args.depth or DEPTHS, args.repeat, args.min_time, args.case)
+    for name, result in report["results"].items():
+        print(f"{name:<55} {result['min_us']:>12.2f}us  (median {result['median_us']:.2f}us)")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+if __name__ == "__main__":
+    main()
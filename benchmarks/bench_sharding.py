@@ -0,0 +1,60 @@
+"""
+Measures sharded triangle evaluation throughput for a growing number of worker processes.
+Every round rewrites all books, publishes them to shared memory and evaluates every triangle,
+so the workers re-derive each book side like on a busy live tick.
+
+Run from the repository root:
+    python benchmarks/bench_sharding.py --triangles 200 --workers 1,2,4,8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from sharded_evaluation import ShardedEvaluator  # noqa: E402
+from triangle_discovery import TriangleDiscovery  # noqa: E402
+
+from synthetic_books import make_star_connector  # noqa: E402
+
+def bench(triangle_count: int, workers: int, levels: int, rounds: int) -> float:
+    """
+    :return: Triangles evaluated per second of evaluate() time
+    """
+    connector = make_star_connector(triangle_count, levels)
+    triangles = TriangleDiscovery("USDT").discover(connector.trading_pairs)
+    evaluator = ShardedEvaluator(triangles, workers, depth=levels)
+    evaluator.start()
+    try:
+        books = [connector.get_order_book(pair) for pair in evaluator.trading_pairs]
+        best_asks = [book.ask_entries()[0] for book in books]
+        evaluation_time = 0.0
+        for update_id in range(2, rounds + 2):
+            for book, (price, amount, _) in zip(books, best_asks):
+                book.apply_diff(True, price, amount, update_id)
+            evaluator.publish_books(connector)
+            started = time.perf_counter()
+            evaluator.evaluate(20.0, 100.0)
+            evaluation_time += time.perf_counter() - started
+        return len(triangles) * rounds / evaluation_time
+    finally:
+        evaluator.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--triangles", type=int, default=200)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--levels", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"CPUs: {os.cpu_count()}, triangles: {args.triangles}, levels: {args.levels}")
+    baseline = None
+    for workers in (int(value) for value in args.workers.split(",")):
+        throughput = bench(args.triangles, workers, args.levels, args.rounds)
+        baseline = baseline or throughput
+        print(f"{workers:>3} workers: {throughput:>12,.0f} triangles/s  speedup {throughput / baseline:.2f}x")
+
+if __name__ == "__main__":
+    main()
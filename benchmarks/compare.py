@@ -0,0 +1,51 @@
+"""
+Compares two bench_hot_path.py result files and exits with status 1 when any benchmark got slower
+than the threshold allows.
+
+    python benchmarks/compare.py baseline.json current.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+def load_results(path: str) -> Dict[str, Dict[str, float]]:
+    with open(path) as file:
+        return json.load(file)["results"]
+
+def compare(baseline: Dict[str, Dict[str, float]], current: Dict[str, Dict[str, float]], threshold: float,
+            metric: str = "min_us") -> Tuple[List[Tuple[str, float, float, float]], List[str]]:
+    """
+    :return: (name, baseline, current, relative change) for every benchmark in both files, and the names
+             of the benchmarks whose relative slowdown exceeds threshold
+    """
+    rows, regressions = [], []
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name][metric], current[name][metric]
+        change = after / before - 1 if before else 0.0
+        rows.append((name, before, after, change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail on benchmark regressions between two result files.")
+    parser.add_argument("baseline", help="Results of the reference commit")
+    parser.add_argument("current", help="Results of the commit under test")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Allowed relative slowdown, 0.1 = 10%%")
+    parser.add_argument("--metric", default="min_us", choices=("min_us", "median_us"), help="Timing to compare")
+    args = parser.parse_args()
+
+    baseline, current = load_results(args.baseline), load_results(args.current)
+    rows, regressions = compare(baseline, current, args.threshold, args.metric)
+    for name, before, after, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<55} {before:>12.2f}us -> {after:>12.2f}us {change:>+8.1%}{flag}")
+    for name in sorted(set(baseline) ^ set(current)):
+        print(f"{name:<55} only in {'baseline' if name in baseline else 'current'}")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the {args.threshold:.0%} threshold.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Seeded synthetic order books for the benchmarks. Every generator is deterministic for a given seed,
+so results from different commits are measured on identical books.
+"""
+import random
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from hummingbot.core.data_type.order_book_row import OrderBookRow
+
+from simulated_connector import SimulatedConnector
+
+# Mid prices of a triangle that is slightly unprofitable in both directions after fees.
+TRIANGLE_MIDS = {"ADA-USDT": 0.5, "ADA-BTC": 0.00001, "BTC-USDT": 50000.0}
+TRIANGLE_BASE_SIZES = {"ADA-USDT": 500.0, "ADA-BTC": 500.0, "BTC-USDT": 0.01}
+
+def make_ask_entries(levels: int, seed: int = 42) -> List[Tuple[Decimal, Decimal]]:
+    rng = random.Random(seed)
+    price = Decimal("100")
+    entries = []
+    for _ in range(levels):
+        price += Decimal(str(round(rng.uniform(0.01, 0.1), 2)))
+        entries.append((price, Decimal(str(round(rng.uniform(0.01, 2), 4)))))
+    return entries
+
+def make_book_side(mid: float, base_size: float, levels: int, is_ask: bool, seed: int) -> List[Tuple[float, float]]:
+    """
+    :return: levels (price, amount) pairs moving away from mid by 1-5 bps per level, best price first
+    """
+    rng = random.Random(seed)
+    direction = 1 if is_ask else -1
+    price = mid * (1 + direction * 0.0005)
+    side = []
+    for _ in range(levels):
+        # Exchanges publish levels on the tick and step grid; the simulated default for both is 1e-8.
+        side.append((round(price, 8), round(base_size * rng.uniform(0.2, 2.0), 8)))
+        price *= 1 + direction * rng.uniform(0.0001, 0.0005)
+    return side
+
+def make_order_book_rows(levels: int, seed: int = 42) -> List[OrderBookRow]:
+    """
+    Ask entries in the shape live connectors return them.
+    """
+    return [OrderBookRow(price, amount, 1) for price, amount in
+            make_book_side(TRIANGLE_MIDS["ADA-USDT"], TRIANGLE_BASE_SIZES["ADA-USDT"], levels, True, seed)]
+
+def make_triangle_connector(levels: int, seed: int = 42,
+                            balances: Dict[str, Decimal] = None) -> SimulatedConnector:
+    connector = SimulatedConnector(list(TRIANGLE_MIDS), balances or {"USDT": Decimal("10000")})
+    for index, (pair, mid) in enumerate(TRIANGLE_MIDS.items()):
+        base_size = TRIANGLE_BASE_SIZES[pair]
+        bids = make_book_side(mid, base_size, levels, False, seed + 2 * index)
+        asks = make_book_side(mid, base_size, levels, True, seed + 2 * index + 1)
+        connector.get_order_book(pair).apply_snapshot(bids, asks, 1)
+    return connector
+
+def make_star_connector(assets: int, levels: int, seed: int = 42) -> SimulatedConnector:
+    """
+    :return: A connector with BTC-USDT and an X-USDT and X-BTC pair for each of assets synthetic assets,
+             i.e. one triangle through USDT per asset
+    """
+    pairs = {"BTC-USDT": (TRIANGLE_MIDS["BTC-USDT"], TRIANGLE_BASE_SIZES["BTC-USDT"])}
+    for index in range(assets):
+        pairs[f"A{index}-USDT"] = (TRIANGLE_MIDS["ADA-USDT"], TRIANGLE_BASE_SIZES["ADA-USDT"])
+        pairs[f"A{index}-BTC"] = (TRIANGLE_MIDS["ADA-BTC"], TRIANGLE_BASE_SIZES["ADA-BTC"])
+    connector = SimulatedConnector(list(pairs), {"USDT": Decimal("10000")})
+    for index, (pair, (mid, base_size)) in enumerate(pairs.items()):
+        bids = make_book_side(mid, base_size, levels, False, seed + 2 * index)
+        asks = make_book_side(mid, base_size, levels, True, seed + 2 * index + 1)
+        connector.get_order_book(pair).apply_snapshot(bids, asks, 1)
+    return connector
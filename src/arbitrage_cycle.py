@@ -0,0 +1,189 @@
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional, Set, Tuple
+
+from hummingbot.core.data_type.order_candidate import OrderCandidate
+
+from route import Route
+
+class ArbitrageCycle:
+    """
+    Tracks the orders of one arbitrage cycle. Orders are keyed by order id and mapped to the leg they
+    belong to, so completion and failure events can be matched without relying on a single active order.
+    Several cycles can be in flight at once; each one reserves the balances its legs spend from the
+    strategy's inventory until those legs complete.
+    """
+    def __init__(self, direction: str, candidates: List[OrderCandidate], concurrent: bool = False,
+                 route: Optional[Route] = None, timestamp: float = 0.0):
+        self.direction = direction
+        self.candidates = candidates
+        self.concurrent = concurrent
+        self.route = route
+        # Next leg to place in sequential mode.
+        self.next_leg: int = 0
+        # Leg index -> (asset, amount) the leg spends from balances held before the cycle started.
+        self.reservations: Dict[int, Tuple[str, Decimal]] = {}
+        # Deadlines use the strategy clock, latency uses perf_counter.
+        self.started_timestamp = timestamp
+        self.placed_at: Dict[str, float] = {}
+        self.leg_by_order_id: Dict[str, int] = {}
+        self.open_order_ids: Set[str] = set()
+        self.completed_legs: Set[int] = set()
+        self.unwind_order_ids: Set[str] = set()
+        self.failed: bool = False
+        self.started_at: float = time.perf_counter()
+        self.completed_at: Optional[float] = None
+        # Balance changes of the cycle's fills, unwind orders included.
+        self.asset_deltas: Dict[str, Decimal] = {}
+        self.spent_amounts: Dict[str, Decimal] = {}
+        # Set once a deadline passed; the cycle is then recovered instead of continued leg by leg.
+        self.timed_out_at: Optional[float] = None
+        self.recovery_action: str = ""
+        self.recovery_deadline: float = 0.0
+
+    def add_order(self, order_id: str, leg_index: int, timestamp: float = 0.0):
+        self.leg_by_order_id[order_id] = leg_index
+        self.open_order_ids.add(order_id)
+        self.placed_at[order_id] = timestamp
+
+    def add_unwind_order(self, order_id: str, timestamp: float = 0.0):
+        self.unwind_order_ids.add(order_id)
+        self.placed_at[order_id] = timestamp
+
+    def reserve(self, leg_index: int, asset: str, amount: Decimal):
+        self.reservations[leg_index] = (asset, amount)
+
+    def get_committed(self, asset: str) -> Decimal:
+        """
+        :return: The balance of the asset other cycles must leave alone: what the cycle's legs that have not
+                 completed yet will spend from inventory, plus what its fills gave it so far
+        """
+        committed = sum((amount for leg_index, (reserved_asset, amount) in self.reservations.items()
+                         if reserved_asset == asset and leg_index not in self.completed_legs), Decimal("0"))
+        return committed + max(self.asset_deltas.get(asset, Decimal("0")), Decimal("0"))
+
+    @property
+    def open_pairs(self) -> Set[str]:
+        """
+        :return: The pairs of the legs that have not completed; their books do not reflect these legs yet
+        """
+        return {candidate.trading_pair for leg_index, candidate in enumerate(self.candidates)
+                if leg_index not in self.completed_legs}
+
+    @property
+    def order_ids(self) -> Set[str]:
+        return set(self.placed_at)
+
+    def get_deadline(self, leg_timeout: float, cycle_timeout: float) -> float:
+        """
+        :return: The timestamp at which the oldest open leg or the whole cycle times out, inf if neither can
+        """
+        deadline = self.started_timestamp + cycle_timeout if cycle_timeout > 0 else float("inf")
+        if leg_timeout > 0 and self.open_order_ids:
+            deadline = min(deadline, min(self.placed_at[order_id] for order_id in self.open_order_ids) + leg_timeout)
+        return deadline
+
+    def owns(self, order_id: str) -> bool:
+        return order_id in self.leg_by_order_id or order_id in self.unwind_order_ids
+
+    def mark_completed(self, order_id: str) -> Optional[int]:
+        """
+        :return: The leg index of the completed order, or None for unwind orders
+        """
+        if order_id in self.unwind_order_ids:
+            self.unwind_order_ids.discard(order_id)
+            return None
+        self.open_order_ids.discard(order_id)
+        leg_index = self.leg_by_order_id[order_id]
+        self.completed_legs.add(leg_index)
+        if self.is_complete:
+            self.completed_at = time.perf_counter()
+        return leg_index
+
+    def record_fill(self, deltas: Dict[str, Decimal]):
+        for asset, delta in deltas.items():
+            self.asset_deltas[asset] = self.asset_deltas.get(asset, Decimal("0")) + delta
+            if delta < 0:
+                self.spent_amounts[asset] = self.spent_amounts.get(asset, Decimal("0")) - delta
+
+    def mark_failed(self, order_id: str):
+        self.open_order_ids.discard(order_id)
+        self.unwind_order_ids.discard(order_id)
+        self.failed = True
+
+    @property
+    def is_complete(self) -> bool:
+        return len(self.completed_legs) == len(self.candidates)
+
+    @property
+    def timed_out(self) -> bool:
+        return self.timed_out_at is not None
+
+    @property
+    def is_settled(self) -> bool:
+        return not self.open_order_ids and not self.unwind_order_ids
+
+    @property
+    def latency(self) -> float:
+        return (self.completed_at or time.perf_counter()) - self.started_at
+
+class LatencyStats:
+    """
+    Running count, mean, max and last value of a latency in seconds.
+    """
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.last: float = 0.0
+
+    def record(self, value: float):
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def format(self) -> str:
+        return (f"n={self.count} mean={self.mean * 1000:.1f}ms max={self.max * 1000:.1f}ms "
+                f"last={self.last * 1000:.1f}ms")
+
+class StateTimer:
+    """
+    Time the strategy spent in each status and how often it entered it, from the strategy clock.
+    """
+    __slots__ = ("state", "entered_at", "totals", "entries")
+
+    def __init__(self):
+        self.state: Optional[str] = None
+        self.entered_at: float = 0.0
+        self.totals: Dict[str, float] = {}
+        self.entries: Dict[str, int] = {}
+
+    def enter(self, state: str, timestamp: float):
+        if state == self.state:
+            return
+        if self.state is not None:
+            self.totals[self.state] = self.get_total(self.state, timestamp)
+        self.state = state
+        self.entered_at = timestamp
+        self.entries[state] = self.entries.get(state, 0) + 1
+
+    def get_total(self, state: str, timestamp: float) -> float:
+        """
+        :return: The seconds spent in the state, including the current stay
+        """
+        total = self.totals.get(state, 0.0)
+        if state == self.state and timestamp > self.entered_at:
+            total += timestamp - self.entered_at
+        return total
+
+    def format(self, timestamp: float) -> str:
+        return ", ".join(f"{state} {self.get_total(state, timestamp):.1f}s ({count}x)"
+                         for state, count in self.entries.items())
@@ -0,0 +1,156 @@
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Marks a repeated record, e.g. the per-tick profit line, that may be dropped when the queue is full.
+# Records without it are always written. LogSampler.log sets it.
+SAMPLED = {"sampled": True}
+
+def is_sampled(record: logging.LogRecord) -> bool:
+    return getattr(record, "sampled", False)
+
+def get_effective_handlers(logger: logging.Logger) -> List[logging.Handler]:
+    """
+    :return: The handlers a record of the logger reaches through propagation
+    """
+    handlers: List[logging.Handler] = []
+    current: Optional[logging.Logger] = logger
+    while current is not None:
+        handlers.extend(handler for handler in current.handlers if handler not in handlers)
+        if not current.propagate:
+            break
+        current = current.parent
+    if not handlers and logging.lastResort is not None:
+        handlers.append(logging.lastResort)
+    return handlers
+
+class LogSampler:
+    """
+    Rate limits repeated messages per template: a message is logged once every `every` calls and at most
+    once per `interval` seconds, and the next one logged reports how many were suppressed. The check
+    runs before the logging call, so suppressed messages do not create a record.
+    """
+    def __init__(self, interval: float = 0.0, every: int = 1, clock: Callable[[], float] = time.monotonic):
+        self.interval = interval
+        self.every = max(every, 1)
+        self.clock = clock
+        self.suppressed: int = 0
+        # Template -> [time the template was last logged, calls suppressed since]
+        self._state: Dict[str, List[float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0 or self.every > 1
+
+    def sample(self, key: str) -> Optional[int]:
+        """
+        :return: None if the message is suppressed, else the number of calls suppressed since it was last logged
+        """
+        if not self.enabled:
+            return 0
+        now = self.clock()
+        state = self._state.get(key)
+        if state is None:
+            self._state[key] = [now, 0]
+            return 0
+        if state[1] + 1 < self.every or now - state[0] < self.interval:
+            state[1] += 1
+            self.suppressed += 1
+            return None
+        suppressed = int(state[1])
+        state[0], state[1] = now, 0
+        return suppressed
+
+    def log(self, logger: logging.Logger, level: int, msg: str, *args):
+        """
+        Logs a repeated message with %-style arguments as a sampled record.
+        """
+        if not logger.isEnabledFor(level):
+            return
+        suppressed = self.sample(msg)
+        if suppressed is None:
+            return
+        if suppressed:
+            msg, args = f"{msg} (%d similar suppressed)", (*args, suppressed)
+        logger.log(level, msg, *args, extra=SAMPLED, stacklevel=2)
+
+class AsyncLogHandler(QueueHandler):
+    """
+    Hands records to the writer thread unformatted, so message formatting and I/O leave the strategy thread.
+    Sampled records are dropped when the queue is full; every other record waits for space, so order
+    and failure logs are never lost. Log arguments must not be mutated after the call.
+    """
+    def __init__(self, queue_size: int = 10000):
+        super().__init__(queue.Queue(queue_size))
+        self.enqueued: int = 0
+        self.dropped: int = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Tracebacks are rendered now, while their frames still exist.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if is_sampled(record):
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+                return
+        else:
+            self.queue.put(record)
+        self.enqueued += 1
+
+class _BlockingQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        # The queue is bounded; the base class would raise instead of waiting when it is full.
+        self.queue.put(self._sentinel)
+
+class AsyncLogging:
+    """
+    Moves the output of the given loggers to a background writer thread. While started, the loggers
+    log to an AsyncLogHandler and stop propagating; a QueueListener passes their records to the handlers
+    they propagated to before, respecting the handlers' levels.
+    """
+    def __init__(self, loggers: Iterable[logging.Logger], queue_size: int = 10000):
+        self.loggers = list(loggers)
+        self.handler = AsyncLogHandler(queue_size)
+        self._propagate: Dict[logging.Logger, bool] = {}
+        self._listener: Optional[QueueListener] = None
+
+    def start(self):
+        if self._listener is not None:
+            return
+        handlers: List[logging.Handler] = []
+        for logger in self.loggers:
+            handlers.extend(handler for handler in get_effective_handlers(logger) if handler not in handlers)
+        self._listener = _BlockingQueueListener(self.handler.queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        for logger in self.loggers:
+            self._propagate[logger] = logger.propagate
+            logger.propagate = False
+            logger.addHandler(self.handler)
+
+    def stop(self):
+        """
+        Restores the loggers and writes the records still queued.
+        """
+        if self._listener is None:
+            return
+        for logger in self.loggers:
+            logger.removeHandler(self.handler)
+            logger.propagate = self._propagate.pop(logger, True)
+        self._listener.stop()
+        self._listener = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self.handler.queue.qsize()
+
+    def format(self) -> str:
+        return (f"{self.handler.enqueued} records queued, {self.handler.dropped} dropped, "
+                f"{self.queue_depth} waiting")
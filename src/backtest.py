@@ -0,0 +1,206 @@
+import argparse
+import dataclasses
+import itertools
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+from hummingbot.connector.trading_rule import TradingRule
+from hummingbot.core.data_type.common import OrderType
+
+from book_recording import open_recording
+from config import TriangularArbitrageConfig
+from main import EnhancedTriangularArbitrage
+from simulated_connector import SimulatedConnector
+
+if TYPE_CHECKING:
+    from load_test import LoadTestResult
+
+class BacktestStrategy(EnhancedTriangularArbitrage):
+    """
+    EnhancedTriangularArbitrage wired to a SimulatedConnector and the backtest clock instead of a live market.
+    Opportunity detection, order placement and event handling run the unmodified strategy code.
+    """
+    def __init__(self, config: TriangularArbitrageConfig, connector: SimulatedConnector):
+        self._simulated_connector = connector
+        self._backtest_timestamp: float = 0.0
+        super().__init__(config)
+        connector.add_listener(self)
+
+    @property
+    def connectors(self) -> Dict[str, SimulatedConnector]:
+        return {self.config.connector_name: self._simulated_connector}
+
+    @property
+    def current_timestamp(self) -> float:
+        return self._backtest_timestamp
+
+    def set_timestamp(self, timestamp: float):
+        self._backtest_timestamp = timestamp
+
+    def _add_markets(self, markets):
+        pass
+
+    def buy(self, connector_name: str, trading_pair: str, amount: Decimal, order_type: OrderType, price: Decimal) -> str:
+        return self.connectors[connector_name].buy(trading_pair, amount, order_type, price)
+
+    def sell(self, connector_name: str, trading_pair: str, amount: Decimal, order_type: OrderType, price: Decimal) -> str:
+        return self.connectors[connector_name].sell(trading_pair, amount, order_type, price)
+
+    def cancel(self, connector_name: str, order_id: str):
+        self.connectors[connector_name].cancel_order(order_id)
+
+@dataclass
+class BacktestResult:
+    params: Dict[str, Any]
+    ticks: int = 0
+    records: int = 0
+    cycles: int = 0
+    filled_orders: int = 0
+    failed_orders: int = 0
+    start_balance: Decimal = Decimal("0")
+    end_balance: Decimal = Decimal("0")
+    final_balances: Dict[str, Decimal] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def profit(self) -> Decimal:
+        return self.end_balance - self.start_balance
+
+    @property
+    def profit_pct(self) -> Decimal:
+        return self.profit / self.start_balance * 100 if self.start_balance else Decimal("0")
+
+class Backtester:
+    """
+    Replays a BookRecording into a SimulatedConnector and drives BacktestStrategy with a fixed tick interval.
+    Records are streamed from the memory-mapped file, so memory use does not grow with the recording.
+    """
+    def __init__(self, config: TriangularArbitrageConfig, recording_path: str, balances: Dict[str, Decimal],
+                 tick_interval: float = 1.0, fee_percent: Decimal = Decimal("0.001"),
+                 trading_rules: Optional[Dict[str, TradingRule]] = None, order_latency: float = 0.0,
+                 params: Optional[Dict[str, Any]] = None):
+        self.config = config
+        self.recording_path = recording_path
+        self.balances = balances
+        self.tick_interval = tick_interval
+        self.fee_percent = fee_percent
+        self.trading_rules = trading_rules
+        self.order_latency = order_latency
+        self.params = params or {}
+
+    def run(self) -> BacktestResult:
+        started = time.perf_counter()
+        recording = open_recording(self.recording_path)
+        connector = SimulatedConnector(recording.trading_pairs, self.balances, self.fee_percent,
+                                       self.trading_rules, self.order_latency)
+        strategy = BacktestStrategy(self.config, connector)
+        result = BacktestResult(self.params, start_balance=connector.get_balance(self.config.holding_asset))
+        if len(recording) == 0:
+            return result
+
+        timestamps = recording.records["timestamp"]
+        timestamp, end = float(timestamps[0]), float(timestamps[-1])
+        index = 0
+        while timestamp <= end:
+            next_index = recording.index_at(timestamp)
+            if next_index > index:
+                connector.apply_records(recording.records[index:next_index], recording.trading_pairs)
+                index = next_index
+            strategy.set_timestamp(timestamp)
+            connector.process_orders(timestamp)
+            strategy.on_tick()
+            connector.process_orders(timestamp)
+            result.ticks += 1
+            timestamp += self.tick_interval
+        # Let the cycle in flight at the end of the recording finish without starting new ones.
+        while connector.has_pending_orders:
+            strategy.set_timestamp(timestamp)
+            connector.process_orders(timestamp)
+            timestamp += self.tick_interval
+
+        result.records = index
+        collect_results(result, strategy, connector)
+        result.final_balances = dict(connector.balances)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+def collect_results(result: Union[BacktestResult, "LoadTestResult"], strategy: BacktestStrategy,
+                    connector: SimulatedConnector):
+    """
+    Copies the cycle and order counts and the holding balance at the end of a simulated run into its result.
+    """
+    result.cycles = sum(latency.count for latency in strategy.cycle_latency.values())
+    result.filled_orders = connector.filled_orders
+    result.failed_orders = connector.failed_orders
+    result.end_balance = connector.get_balance(strategy.config.holding_asset)
+
+def add_exchange_arguments(parser: argparse.ArgumentParser, latency: float):
+    """
+    Adds the starting balances and the fee and order latency of the simulated exchange to a command line.
+    """
+    parser.add_argument("--balance", action="append", default=[], help="Starting balance as ASSET=AMOUNT")
+    parser.add_argument("--fee", type=Decimal, default=Decimal("0.001"), help="Simulated taker fee")
+    parser.add_argument("--latency", type=float, default=latency, help="Simulated order latency in seconds")
+
+def parse_balances(entries: List[str]) -> Dict[str, Decimal]:
+    return {asset: Decimal(amount) for asset, amount in (entry.split("=") for entry in entries)}
+
+def run_backtest(backtester: Backtester) -> BacktestResult:
+    return backtester.run()
+
+def sweep(config: TriangularArbitrageConfig, recording_path: str, balances: Dict[str, Decimal],
+          grid: Dict[str, List[Any]], max_workers: Optional[int] = None, **backtest_kwargs) -> List[BacktestResult]:
+    """
+    Runs one backtest per combination of the config values in grid, spread across worker processes.
+
+    :param grid: Config field name -> values to try, e.g. {"min_profitability": [Decimal("0.2"), Decimal("0.5")]}
+    :return: One result per combination, in grid order
+    """
+    names = sorted(grid)
+    backtesters = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        backtesters.append(Backtester(dataclasses.replace(config, **params), recording_path, balances,
+                                      params=params, **backtest_kwargs))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_backtest, backtesters))
+
+def parse_config_value(config: TriangularArbitrageConfig, name: str, value: str) -> Any:
+    current = getattr(config, name)
+    if isinstance(current, bool):
+        return value.lower() == "true"
+    return type(current)(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an order book recording through EnhancedTriangularArbitrage.")
+    parser.add_argument("recording", help="Path of the order book recording")
+    parser.add_argument("--tick", type=float, default=1.0, help="Tick interval in seconds")
+    add_exchange_arguments(parser, latency=0.0)
+    parser.add_argument("--grid", action="append", default=[], help="Parameter sweep as FIELD=VALUE1,VALUE2,...")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for parameter sweeps")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    config = TriangularArbitrageConfig()
+    balances = parse_balances(args.balance)
+    grid = {}
+    for entry in args.grid:
+        name, values = entry.split("=")
+        grid[name] = [parse_config_value(config, name, value) for value in values.split(",")]
+    backtest_kwargs = {"tick_interval": args.tick, "fee_percent": args.fee, "order_latency": args.latency}
+
+    if grid:
+        results = sweep(config, args.recording, balances, grid, args.workers, **backtest_kwargs)
+    else:
+        results = [Backtester(config, args.recording, balances, **backtest_kwargs).run()]
+    for result in results:
+        print(f"{result.params or 'config'}: cycles={result.cycles} failed_orders={result.failed_orders} "
+              f"profit={result.profit} {config.holding_asset} ({result.profit_pct:.4f}%) "
+              f"records={result.records} ticks={result.ticks} elapsed={result.elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import logging
+from decimal import Decimal
+from typing import Dict, Iterable, Set
+
+from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot.core.data_type.common import TradeType
+from hummingbot.core.data_type.trade_fee import AddedToCostTradeFee
+from hummingbot.core.event.events import OrderFilledEvent
+
+from utils import split_trading_pair
+
+def fill_deltas(event: OrderFilledEvent) -> Dict[str, Decimal]:
+    """
+    :return: The change of each asset's balance caused by the fill, fees included
+    """
+    base, quote = split_trading_pair(event.trading_pair)
+    notional = event.amount * event.price
+    is_buy = event.trade_type == TradeType.BUY
+    deltas = {base: event.amount, quote: -notional} if is_buy else {base: -event.amount, quote: notional}
+
+    fee = event.trade_fee
+    if fee is not None and fee.percent:
+        spent, received = (quote, base) if is_buy else (base, quote)
+        # Percent fees are added to the cost or deducted from the returns unless a fee token is given.
+        token = fee.percent_token or (spent if isinstance(fee, AddedToCostTradeFee) else received)
+        if token == base:
+            deltas[base] -= event.amount * fee.percent
+        elif token == quote:
+            deltas[quote] -= notional * fee.percent
+        # Fees in a third token (e.g. BNB on Binance) are picked up by the next reconciliation.
+    for flat_fee in getattr(fee, "flat_fees", ()):
+        deltas[flat_fee.token] = deltas.get(flat_fee.token, Decimal("0")) - flat_fee.amount
+    return deltas
+
+class BalanceLedger:
+    """
+    In-memory available balances, updated from the strategy's fills instead of polling the connector.
+    Reads are a dict lookup. Every reconcile_interval seconds the tracked assets are read from the
+    connector once and differences, e.g. from deposits or trades outside the strategy, are adopted
+    and counted as drift.
+    """
+    def __init__(self, connector: ConnectorBase, reconcile_interval: float = 60.0):
+        self.connector = connector
+        self.reconcile_interval = reconcile_interval
+        self.logger = logging.getLogger(__name__)
+        self.balances: Dict[str, Decimal] = {}
+        self.assets: Set[str] = set()
+        self.fills: int = 0
+        self.reconciliations: int = 0
+        self.drift_corrections: int = 0
+        self.last_drift: Dict[str, Decimal] = {}
+        self._last_reconcile: float = 0.0
+
+    def track(self, assets: Iterable[str]):
+        self.assets.update(assets)
+
+    def get_available_balance(self, asset: str) -> Decimal:
+        balance = self.balances.get(asset)
+        if balance is None:
+            self.assets.add(asset)
+            balance = self.balances[asset] = self.connector.get_available_balance(asset)
+        return balance
+
+    def apply_fill(self, event: OrderFilledEvent) -> Dict[str, Decimal]:
+        """
+        :return: The balance change of each asset, see fill_deltas
+        """
+        deltas = fill_deltas(event)
+        for asset, delta in deltas.items():
+            self.balances[asset] = self.get_available_balance(asset) + delta
+        self.fills += 1
+        return deltas
+
+    def reconcile(self, timestamp: float) -> Dict[str, Decimal]:
+        """
+        Replaces the ledger balances with the connector's.
+
+        :return: The connector balance minus the ledger balance of each asset that differed
+        """
+        drift = {}
+        for asset in self.assets:
+            actual = self.connector.get_available_balance(asset)
+            expected = self.balances.get(asset)
+            if expected is not None and actual != expected:
+                drift[asset] = actual - expected
+            self.balances[asset] = actual
+        self._last_reconcile = timestamp
+        self.reconciliations += 1
+        if drift:
+            self.drift_corrections += 1
+            self.last_drift = drift
+            self.logger.info(f"Balance ledger reconciled with drift: "
+                             f"{', '.join(f'{asset} {amount:+}' for asset, amount in sorted(drift.items()))}")
+        return drift
+
+    def is_reconcile_due(self, timestamp: float) -> bool:
+        return timestamp - self._last_reconcile >= self.reconcile_interval
+
+    def maybe_reconcile(self, timestamp: float):
+        if self.is_reconcile_due(timestamp):
+            self.reconcile(timestamp)
+
+    def format(self) -> str:
+        return (f"{self.fills} fills, {self.reconciliations} reconciliations, "
+                f"{self.drift_corrections} with drift")
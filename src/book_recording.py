@@ -0,0 +1,131 @@
+import json
+import os
+import struct
+from typing import BinaryIO, Iterator, List, Optional
+
+import numpy as np
+
+MAGIC = b"TRIARBR1"
+HEADER_ALIGNMENT = 64
+
+SIDE_BID = 0
+SIDE_ASK = 1
+
+KIND_SNAPSHOT = 0
+KIND_DIFF = 1
+
+# One order book level update. Snapshot rows sharing a pair and update id replace that pair's book,
+# diff rows set a single level and an amount of 0 removes the level.
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("update_id", "<i8"),
+    ("price", "<f8"),
+    ("amount", "<f8"),
+    ("pair_id", "<u2"),
+    ("side", "u1"),
+    ("kind", "u1"),
+    ("padding", "<u4"),
+])
+
+def make_records(size: int) -> np.ndarray:
+    return np.zeros(size, dtype=RECORD_DTYPE)
+
+def encode_header(trading_pairs: List[str]) -> bytes:
+    metadata = json.dumps({"trading_pairs": list(trading_pairs), "dtype": RECORD_DTYPE.descr}).encode()
+    header = MAGIC + struct.pack("<I", len(metadata)) + metadata
+    return header + b"\0" * (-len(header) % HEADER_ALIGNMENT)
+
+def read_header(file: BinaryIO):
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not an order book recording.")
+    (metadata_length,) = struct.unpack("<I", file.read(4))
+    metadata = json.loads(file.read(metadata_length))
+    header_length = len(MAGIC) + 4 + metadata_length
+    return metadata["trading_pairs"], header_length + (-header_length % HEADER_ALIGNMENT)
+
+class BookRecording:
+    """
+    A recording of order book updates opened as a read-only memory map. Records are fixed-width and
+    sorted by timestamp, so they can be sliced by time without parsing.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self.trading_pairs, self.data_offset = read_header(file)
+            file.seek(0, 2)
+            size = (file.tell() - self.data_offset) // RECORD_DTYPE.itemsize
+        if size > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=self.data_offset, shape=(size,))
+        else:
+            self.records = make_records(0)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def pair_id(self, trading_pair: str) -> int:
+        return self.trading_pairs.index(trading_pair)
+
+    def iter_chunks(self, chunk_size: int = 1 << 16) -> Iterator[np.ndarray]:
+        for start in range(0, len(self.records), chunk_size):
+            yield self.records[start:start + chunk_size]
+
+    def index_at(self, timestamp: float) -> int:
+        """
+        :return: The index of the first record after the timestamp
+        """
+        return int(np.searchsorted(self.records["timestamp"], timestamp, side="right"))
+
+class BookRecordingWriter:
+    """
+    Appends record arrays to a recording file. The header is written when the file is created. With append,
+    an existing recording of the same trading pairs is continued instead of replaced.
+
+    :raises ValueError: If append is set and the existing file is not a recording of the same trading pairs
+    """
+    def __init__(self, path: str, trading_pairs: List[str], append: bool = False):
+        self.path = path
+        self.trading_pairs = list(trading_pairs)
+        self.records_written: int = 0
+        self._file: Optional[BinaryIO] = None
+        if append and os.path.exists(path):
+            self._file = self.open_existing(path)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(encode_header(self.trading_pairs))
+
+    def open_existing(self, path: str) -> BinaryIO:
+        file = open(path, "r+b")
+        try:
+            trading_pairs, data_offset = read_header(file)
+        except (ValueError, struct.error) as e:
+            file.close()
+            raise ValueError(f"{path} is not an order book recording.") from e
+        if trading_pairs != self.trading_pairs:
+            file.close()
+            raise ValueError(f"{path} records other trading pairs.")
+        size = file.seek(0, 2)
+        # Drop a record cut short by a crash, so the appended ones stay aligned.
+        file.truncate(size - (size - data_offset) % RECORD_DTYPE.itemsize)
+        file.seek(0, 2)
+        return file
+
+    def write(self, records: np.ndarray):
+        self._file.write(np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes())
+        self.records_written += len(records)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "BookRecordingWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def open_recording(path: str) -> BookRecording:
+    return BookRecording(path)
@@ -0,0 +1,52 @@
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from hummingbot.connector.connector_base import ConnectorBase
+
+BookVersion = Tuple[int, int]
+
+class BookVersionCache:
+    """
+    Remembers evaluation results together with the versions (snapshot uid, last diff uid) of the order
+    books they were computed from. A result is reused for as long as none of its books has changed.
+    Book versions are read at most once per pair per tick and shared by every route that trades the pair.
+    """
+    def __init__(self, connector: ConnectorBase):
+        self.connector = connector
+        self._tick_versions: Dict[str, BookVersion] = {}
+        self._results: Dict[Hashable, Tuple[Tuple[BookVersion, ...], Any]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def start_tick(self):
+        self._tick_versions.clear()
+
+    def get_book_version(self, pair: str) -> BookVersion:
+        version = self._tick_versions.get(pair)
+        if version is None:
+            orderbook = self.connector.get_order_book(pair)
+            version = (orderbook.snapshot_uid, orderbook.last_diff_uid)
+            self._tick_versions[pair] = version
+        return version
+
+    def get_versions(self, pairs: Iterable[str]) -> Tuple[BookVersion, ...]:
+        return tuple(self.get_book_version(pair) for pair in pairs)
+
+    def lookup(self, key: Hashable, versions: Tuple[BookVersion, ...]) -> Optional[Any]:
+        cached = self._results.get(key)
+        if cached is not None and cached[0] == versions:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        return None
+
+    def store(self, key: Hashable, versions: Tuple[BookVersion, ...], result: Any):
+        self._results[key] = (versions, result)
+
+    def invalidate(self):
+        self._tick_versions.clear()
+        self._results.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
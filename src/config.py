@@ -1,6 +1,8 @@
+import dataclasses
 import os
 from decimal import Decimal
 from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
 
 @dataclass
 class TriangularArbitrageConfig:
@@ -8,8 +10,90 @@ class TriangularArbitrageConfig:
     first_pair: str = os.getenv("FIRST_PAIR", "ADA-USDT")
     second_pair: str = os.getenv("SECOND_PAIR", "ADA-BTC")
     third_pair: str = os.getenv("THIRD_PAIR", "BTC-USDT")
+    route_pairs: str = os.getenv("ROUTE_PAIRS", "")
     holding_asset: str = os.getenv("HOLDING_ASSET", "USDT")
     min_profitability: Decimal = Decimal(os.getenv("MIN_PROFITABILITY", "0.5"))
     order_amount_in_holding_asset: Decimal = Decimal(os.getenv("ORDER_AMOUNT", "20"))
     kill_switch_enabled: bool = os.getenv("KILL_SWITCH_ENABLED", "True").lower() == "true"
-    kill_switch_rate: Decimal = Decimal(os.getenv("KILL_SWITCH_RATE", "-2"))
\ No newline at end of file
+    kill_switch_rate: Decimal = Decimal(os.getenv("KILL_SWITCH_RATE", "-2"))
+    risk_window: float = float(os.getenv("RISK_WINDOW", "3600"))
+    max_drawdown: Decimal = Decimal(os.getenv("MAX_DRAWDOWN", "0"))
+    max_fill_slippage: Decimal = Decimal(os.getenv("MAX_FILL_SLIPPAGE", "0"))
+    max_order_failure_rate: Decimal = Decimal(os.getenv("MAX_ORDER_FAILURE_RATE", "0"))
+    leg_timeout: float = float(os.getenv("LEG_TIMEOUT", "30"))
+    cycle_timeout: float = float(os.getenv("CYCLE_TIMEOUT", "120"))
+    timeout_action: str = os.getenv("TIMEOUT_ACTION", "auto").lower()
+    balance_reconcile_interval: float = float(os.getenv("BALANCE_RECONCILE_INTERVAL", "60"))
+    rate_limits: str = os.getenv("RATE_LIMITS", "")
+    rate_limit_reserve: float = float(os.getenv("RATE_LIMIT_RESERVE", "0.2"))
+    scan_all_triangles: bool = os.getenv("SCAN_ALL_TRIANGLES", "False").lower() == "true"
+    scan_trading_pairs: str = os.getenv("SCAN_TRADING_PAIRS", "")
+    max_depth_walks_per_tick: int = int(os.getenv("MAX_DEPTH_WALKS_PER_TICK", "10"))
+    order_book_analyzer: str = os.getenv("ORDER_BOOK_ANALYZER", "decimal").lower()
+    top_of_book_filter_enabled: bool = os.getenv("TOP_OF_BOOK_FILTER_ENABLED", "True").lower() == "true"
+    evaluation_cache_enabled: bool = os.getenv("EVALUATION_CACHE_ENABLED", "True").lower() == "true"
+    optimal_sizing_enabled: bool = os.getenv("OPTIMAL_SIZING_ENABLED", "False").lower() == "true"
+    max_order_amount: Decimal = Decimal(os.getenv("MAX_ORDER_AMOUNT", "0"))
+    execution_mode: str = os.getenv("EXECUTION_MODE", "sequential").lower()
+    max_concurrent_cycles: int = int(os.getenv("MAX_CONCURRENT_CYCLES", "1"))
+    fee_overrides: str = os.getenv("FEE_OVERRIDES", "")
+    fee_refresh_interval: float = float(os.getenv("FEE_REFRESH_INTERVAL", "3600"))
+    evaluation_mode: str = os.getenv("EVALUATION_MODE", "tick").lower()
+    opportunity_journal_path: str = os.getenv("OPPORTUNITY_JOURNAL_PATH", "")
+    market_data_capture_enabled: bool = os.getenv("MARKET_DATA_CAPTURE_ENABLED", "False").lower() == "true"
+    market_data_capture_dir: str = os.getenv("MARKET_DATA_CAPTURE_DIR", "data/market_data")
+    market_data_capture_depth: int = int(os.getenv("MARKET_DATA_CAPTURE_DEPTH", "20"))
+    log_mode: str = os.getenv("LOG_MODE", "sync").lower()
+    log_queue_size: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    log_sample_interval: float = float(os.getenv("LOG_SAMPLE_INTERVAL", "0"))
+    log_sample_every: int = int(os.getenv("LOG_SAMPLE_EVERY", "1"))
+    latency_profiling_enabled: bool = os.getenv("LATENCY_PROFILING_ENABLED", "True").lower() == "true"
+    prometheus_export_path: str = os.getenv("PROMETHEUS_EXPORT_PATH", "")
+    prometheus_export_interval: float = float(os.getenv("PROMETHEUS_EXPORT_INTERVAL", "15"))
+    sharded_workers: int = int(os.getenv("SHARDED_WORKERS", "0"))
+    sharded_book_depth: int = int(os.getenv("SHARDED_BOOK_DEPTH", "50"))
+    warm_start_cache_path: str = os.getenv("WARM_START_CACHE_PATH", "")
+
+    @property
+    def route_pair_list(self) -> List[str]:
+        return [pair.strip() for pair in self.route_pairs.split(",") if pair.strip()]
+
+    @property
+    def scan_trading_pair_list(self) -> List[str]:
+        return [pair.strip() for pair in self.scan_trading_pairs.split(",") if pair.strip()]
+
+    @property
+    def market_pairs(self) -> Set[str]:
+        """
+        The pairs the strategy subscribes to on connector_name.
+        """
+        return {self.first_pair, self.second_pair, self.third_pair, *self.route_pair_list, *self.scan_trading_pair_list}
+
+@dataclass
+class StrategyHostConfig:
+    config_path: str = os.getenv("STRATEGY_HOST_CONFIG", "strategies.json")
+    reload_interval: float = float(os.getenv("STRATEGY_HOST_RELOAD_INTERVAL", "5"))
+
+def config_from_dict(values: Dict[str, Any], base: Optional[TriangularArbitrageConfig] = None) -> TriangularArbitrageConfig:
+    """
+    Returns base, by default the configuration from the environment, with the given fields replaced.
+    Values may be strings, as in the environment, or JSON numbers and booleans.
+
+    :raises ValueError: If a field does not exist or a value does not convert to the field's type
+    """
+    field_types = {field.name: field.type for field in dataclasses.fields(TriangularArbitrageConfig)}
+    changes = {}
+    for name, value in values.items():
+        field_type = field_types.get(name)
+        if field_type is None:
+            raise ValueError(f"Unknown config field: {name}")
+        try:
+            if field_type is bool and isinstance(value, str):
+                changes[name] = value.lower() == "true"
+            elif field_type is Decimal:
+                changes[name] = Decimal(str(value))
+            else:
+                changes[name] = field_type(value)
+        except (ArithmeticError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid value for {name}: {value!r}") from e
+    return dataclasses.replace(base if base is not None else TriangularArbitrageConfig(), **changes)
\ No newline at end of file
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+from arbitrage_cycle import LatencyStats
+from book_version_cache import BookVersion
+
+class EvaluationScheduler:
+    """
+    Turns order book updates into evaluations of the routes that trade the updated pairs.
+    A route is queued at most once: updates that arrive while it is queued are coalesced into the
+    pending evaluation. Latency is measured from the oldest coalesced update to the decision.
+    """
+    def __init__(self, evaluate: Callable[[Hashable], None], on_drain: Optional[Callable[[], None]] = None,
+                 schedule: Optional[Callable[[Callable[[], None]], None]] = None):
+        self.evaluate = evaluate
+        self.on_drain = on_drain
+        self.schedule = schedule or (lambda callback: asyncio.get_event_loop().call_soon(callback))
+        self.update_to_decision = LatencyStats()
+        self.updates: int = 0
+        self.coalesced: int = 0
+        self.evaluations: int = 0
+        self._routes_by_pair: Dict[str, List[Hashable]] = {}
+        self._queued: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._seen_versions: Dict[str, BookVersion] = {}
+        self._drain_scheduled: bool = False
+
+    def register(self, route: Hashable, pairs: Iterable[str]):
+        for pair in pairs:
+            routes = self._routes_by_pair.setdefault(pair, [])
+            if route not in routes:
+                routes.append(route)
+
+    def clear(self):
+        self._routes_by_pair.clear()
+        self._queued.clear()
+        self._seen_versions.clear()
+
+    @property
+    def pairs(self) -> List[str]:
+        return list(self._routes_by_pair)
+
+    def notify(self, pair: str, received_at: Optional[float] = None):
+        """
+        Queues every route that trades the pair, unless it is already waiting for an evaluation.
+
+        :param pair: The trading pair whose order book changed
+        :param received_at: perf_counter() time the update was received, defaults to now
+        """
+        self.updates += 1
+        received_at = received_at if received_at is not None else time.perf_counter()
+        for route in self._routes_by_pair.get(pair, ()):
+            if route in self._queued:
+                self.coalesced += 1
+            else:
+                self._queued[route] = received_at
+        if self._queued and not self._drain_scheduled:
+            self._drain_scheduled = True
+            self.schedule(self.drain)
+
+    def notify_if_changed(self, pair: str, version: BookVersion):
+        if self._seen_versions.get(pair) != version:
+            self._seen_versions[pair] = version
+            self.notify(pair)
+
+    def drain(self):
+        self._drain_scheduled = False
+        if not self._queued:
+            return
+        if self.on_drain is not None:
+            self.on_drain()
+        while self._queued:
+            route, received_at = self._queued.popitem(last=False)
+            self.evaluate(route)
+            self.evaluations += 1
+            self.update_to_decision.record(time.perf_counter() - received_at)
+
+    def format(self) -> str:
+        return (f"updates={self.updates} coalesced={self.coalesced} evaluations={self.evaluations} "
+                f"update-to-decision {self.update_to_decision.format()}")
@@ -0,0 +1,135 @@
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot.core.data_type.common import TradeType
+from hummingbot.core.utils.estimate_fee import estimate_fee
+
+FeeKey = Tuple[str, Optional[TradeType], bool]
+
+def parse_fee_overrides(overrides: str) -> Dict[FeeKey, Decimal]:
+    """
+    Parses fee overrides of the form "PAIR[:SIDE][:maker|taker]=RATE", separated by commas.
+    PAIR may be "*" to apply to every pair, SIDE is BUY or SELL and the fee type defaults to taker.
+    Example: "*:taker=0.0008,BTC-USDT:SELL=0.0005"
+    """
+    parsed = {}
+    for entry in overrides.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        target, rate = entry.split("=")
+        parts = target.strip().split(":")
+        pair, side, is_maker = parts[0], None, False
+        for part in parts[1:]:
+            if part.upper() in ("BUY", "SELL"):
+                side = TradeType[part.upper()]
+            else:
+                is_maker = part.lower() == "maker"
+        parsed[(pair, side, is_maker)] = Decimal(rate.strip())
+    return parsed
+
+class FeeSchedule:
+    """
+    Per-pair and per-side maker/taker fee rates, loaded once and refreshed every refresh_interval seconds.
+    Profit calculation reads precomputed (1 - fee) multipliers, so the hot path is a dict lookup.
+    """
+    def __init__(self, connector: ConnectorBase, connector_name: str, overrides: Dict[FeeKey, Decimal] = None,
+                 refresh_interval: float = 3600.0):
+        self.connector = connector
+        self.connector_name = connector_name
+        self.overrides = overrides or {}
+        self.refresh_interval = refresh_interval
+        self.version: int = 0
+        self._fees: Dict[FeeKey, Decimal] = {}
+        self._multipliers: Dict[FeeKey, Decimal] = {}
+        self._pairs: List[str] = []
+        self._last_refresh: float = 0.0
+
+    def get_account_fee_schema(self, pair: str):
+        # Exchange connectors keep the per-pair fees fetched from the account in _trading_fees.
+        trading_fees = getattr(self.connector, "_trading_fees", None)
+        return trading_fees.get(pair) if isinstance(trading_fees, dict) else None
+
+    def has_account_fees(self, pair: str) -> bool:
+        return self.get_account_fee_schema(pair) is not None
+
+    def get_base_fee(self, pair: str, is_maker: bool) -> Decimal:
+        fee_schema = self.get_account_fee_schema(pair)
+        if fee_schema is not None:
+            return fee_schema.maker_percent_fee_decimal if is_maker else fee_schema.taker_percent_fee_decimal
+        return estimate_fee(self.connector_name, is_maker=is_maker).percent
+
+    def resolve_fee(self, pair: str, side: TradeType, is_maker: bool) -> Decimal:
+        for key in ((pair, side, is_maker), (pair, None, is_maker), ("*", side, is_maker), ("*", None, is_maker)):
+            if key in self.overrides:
+                return self.overrides[key]
+        return self.get_base_fee(pair, is_maker)
+
+    def load_pair(self, pair: str) -> Dict[FeeKey, Decimal]:
+        fees = {}
+        for side in (TradeType.BUY, TradeType.SELL):
+            for is_maker in (False, True):
+                fees[(pair, side, is_maker)] = self.resolve_fee(pair, side, is_maker)
+        self._fees.update(fees)
+        self._multipliers.update({key: Decimal("1") - fee for key, fee in fees.items()})
+        if pair not in self._pairs:
+            self._pairs.append(pair)
+        return fees
+
+    def refresh(self, pairs: Iterable[str], timestamp: float):
+        previous = dict(self._fees)
+        for pair in set(pairs) | set(self._pairs):
+            self.load_pair(pair)
+        self._last_refresh = timestamp
+        if self._fees != previous:
+            self.version += 1
+
+    def refresh_pair(self, pair: str) -> bool:
+        """
+        Reloads the rates of one pair.
+
+        :return: True if a rate changed
+        """
+        previous = {key: fee for key, fee in self._fees.items() if key[0] == pair}
+        if self.load_pair(pair) == previous:
+            return False
+        self.version += 1
+        return True
+
+    def seed(self, fees: Dict[FeeKey, Decimal]):
+        """
+        Replaces rates with ones saved by an earlier run. They are used until the pair is reloaded.
+        """
+        for key, fee in fees.items():
+            self._fees[key] = fee
+            self._multipliers[key] = Decimal("1") - fee
+            if key[0] not in self._pairs:
+                self._pairs.append(key[0])
+        self.version += 1
+
+    def get_fees(self) -> Dict[FeeKey, Decimal]:
+        return dict(self._fees)
+
+    def is_refresh_due(self, timestamp: float) -> bool:
+        return timestamp - self._last_refresh >= self.refresh_interval
+
+    def maybe_refresh(self, timestamp: float):
+        if self.is_refresh_due(timestamp):
+            self.refresh(self._pairs, timestamp)
+
+    def get_fee(self, pair: str, side: TradeType, is_maker: bool = False) -> Decimal:
+        fee = self._fees.get((pair, side, is_maker))
+        if fee is None:
+            fee = self.load_pair(pair)[(pair, side, is_maker)]
+        return fee
+
+    def get_multiplier(self, pair: str, side: TradeType, is_maker: bool = False) -> Decimal:
+        multiplier = self._multipliers.get((pair, side, is_maker))
+        if multiplier is None:
+            self.load_pair(pair)
+            multiplier = self._multipliers[(pair, side, is_maker)]
+        return multiplier
+
+    def get_multipliers(self, trading_pair: Iterable[str], order_side: Iterable[TradeType]) -> List[Decimal]:
+        return [self.get_multiplier(pair, side) for pair, side in zip(trading_pair, order_side)]
@@ -0,0 +1,258 @@
+import logging
+from bisect import bisect_right
+from decimal import ROUND_FLOOR, Context, Decimal
+from itertools import accumulate, islice
+from operator import mul
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot.connector.trading_rule import TradingRule
+from hummingbot.core.data_type.common import TradeType
+from hummingbot.core.data_type.order_book import OrderBook
+
+from order_book_analyzer import OrderBookAnalyzer
+
+# Every asset amount and price is an integer count of 10^-18 units ("atoms"). Exchange tick and step
+# sizes have far fewer decimals, so quantizing to them is exact integer division.
+ATOM_DECIMALS = 18
+ATOM = 10 ** ATOM_DECIMALS
+# Decimal(float) can carry dozens of digits; scaling must not round them at the default 28 digit precision.
+EXACT_CONTEXT = Context(prec=1000, rounding=ROUND_FLOOR)
+
+def to_atoms(value) -> int:
+    """
+    Converts a Decimal, int or float to atoms, rounding down beyond 18 decimals.
+    Floats are read by their shortest repr, e.g. 0.1 is exactly 10^17 atoms.
+    """
+    if not isinstance(value, Decimal):
+        value = Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+    return int(value.scaleb(ATOM_DECIMALS, EXACT_CONTEXT).to_integral_value(ROUND_FLOOR, EXACT_CONTEXT))
+
+def atoms_to_decimal(atoms: int) -> Decimal:
+    return Decimal(atoms).scaleb(-ATOM_DECIMALS)
+
+class PairScale:
+    """
+    A pair's trading rules in atoms. quantize_order_amount and quantize_order_price return the same
+    Decimals, digit for digit, as the connector's (value // increment) * increment quantization.
+    """
+    __slots__ = ("trading_pair", "price_increment", "amount_increment", "tick_atoms", "step_atoms", "min_order_atoms")
+
+    def __init__(self, trading_pair: str, price_increment: Decimal, amount_increment: Decimal, min_order_size: Decimal):
+        self.trading_pair = trading_pair
+        self.price_increment = price_increment
+        self.amount_increment = amount_increment
+        self.tick_atoms = to_atoms(price_increment)
+        self.step_atoms = to_atoms(amount_increment)
+        if self.tick_atoms <= 0 or self.step_atoms <= 0:
+            raise ValueError(f"Increments of {trading_pair} are finer than {ATOM_DECIMALS} decimals.")
+        self.min_order_atoms = to_atoms(min_order_size)
+
+    @classmethod
+    def from_trading_rule(cls, trading_rule: TradingRule) -> "PairScale":
+        return cls(trading_rule.trading_pair, trading_rule.min_price_increment,
+                   trading_rule.min_base_amount_increment, trading_rule.min_order_size)
+
+    def quantize_amount_atoms(self, amount_atoms: int) -> int:
+        """
+        :return: The amount rounded down to the step size in atoms, 0 if below the minimum order size
+        """
+        quantized = amount_atoms // self.step_atoms * self.step_atoms
+        return quantized if quantized >= self.min_order_atoms else 0
+
+    def amount_to_decimal(self, quantized_atoms: int) -> Decimal:
+        if quantized_atoms == 0:
+            return Decimal("0")
+        return Decimal(quantized_atoms // self.step_atoms) * self.amount_increment
+
+    def quantize_order_amount(self, amount: Decimal) -> Decimal:
+        steps = to_atoms(amount) // self.step_atoms
+        if steps * self.step_atoms < self.min_order_atoms:
+            return Decimal("0")
+        return Decimal(steps) * self.amount_increment
+
+    def quantize_order_price(self, price: Decimal) -> Decimal:
+        if price.is_nan():
+            return price
+        return Decimal(to_atoms(price) // self.tick_atoms) * self.price_increment
+
+def grid_to_atoms(value: float, increment: float, increment_atoms: int) -> int:
+    """
+    Converts a book price or size to atoms through its whole number of increments, falling back to the
+    shortest repr when the value is not on the increment grid.
+    """
+    units = round(value / increment)
+    if abs(units * increment - value) <= 1e-9 * value:
+        return units * increment_atoms
+    return to_atoms(value)
+
+class FixedPointBookSide:
+    """
+    One side of an order book as integer atoms. cum_base and cum_quote hold the cumulative size and
+    the cumulative notional scaled by ATOM *before* each level, with the converted totals as the last
+    element, so depth queries are a bisect plus one exact integer step.
+    Levels are converted lazily in growing chunks, so a query only pays for the depth it walks.
+    """
+    __slots__ = ("prices", "cum_base", "cum_quote", "_entries", "_scale", "_chunk_size")
+
+    def __init__(self, entries: Iterable, scale: Optional[PairScale] = None, chunk_size: int = 4):
+        self.prices: List[int] = []
+        self.cum_base: List[int] = [0]
+        self.cum_quote: List[int] = [0]
+        self._entries = iter(entries)
+        self._scale = scale
+        self._chunk_size = chunk_size
+
+    @classmethod
+    def from_entries(cls, entries: Iterable, scale: Optional[PairScale] = None) -> "FixedPointBookSide":
+        return cls(entries, scale)
+
+    def extend(self) -> bool:
+        """
+        Converts the next chunk of levels.
+
+        :return: False if the whole side has been converted already
+        """
+        if self._entries is None:
+            return False
+        rows = list(islice(self._entries, self._chunk_size))
+        if len(rows) < self._chunk_size:
+            self._entries = None
+        self._chunk_size *= 2
+        scale = self._scale
+        if scale is not None:
+            tick, step = float(scale.price_increment), float(scale.amount_increment)
+            prices = [grid_to_atoms(row[0], tick, scale.tick_atoms) for row in rows]
+            sizes = [grid_to_atoms(row[1], step, scale.step_atoms) for row in rows]
+        else:
+            prices = [to_atoms(row[0]) for row in rows]
+            sizes = [to_atoms(row[1]) for row in rows]
+        self.prices.extend(prices)
+        self.cum_base.extend(accumulate(sizes, initial=self.cum_base[-1]))
+        del self.cum_base[-len(sizes) - 1]
+        self.cum_quote.extend(accumulate(map(mul, sizes, prices), initial=self.cum_quote[-1]))
+        del self.cum_quote[-len(sizes) - 1]
+        return bool(rows)
+
+    def base_for_quote_atoms(self, quote_atoms: int) -> int:
+        target = quote_atoms * ATOM
+        while target >= self.cum_quote[-1]:
+            if not self.extend():
+                return self.cum_base[-1]
+        level = bisect_right(self.cum_quote, target) - 1
+        return self.cum_base[level] + (target - self.cum_quote[level]) // self.prices[level]
+
+    def quote_for_base_atoms(self, base_atoms: int) -> int:
+        while base_atoms >= self.cum_base[-1]:
+            if not self.extend():
+                return self.cum_quote[-1] // ATOM
+        level = bisect_right(self.cum_base, base_atoms) - 1
+        return (self.cum_quote[level] + (base_atoms - self.cum_base[level]) * self.prices[level]) // ATOM
+
+class FixedPointOrderBookAnalyzer(OrderBookAnalyzer):
+    """
+    OrderBookAnalyzer that does the whole route calculation in integer atoms. Each book side is converted
+    once per book version and each pair's trading rules once, and Decimals are only created for the
+    returned order amounts and profit. Quantization is checked against the connector for every pair when
+    its scale is created; pairs whose connector quantizes differently are left to the Decimal path.
+    """
+    def __init__(self, connector: ConnectorBase):
+        self.connector = connector
+        self.logger = logging.getLogger(__name__)
+        # Keyed by book, side and whether the levels were converted on the pair's grid.
+        self._sides: Dict[Tuple[int, bool, bool], Tuple[Tuple[int, int], FixedPointBookSide]] = {}
+        self._scales: Dict[str, Optional[PairScale]] = {}
+        self._multipliers: Dict[Decimal, int] = {}
+
+    def get_scale(self, pair: str) -> Optional[PairScale]:
+        if pair not in self._scales:
+            trading_rule = self.connector.trading_rules.get(pair)
+            if trading_rule is None:
+                # Trading rules may not be loaded yet, try again on the next call.
+                return None
+            try:
+                scale = PairScale.from_trading_rule(trading_rule)
+            except ValueError as e:
+                self.logger.warning(f"{str(e)} Using Decimal math for {pair}.")
+                scale = None
+            if scale is not None and not self.matches_connector(scale):
+                self.logger.warning(f"Quantization of {pair} differs from the connector, using Decimal math for it.")
+                scale = None
+            self._scales[pair] = scale
+        return self._scales[pair]
+
+    def matches_connector(self, scale: PairScale) -> bool:
+        samples = [scale.amount_increment * 3 + scale.amount_increment / 3, scale.amount_increment / 2,
+                   Decimal("1") + scale.amount_increment / 7, Decimal("12345.6789012345678")]
+        prices = [scale.price_increment * 5 + scale.price_increment / 3, Decimal("0.3"), Decimal("98765.4321012345")]
+        pair = scale.trading_pair
+        # Compared as tuples, so a different exponent (e.g. "0" vs "0E-8") counts as a mismatch too.
+        return (all(scale.quantize_order_amount(amount).as_tuple() ==
+                    Decimal(self.connector.quantize_order_amount(pair, amount)).as_tuple() for amount in samples) and
+                all(scale.quantize_order_price(price).as_tuple() ==
+                    Decimal(self.connector.quantize_order_price(pair, price)).as_tuple() for price in prices))
+
+    def get_book_side(self, orderbook: OrderBook, is_ask: bool, scale: Optional[PairScale] = None) -> FixedPointBookSide:
+        key = (id(orderbook), is_ask, scale is not None)
+        version = (orderbook.snapshot_uid, orderbook.last_diff_uid)
+        cached = self._sides.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        side = FixedPointBookSide.from_entries(orderbook.ask_entries() if is_ask else orderbook.bid_entries(), scale)
+        self._sides[key] = (version, side)
+        return side
+
+    def get_multiplier_atoms(self, multiplier: Decimal) -> int:
+        atoms = self._multipliers.get(multiplier)
+        if atoms is None:
+            atoms = self._multipliers[multiplier] = to_atoms(multiplier)
+        return atoms
+
+    def calculate_route(self, trading_pair: Sequence[str], order_side: Sequence[TradeType], start_amount: Decimal,
+                        fee_multipliers: Sequence[Decimal]) -> Optional[Tuple[Decimal, List[Decimal]]]:
+        """
+        Integer version of calculate_profit.
+
+        :return: The profit in percent and the quantized order amount of each leg, or None when a pair has
+                 no usable trading rules and the Decimal path has to be used
+        """
+        scales = [self.get_scale(pair) for pair in trading_pair]
+        if None in scales:
+            return None
+        start_atoms = to_atoms(start_amount)
+        exchanged = start_atoms
+        quantized_amounts = []
+        for pair, side, scale, multiplier in zip(trading_pair, order_side, scales, fee_multipliers):
+            is_buy = side == TradeType.BUY
+            book_side = self.get_book_side(self.connector.get_order_book(pair), is_buy, scale)
+            amount = scale.quantize_amount_atoms(book_side.base_for_quote_atoms(exchanged) if is_buy else exchanged)
+            if amount == 0:
+                return Decimal("-100"), []
+            quantized_amounts.append((scale, amount))
+            exchanged = amount if is_buy else book_side.quote_for_base_atoms(amount)
+            exchanged = exchanged * self.get_multiplier_atoms(multiplier) // ATOM
+        profit = Decimal((exchanged - start_atoms) * 100) / Decimal(start_atoms)
+        return profit, [scale.amount_to_decimal(amount) for scale, amount in quantized_amounts]
+
+    def quantize_order_amount(self, pair: str, amount: Decimal) -> Decimal:
+        scale = self.get_scale(pair)
+        return scale.quantize_order_amount(amount) if scale else self.connector.quantize_order_amount(pair, amount)
+
+    def quantize_order_price(self, pair: str, price: Decimal) -> Decimal:
+        scale = self.get_scale(pair)
+        return scale.quantize_order_price(price) if scale else self.connector.quantize_order_price(pair, price)
+
+    def get_base_amount_for_quote_volume(self, orderbook: OrderBook, quote_volume: Decimal) -> Decimal:
+        side = self.get_book_side(orderbook, quote_volume > 0)
+        return atoms_to_decimal(side.base_for_quote_atoms(to_atoms(abs(quote_volume))))
+
+    def get_order_amount_from_exchanged_amount(self, pair: str, side: TradeType, exchanged_amount: Decimal) -> Decimal:
+        if side == TradeType.BUY:
+            order_amount = self.get_base_amount_for_quote_volume(self.connector.get_order_book(pair), exchanged_amount)
+        else:
+            order_amount = exchanged_amount
+        return self.quantize_order_amount(pair, order_amount)
+
+    def get_quote_volume_for_base_amount(self, pair: str, side: TradeType, base_amount: Decimal) -> Decimal:
+        book_side = self.get_book_side(self.connector.get_order_book(pair), side == TradeType.BUY, self.get_scale(pair))
+        return atoms_to_decimal(book_side.quote_for_base_atoms(to_atoms(base_amount)))
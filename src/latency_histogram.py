@@ -0,0 +1,184 @@
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Values below 2 ** SUB_BUCKET_BITS ns get their own bucket, larger values are kept with
+# SUB_BUCKET_BITS - 1 significant bits, i.e. within 1/64 (1.6%) of the recorded value.
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+# Latencies above 2 ** MAX_VALUE_BITS ns (about 4.9 hours) are counted in the last bucket.
+MAX_VALUE_BITS = 44
+BUCKET_COUNT = SUB_BUCKET_COUNT + (MAX_VALUE_BITS - SUB_BUCKET_BITS + 1) * SUB_BUCKET_HALF
+
+def bucket_indices(values_ns: np.ndarray) -> np.ndarray:
+    values_ns = np.clip(values_ns, 0, (1 << MAX_VALUE_BITS) - 1)
+    bit_length = np.frexp(values_ns.astype(np.float64))[1].astype(np.int64)
+    shift = np.maximum(bit_length - SUB_BUCKET_BITS, 0)
+    mantissa = np.right_shift(values_ns, shift)
+    large = SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + mantissa - SUB_BUCKET_HALF
+    return np.where(values_ns < SUB_BUCKET_COUNT, values_ns, large)
+
+def bucket_upper_bound(index: int) -> int:
+    """
+    :return: The largest value in ns that is counted in the bucket
+    """
+    if index < SUB_BUCKET_COUNT:
+        return index
+    shift, offset = divmod(index - SUB_BUCKET_COUNT, SUB_BUCKET_HALF)
+    return ((offset + SUB_BUCKET_HALF + 1) << (shift + 1)) - 1
+
+class LatencyHistogram:
+    """
+    HDR-style latency histogram with log-linear buckets in nanoseconds.
+    record() only appends to a buffer; buffered values are bucketed in bulk with NumPy once
+    fold_size of them accumulate or when the histogram is read, which keeps recording cheap.
+    """
+    __slots__ = ("counts", "count", "total", "max", "fold_size", "_pending")
+
+    def __init__(self, fold_size: int = 4096):
+        self.counts = np.zeros(BUCKET_COUNT, dtype=np.int64)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+        self.fold_size = fold_size
+        self._pending: List[float] = []
+
+    def record(self, value: float):
+        pending = self._pending
+        pending.append(value)
+        if len(pending) >= self.fold_size:
+            self.fold()
+
+    def fold(self):
+        if not self._pending:
+            return
+        values = np.array(self._pending, dtype=np.float64)
+        self._pending = []
+        self.counts += np.bincount(bucket_indices((values * 1e9).astype(np.int64)), minlength=BUCKET_COUNT)
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: "LatencyHistogram"):
+        other.fold()
+        self.fold()
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def reset(self):
+        self.counts[:] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._pending = []
+
+    @property
+    def mean(self) -> float:
+        self.fold()
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """
+        :param percentile: Percentile between 0 and 100
+        :return: The highest value in seconds equivalent to the percentile, capped at the maximum
+        """
+        self.fold()
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(np.ceil(percentile / 100 * self.count)))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(bucket_upper_bound(index) / 1e9, self.max)
+
+    def format(self) -> str:
+        self.fold()
+        return (f"n={self.count} p50={self.percentile(50) * 1e6:.1f}us p99={self.percentile(99) * 1e6:.1f}us "
+                f"max={self.max * 1e6:.1f}us")
+
+class LatencyProfiler:
+    """
+    Named latency histograms for the stages of the strategy pipeline. Stages are timed with laps:
+
+        started = profiler.now()
+        ...
+        lap = profiler.lap("stage.one", started)
+        ...
+        profiler.lap("stage.two", lap)
+
+    Stages inside tight loops can sum clock() differences and record() the total once.
+    When disabled, now(), lap() and clock() return 0.0 without reading the clock.
+    """
+    def __init__(self, enabled: bool = True, export_path: str = "", export_interval: float = 15.0,
+                 metric_name: str = "triarb_stage_latency_seconds"):
+        self.enabled = enabled
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.metric_name = metric_name
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        # Reading the clock is skipped entirely when profiling is disabled.
+        self.clock: Callable[[], float] = time.perf_counter if enabled else float
+        self._last_export: float = 0.0
+        self.logger = logging.getLogger(__name__)
+
+    def now(self) -> float:
+        return time.perf_counter() if self.enabled else 0.0
+
+    def get_histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram()
+        return histogram
+
+    def lap(self, stage: str, started: float) -> float:
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        histograms = self.histograms
+        (histograms[stage] if stage in histograms else self.get_histogram(stage)).record(now - started)
+        return now
+
+    def record(self, stage: str, value: float):
+        if self.enabled:
+            histograms = self.histograms
+            (histograms[stage] if stage in histograms else self.get_histogram(stage)).record(value)
+
+    def format(self, stages: Optional[Iterable[str]] = None) -> List[str]:
+        return [f"{stage}: {self.histograms[stage].format()}"
+                for stage in (stages if stages is not None else sorted(self.histograms))
+                if stage in self.histograms]
+
+    def to_prometheus(self, quantiles=(0.5, 0.9, 0.99, 0.999)) -> str:
+        name = self.metric_name
+        lines = [f"# HELP {name} Latency of strategy pipeline stages.", f"# TYPE {name} summary"]
+        max_lines = [f"# HELP {name}_max Maximum latency of strategy pipeline stages.", f"# TYPE {name}_max gauge"]
+        for stage in sorted(self.histograms):
+            histogram = self.histograms[stage]
+            histogram.fold()
+            for quantile in quantiles:
+                lines.append(f'{name}{{stage="{stage}",quantile="{quantile}"}} {histogram.percentile(quantile * 100):.9f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            max_lines.append(f'{name}_max{{stage="{stage}"}} {histogram.max:.9f}')
+        return "\n".join(lines + max_lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        # Write to a temporary file and rename it, so the node exporter never reads a partial file.
+        # A failed export is logged and retried at the next interval; it never aborts the tick.
+        temporary_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(temporary_path, "w") as file:
+                file.write(self.to_prometheus())
+            os.replace(temporary_path, path)
+        except OSError as e:
+            self.logger.error(f"Could not export latencies to {path}: {str(e)}")
+
+    def maybe_export(self, timestamp: float):
+        if self.export_path and timestamp - self._last_export >= self.export_interval:
+            self._last_export = timestamp
+            self.write_prometheus(self.export_path)
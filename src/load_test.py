@@ -0,0 +1,236 @@
+import argparse
+import logging
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from backtest import BacktestStrategy, add_exchange_arguments, collect_results, parse_balances
+from config import TriangularArbitrageConfig
+from latency_histogram import LatencyHistogram
+from simulated_connector import FillModel, SimulatedConnector
+from utils import split_trading_pair
+
+# Asset prices in USDT for the default ADA-USDT, ADA-BTC, BTC-USDT triangle.
+DEFAULT_PRICES = {"USDT": 1.0, "ADA": 0.5, "BTC": 50000.0, "ETH": 2500.0}
+
+class SyntheticMarket:
+    """
+    Random walk order books for a SimulatedConnector. Every asset has a price in a common numeraire. An update
+    moves the base asset price of one pair and requotes that pair around the new cross rate, so the
+    other pairs of the asset stay stale until their own update, like quotes on a live exchange. Each
+    pair also quotes off the cross rate by a mean reverting deviation with standard deviation mispricing,
+    which decays by reversion per update; this opens the arbitrage opportunities the strategy trades.
+    Updates arrive at update_rate per pair per second of simulated time and are applied as diffs:
+    a new best level on each side replaces the levels the move crossed, one random level is resized
+    and the worst levels beyond depth are dropped.
+    """
+    def __init__(self, connector: SimulatedConnector, prices: Dict[str, float], update_rate: float = 10.0,
+                 volatility: float = 0.0002, mispricing: float = 0.0, reversion: float = 0.05, spread: float = 0.001, depth: int = 20,
+                 level_notional: float = 1000.0, seed: int = 0):
+        self.connector = connector
+        self.prices = dict(prices)
+        self.update_rate = update_rate
+        self.volatility = volatility
+        self.mispricing = mispricing
+        self.reversion = reversion
+        self.spread = spread
+        self.depth = depth
+        self.level_notional = level_notional
+        self.rng = random.Random(seed)
+        self.trading_pairs = list(connector.trading_pairs)
+        self.updates: int = 0
+        self._update_ids: Dict[str, int] = {}
+        self._deviations: Dict[str, float] = {pair: 0.0 for pair in self.trading_pairs}
+        self._last_timestamp: Optional[float] = None
+        self._carry: float = 0.0
+
+    def get_mid(self, pair: str) -> float:
+        base, quote = split_trading_pair(pair)
+        return self.prices[base] / self.prices[quote]
+
+    def get_level_amount(self, pair: str) -> float:
+        base, _ = split_trading_pair(pair)
+        return self.level_notional / self.prices[base] * self.rng.uniform(0.2, 2.0)
+
+    def seed_books(self):
+        """
+        Replaces every book with a snapshot of depth levels per side around the current prices.
+        """
+        for pair in self.trading_pairs:
+            mid = self.get_mid(pair)
+            bids, asks = [], []
+            bid, ask = mid * (1 - self.spread / 2), mid * (1 + self.spread / 2)
+            for _ in range(self.depth):
+                bids.append((bid, self.get_level_amount(pair)))
+                asks.append((ask, self.get_level_amount(pair)))
+                bid *= 1 - self.rng.uniform(0.0001, 0.0005)
+                ask *= 1 + self.rng.uniform(0.0001, 0.0005)
+            self._update_ids[pair] = 1
+            self.connector.get_order_book(pair).apply_snapshot(bids, asks, 1)
+
+    def advance(self, timestamp: float) -> int:
+        """
+        Applies the updates due between the previous call and timestamp.
+
+        :return: The number of updates applied
+        """
+        if self._last_timestamp is None:
+            self._last_timestamp = timestamp
+            return 0
+        due = (timestamp - self._last_timestamp) * self.update_rate * len(self.trading_pairs) + self._carry
+        self._last_timestamp = timestamp
+        count = int(due)
+        self._carry = due - count
+        for _ in range(count):
+            self.update(self.rng.choice(self.trading_pairs))
+        self.updates += count
+        return count
+
+    def update(self, pair: str):
+        base, _ = split_trading_pair(pair)
+        self.prices[base] *= math.exp(self.rng.gauss(0, self.volatility))
+        mid = self.get_mid(pair)
+        if self.mispricing:
+            # AR(1) with stationary standard deviation mispricing.
+            shock = self.mispricing * math.sqrt(1 - (1 - self.reversion) ** 2)
+            deviation = self._deviations[pair] = self._deviations[pair] * (1 - self.reversion) + self.rng.gauss(0, shock)
+            mid *= math.exp(deviation)
+        book = self.connector.get_order_book(pair)
+        update_id = self._update_ids[pair] = max(self._update_ids.get(pair, 0), book.snapshot_uid, book.last_diff_uid) + 1
+        best_bid, best_ask = mid * (1 - self.spread / 2), mid * (1 + self.spread / 2)
+        for is_ask, levels, best in ((False, book.bids, best_bid), (True, book.asks, best_ask)):
+            crossed = [price for price in levels if (price <= best if is_ask else price >= best)]
+            for price in crossed:
+                book.apply_diff(is_ask, price, 0.0, update_id)
+            book.apply_diff(is_ask, best, self.get_level_amount(pair), update_id)
+            if len(levels) > self.depth:
+                for price in sorted(levels, reverse=is_ask)[:len(levels) - self.depth]:
+                    book.apply_diff(is_ask, price, 0.0, update_id)
+        is_ask = self.rng.random() < 0.5
+        levels = book.asks if is_ask else book.bids
+        if levels:
+            book.apply_diff(is_ask, self.rng.choice(list(levels)), self.get_level_amount(pair), update_id)
+
+@dataclass
+class LoadTestResult:
+    ticks: int = 0
+    book_updates: int = 0
+    cycles: int = 0
+    filled_orders: int = 0
+    failed_orders: int = 0
+    simulated_time: float = 0.0
+    elapsed: float = 0.0
+    start_balance: Decimal = Decimal("0")
+    end_balance: Decimal = Decimal("0")
+    tick_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    event_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def updates_per_second(self) -> float:
+        return self.book_updates / self.elapsed if self.elapsed else 0.0
+
+    def format(self) -> List[str]:
+        return [
+            f"Simulated {self.simulated_time:.0f}s in {self.elapsed:.1f}s: {self.ticks} ticks ({self.ticks_per_second:.0f}/s), "
+            f"{self.book_updates} book updates ({self.updates_per_second:.0f}/s)",
+            f"Cycles: {self.cycles}, filled orders: {self.filled_orders}, failed orders: {self.failed_orders}, "
+            f"balance {self.start_balance} -> {self.end_balance}",
+            f"on_tick latency: {self.tick_latency.format()}",
+            f"Order event latency: {self.event_latency.format()}",
+        ]
+
+class LoadTest:
+    """
+    Drives BacktestStrategy against a SyntheticMarket as fast as the host allows for duration seconds of
+    simulated time. on_tick and the processing of due orders, which runs the strategy's event handlers,
+    are timed separately; market updates and matching are not part of either.
+    """
+    def __init__(self, config: TriangularArbitrageConfig, connector: SimulatedConnector, market: SyntheticMarket,
+                 duration: float = 600.0, tick_interval: float = 1.0):
+        self.config = config
+        self.connector = connector
+        self.market = market
+        self.duration = duration
+        self.tick_interval = tick_interval
+
+    def run(self) -> LoadTestResult:
+        strategy = BacktestStrategy(self.config, self.connector)
+        result = LoadTestResult(start_balance=self.connector.get_balance(self.config.holding_asset))
+        clock = time.perf_counter
+        started = clock()
+        timestamp = 0.0
+        self.market.advance(timestamp)
+        strategy.on_tick()
+        while timestamp < self.duration:
+            timestamp += self.tick_interval
+            self.market.advance(timestamp)
+            strategy.set_timestamp(timestamp)
+            lap = clock()
+            self.connector.process_orders(timestamp)
+            result.event_latency.record(clock() - lap)
+            lap = clock()
+            strategy.on_tick()
+            result.tick_latency.record(clock() - lap)
+            lap = clock()
+            self.connector.process_orders(timestamp)
+            result.event_latency.record(clock() - lap)
+            result.ticks += 1
+        # Let the cycle in flight at the end of the run finish without starting new ones.
+        while self.connector.has_pending_orders:
+            timestamp += self.tick_interval
+            strategy.set_timestamp(timestamp)
+            self.connector.process_orders(timestamp)
+        strategy.stop()
+
+        result.elapsed = clock() - started
+        result.simulated_time = timestamp
+        result.book_updates = self.market.updates
+        collect_results(result, strategy, self.connector)
+        return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test EnhancedTriangularArbitrage against a simulated exchange.")
+    parser.add_argument("--duration", type=float, default=600.0, help="Simulated seconds to run")
+    parser.add_argument("--tick", type=float, default=0.1, help="Tick interval in seconds")
+    parser.add_argument("--update-rate", type=float, default=20.0, help="Book updates per pair per simulated second")
+    parser.add_argument("--volatility", type=float, default=0.0002, help="Standard deviation of a price move per update")
+    parser.add_argument("--mispricing", type=float, default=0.002,
+                        help="Standard deviation of a quote's deviation from the cross rate")
+    parser.add_argument("--reversion", type=float, default=0.05, help="Share of the deviation that decays per update")
+    parser.add_argument("--depth", type=int, default=20, help="Levels per book side")
+    parser.add_argument("--price", action="append", default=[], help="Asset price in the numeraire as ASSET=PRICE")
+    add_exchange_arguments(parser, latency=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra order latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability that an order is rejected")
+    parser.add_argument("--fills-per-order", type=int, default=1, help="Fill events per order")
+    parser.add_argument("--consume-liquidity", action="store_true", help="Take filled amounts off the books")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    config = TriangularArbitrageConfig()
+    pairs = sorted({config.first_pair, config.second_pair, config.third_pair, *config.route_pair_list,
+                    *config.scan_trading_pair_list})
+    prices = dict(DEFAULT_PRICES)
+    prices.update((asset, float(price)) for asset, price in (entry.split("=") for entry in args.price))
+    balances = parse_balances(args.balance)
+    fill_model = FillModel(args.consume_liquidity, args.fills_per_order, args.failure_rate, args.jitter, args.seed)
+    connector = SimulatedConnector(pairs, balances or {config.holding_asset: Decimal("10000")}, args.fee,
+                                   order_latency=args.latency, fill_model=fill_model)
+    market = SyntheticMarket(connector, prices, args.update_rate, args.volatility, args.mispricing,
+                             args.reversion, depth=args.depth, seed=args.seed)
+    market.seed_books()
+
+    result = LoadTest(config, connector, market, args.duration, args.tick).run()
+    for line in result.format():
+        print(line)
+
+if __name__ == "__main__":
+    main()
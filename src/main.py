@@ -1,6 +1,6 @@
 import logging
 from decimal import Decimal
-from typing import Dict, Tuple, List, Optional
+from typing import TYPE_CHECKING, Dict, Tuple, List, Optional, Set
 from dataclasses import dataclass
 
 from hummingbot.core.data_type.order_candidate import OrderCandidate
@@ -11,76 +11,258 @@ from hummingbot.core.event.events import (
     BuyOrderCompletedEvent,
     SellOrderCompletedEvent,
     MarketOrderFailureEvent,
+    OrderCancelledEvent,
     OrderFilledEvent,
+    OrderBookEvent,
 )
+from hummingbot.core.event.event_forwarder import SourceInfoEventForwarder
 from hummingbot.core.data_type.common import OrderType, TradeType
-from hummingbot.core.utils.estimate_fee import estimate_fee
+from hummingbot.core.clock import Clock
 
+from async_logging import AsyncLogging, LogSampler
+from arbitrage_cycle import ArbitrageCycle, LatencyStats, StateTimer
+from balance_ledger import BalanceLedger
+from book_version_cache import BookVersionCache
 from config import TriangularArbitrageConfig
+from evaluation_scheduler import EvaluationScheduler
 from exceptions import InvalidTradingPairError, InsufficientBalanceError, OrderPlacementError
-from order_book_analyzer import DefaultOrderBookAnalyzer
+from fee_schedule import FeeSchedule, parse_fee_overrides
+from fixed_point import FixedPointOrderBookAnalyzer
+from latency_histogram import LatencyProfiler
+from order_book_analyzer import DefaultOrderBookAnalyzer, OrderBookAnalyzer
+from request_scheduler import BALANCE, CANCEL, FEES, ORDER, RequestScheduler, parse_rate_limits
+from risk_engine import RiskEngine
+from route import Route, RouteCompiler, RouteLeg
+from top_of_book_filter import TopOfBookFilter
+from trade_sizer import TradeSizer
+from triangle_discovery import RankedDirection, Triangle, TriangleDiscovery, TriangleRanker, build_cycle, get_order_sides
 from utils import split_trading_pair
+from vectorized_order_book_analyzer import VectorizedOrderBookAnalyzer
+from warm_start import WarmStartCache
+
+if TYPE_CHECKING:
+    # Imported where the optional features start, so a strategy without them does not load their dependencies.
+    from market_data_capture import MarketDataCapture
+    from opportunity_journal import OpportunityJournal
+    from sharded_evaluation import ShardedEvaluator
+
+# Stages summarized in format_status; the Prometheus export has all of them.
+STATUS_LATENCY_STAGES = ("tick.total", "tick.find_opportunity", "shard.publish", "shard.evaluate", "profit.bound", "profit.book_versions",
+                         "profit.order_amount", "profit.depth_walk", "profit.fees", "profit.fixed_point", "candidate.quantize",
+                         "order.adjust_candidate")
 
 @dataclass
 class ArbitrageOpportunity:
     direction: str
     profit: Decimal
     order_amounts: List[Decimal]
+    trading_pair: Tuple[str, ...] = ()
+    order_side: Tuple[TradeType, ...] = ()
+    order_size: Decimal = Decimal("0")
+    route: Optional[Route] = None
 
 class EnhancedTriangularArbitrage(StrategyBase):
     def __init__(self, config: TriangularArbitrageConfig):
         super().__init__()
         self.config = config
         self.logger = logging.getLogger(__name__)
-        self.status: str = "NOT_INIT"
-        self.trading_pair: Dict[str, Tuple[str, str, str]] = {}
-        self.order_side: Dict[str, Tuple[TradeType, TradeType, TradeType]] = {}
+        self.log_sampler = LogSampler(self.config.log_sample_interval, self.config.log_sample_every)
+        self.state_timer = StateTimer()
+        self.status = "NOT_INIT"
+        self.trading_pair: Dict[str, Tuple[str, ...]] = {}
+        self.order_side: Dict[str, Tuple[TradeType, ...]] = {}
         self.profit: Dict[str, Decimal] = {"direct": Decimal("0"), "reverse": Decimal("0")}
         self.order_amount: Dict[str, List[Decimal]] = {"direct": [], "reverse": []}
-        self.profitable_direction: str = ""
         self.place_order_trials_count: int = 0
         self.place_order_trials_limit: int = 10
         self.place_order_failure: bool = False
-        self.order_candidate: Optional[OrderCandidate] = None
-        self.initial_spent_amount: Decimal = Decimal("0")
+        self.total_spent_amount: Decimal = Decimal("0")
         self.total_profit: Decimal = Decimal("0")
         self.total_profit_pct: Decimal = Decimal("0")
-        self.markets = {self.config.connector_name: {self.config.first_pair, self.config.second_pair, self.config.third_pair}}
-        self.order_book_analyzer = DefaultOrderBookAnalyzer(self.connector)
-        self.pending_orders: List[OrderCandidate] = []
-        self.current_order_index: int = 0
-        self.order_ids: List[str] = []
-        self.active_order_id: Optional[str] = None
+        self.cycle_profit: Decimal = Decimal("0")
+        self.markets = {self.config.connector_name: self.config.market_pairs}
+        self.depth_arrays = self.create_depth_arrays()
+        self.order_book_analyzer = self.create_order_book_analyzer()
+        self.route_compiler = RouteCompiler(self.order_book_analyzer, self.config.holding_asset)
+        self.routes: Dict[str, Route] = {}
+        self.triangles: List[Triangle] = []
+        self.triangle_ranker = TriangleRanker(self.connector)
+        self.triangle_ranking: List[RankedDirection] = []
+        self.book_version_cache = BookVersionCache(self.connector)
+        self.trade_sizer = TradeSizer(self.connector, self.depth_arrays)
+        self.fee_schedule = FeeSchedule(self.connector, self.config.connector_name,
+                                        parse_fee_overrides(self.config.fee_overrides), self.config.fee_refresh_interval)
+        self.top_of_book_filter = TopOfBookFilter(self.connector, self.fee_schedule, self.book_version_cache)
+        self.available_holding_balance: Decimal = Decimal("0")
+        self.balance_ledger = BalanceLedger(self.connector, self.config.balance_reconcile_interval)
+        self.evaluation_scheduler = EvaluationScheduler(self.evaluate_triangle_update, self.book_version_cache.start_tick)
+        # Event publishers hold listeners weakly, so the forwarder must live as long as the strategy.
+        self._order_book_forwarder = SourceInfoEventForwarder(self.did_update_order_book)
+        # Cycles in flight, oldest first, and the cycle each of their orders belongs to.
+        self.cycles: List[ArbitrageCycle] = []
+        self.cycle_by_order_id: Dict[str, ArbitrageCycle] = {}
+        self.cycles_started: int = 0
+        self.peak_cycles: int = 0
+        self.cycle_latency: Dict[str, LatencyStats] = {"sequential": LatencyStats(), "concurrent": LatencyStats()}
+        self.cycle_timeouts: int = 0
+        self.recovery_latency = LatencyStats()
+        self.unwind_cost: Decimal = Decimal("0")
+        self.last_unwind_cost: Decimal = Decimal("0")
+        self.risk_engine = RiskEngine(self.config.risk_window, self.config.kill_switch_enabled, self.config.kill_switch_rate,
+                                      self.config.max_drawdown, self.config.max_fill_slippage,
+                                      self.config.max_order_failure_rate)
+        self.request_scheduler = self.create_request_scheduler()
+        self.latency_profiler = LatencyProfiler(self.config.latency_profiling_enabled, self.config.prometheus_export_path,
+                                                self.config.prometheus_export_interval)
+        self.market_data_capture = self.create_market_data_capture()
+        self.opportunity_journal = self.create_opportunity_journal()
+        self.sharded_evaluator: Optional["ShardedEvaluator"] = None
+        self._sharded_fee_version: int = -1
+        self.async_logging = self.create_async_logging()
+        self.warm_start_cache: Optional[WarmStartCache] = None
+        if self.config.warm_start_cache_path:
+            self.warm_start_cache = WarmStartCache(self.config.warm_start_cache_path, self.get_warm_start_key())
         self._add_markets(self.markets)
 
     @property
     def connector(self):
         return self.connectors[self.config.connector_name]
 
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, status: str):
+        self._status = status
+        self.state_timer.enter(status, self.current_timestamp)
+
+    def create_depth_arrays(self) -> VectorizedOrderBookAnalyzer:
+        """
+        The per-book-version depth arrays of the connector's books, used by the trade sizer and the numpy analyzer.
+        """
+        return VectorizedOrderBookAnalyzer(self.connector)
+
+    def create_request_scheduler(self) -> RequestScheduler:
+        """
+        The token buckets of the connector's rate limits, which orders, cancels and refreshes draw from.
+        """
+        return RequestScheduler(parse_rate_limits(self.config.rate_limits), self.config.rate_limit_reserve)
+
+    def create_market_data_capture(self) -> Optional["MarketDataCapture"]:
+        if not self.config.market_data_capture_enabled:
+            return None
+        from market_data_capture import MarketDataCapture
+        return MarketDataCapture(self.connector, list(self.markets[self.config.connector_name]),
+                                 self.config.market_data_capture_dir, depth=self.config.market_data_capture_depth)
+
+    def create_opportunity_journal(self) -> Optional["OpportunityJournal"]:
+        if not self.config.opportunity_journal_path:
+            return None
+        from opportunity_journal import OpportunityJournal
+        return OpportunityJournal(self.config.opportunity_journal_path)
+
+    def create_async_logging(self) -> Optional[AsyncLogging]:
+        if self.config.log_mode != "async":
+            return None
+        return AsyncLogging([self.logger, self.balance_ledger.logger], self.config.log_queue_size)
+
+    def start_services(self):
+        """
+        Starts the writer threads of the market data capture and the opportunity journal.
+        """
+        if self.market_data_capture is not None:
+            self.market_data_capture.start()
+        if self.opportunity_journal is not None:
+            self.opportunity_journal.start()
+
+    def stop_services(self):
+        if self.market_data_capture is not None:
+            self.market_data_capture.stop()
+        if self.opportunity_journal is not None:
+            self.opportunity_journal.stop()
+
+    def create_order_book_analyzer(self) -> OrderBookAnalyzer:
+        if self.config.order_book_analyzer == "numpy":
+            return self.depth_arrays
+        if self.config.order_book_analyzer == "fixed":
+            return FixedPointOrderBookAnalyzer(self.connector)
+        return DefaultOrderBookAnalyzer(self.connector)
+
     def on_tick(self):
         if self.status == "NOT_INIT":
             self.init_strategy()
             return
 
-        if self.arbitrage_in_progress():
-            return
+        if self.warm_start_cache is not None and self.warm_start_cache.stale:
+            self.check_warm_start_cache()
+
+        if self.market_data_capture is not None:
+            self.market_data_capture.capture(self.current_timestamp)
+        self.latency_profiler.maybe_export(self.current_timestamp)
 
+        if self.arbitrage_in_progress():
+            # A recovery cancels orders and reconciles balances; new cycles wait for the next tick.
+            if self.check_cycle_timeouts():
+                return
+        elif not self.get_account_cycles() and self.balance_ledger.is_reconcile_due(self.current_timestamp):
+            # Reconcile only between cycles, when no fills on the account can be in flight. Near the rate limit
+            # the reconciliation waits for a later tick so that orders and cancels keep their headroom.
+            if self.request_scheduler.request(BALANCE, self.current_timestamp, len(self.balance_ledger.assets)):
+                self.balance_ledger.maybe_reconcile(self.current_timestamp)
         if not self.ready_for_new_orders():
             return
 
+        profiler = self.latency_profiler
+        started = profiler.now()
         try:
+            if (self.fee_schedule.is_refresh_due(self.current_timestamp)
+                    and self.request_scheduler.request(FEES, self.current_timestamp)):
+                self.fee_schedule.maybe_refresh(self.current_timestamp)
+            self.book_version_cache.start_tick()
+            lap = profiler.lap("tick.fee_refresh", started)
+            if self.config.evaluation_mode == "event":
+                self.evaluate_missed_updates()
+                profiler.lap("tick.evaluate_updates", lap)
+                profiler.lap("tick.total", started)
+                return
             opportunity = self.find_arbitrage_opportunity()
+            lap = profiler.lap("tick.find_opportunity", lap)
             if opportunity:
                 self.start_arbitrage(opportunity)
+                profiler.lap("tick.start_arbitrage", lap)
+            profiler.lap("tick.total", started)
         except Exception as e:
             self.logger.error(f"Error in on_tick: {str(e)}")
             self.status = "NOT_ACTIVE"
 
     def init_strategy(self):
+        if self.async_logging is not None:
+            self.async_logging.start()
         try:
-            self.check_trading_pair()
-            self.set_trading_pair()
-            self.set_order_side()
+            warm_started = self.warm_start_cache is not None and self.warm_start_cache.load()
+            if warm_started:
+                self.init_from_warm_start_cache()
+            elif self.config.scan_all_triangles:
+                self.init_triangles()
+            else:
+                self.check_trading_pair()
+                self.set_trading_pair()
+                self.set_order_side()
+                self.compile_routes()
+            self.fee_schedule.refresh(self.get_watched_pairs(), self.current_timestamp)
+            if warm_started:
+                self.fee_schedule.seed(self.warm_start_cache.fees)
+            elif self.warm_start_cache is not None:
+                self.warm_start_cache.reset(self.get_cycles())
+            self.balance_ledger.track({self.config.holding_asset, *(asset for pair in self.get_watched_pairs()
+                                                                    for asset in split_trading_pair(pair))})
+            self.balance_ledger.reconcile(self.current_timestamp)
+            if self.config.evaluation_mode == "event":
+                self.init_event_driven_evaluation()
+            if self.config.scan_all_triangles and self.config.sharded_workers > 0:
+                self.init_sharded_evaluation()
+            self.start_services()
             self.status = "ACTIVE"
             self.logger.info("Strategy initialized successfully.")
         except InvalidTradingPairError as e:
@@ -91,6 +273,11 @@ class EnhancedTriangularArbitrage(StrategyBase):
             self.status = "NOT_ACTIVE"
 
     def check_trading_pair(self):
+        if self.config.route_pair_list:
+            if len(self.config.route_pair_list) < 3:
+                raise InvalidTradingPairError("A route needs at least three pairs.")
+            get_order_sides(self.config.holding_asset, self.config.route_pair_list)
+            return
         assets = set()
         for pair in [self.config.first_pair, self.config.second_pair, self.config.third_pair]:
             base, quote = split_trading_pair(pair)
@@ -100,90 +287,418 @@ class EnhancedTriangularArbitrage(StrategyBase):
                                           f"are not suitable for triangular arbitrage!")
 
     def set_trading_pair(self):
+        if self.config.route_pair_list:
+            self.trading_pair["direct"] = tuple(self.config.route_pair_list)
+            self.trading_pair["reverse"] = tuple(reversed(self.config.route_pair_list))
+            return
         all_pairs = [self.config.first_pair, self.config.second_pair, self.config.third_pair]
-        pairs_with_holding = [pair for pair in all_pairs if self.config.holding_asset in pair]
-        if len(pairs_with_holding) < 2:
-            raise InvalidTradingPairError("At least two pairs must include the holding asset.")
+        pairs_with_holding = [pair for pair in all_pairs if self.config.holding_asset in split_trading_pair(pair)]
+        if len(pairs_with_holding) != 2:
+            raise InvalidTradingPairError("Exactly two pairs must include the holding asset.")
 
-        pairs_ordered = sorted(all_pairs, key=lambda p: self.config.holding_asset in p, reverse=True)
-        self.trading_pair["direct"] = tuple(pairs_ordered)
+        cross_pair = next(pair for pair in all_pairs if pair not in pairs_with_holding)
+        pairs_ordered = (pairs_with_holding[0], cross_pair, pairs_with_holding[1])
+        self.trading_pair["direct"] = pairs_ordered
         self.trading_pair["reverse"] = tuple(reversed(pairs_ordered))
 
     def set_order_side(self):
         for direction in ["direct", "reverse"]:
-            sides = []
-            pairs = self.trading_pair[direction]
-            current_asset = self.config.holding_asset
-            for pair in pairs:
-                base, quote = split_trading_pair(pair)
-                if base == current_asset:
-                    sides.append(TradeType.SELL)
-                    current_asset = quote
-                elif quote == current_asset:
-                    sides.append(TradeType.BUY)
-                    current_asset = base
-                else:
-                    raise InvalidTradingPairError(f"Current asset {current_asset} not in pair {pair}")
-            self.order_side[direction] = tuple(sides)
+            self.order_side[direction] = get_order_sides(self.config.holding_asset, self.trading_pair[direction])
+
+    def compile_routes(self):
+        """
+        Compiles the configured route in both directions, so ticks only read precomputed legs.
+        """
+        for direction, pairs in self.trading_pair.items():
+            self.routes[direction] = self.route_compiler.get_route(pairs, self.order_side[direction])
+
+    def get_watched_pairs(self) -> List[str]:
+        if self.config.scan_all_triangles:
+            return sorted({pair for triangle in self.triangles for pair in triangle.direct_pairs})
+        return list(self.trading_pair.get("direct", ()))
+
+    def init_triangles(self):
+        """
+        Discovers every triangle through the holding asset among the pairs the connector lists.
+        """
+        self.triangles = TriangleDiscovery(self.config.holding_asset).discover(self.connector.trading_pairs)
+        if not self.triangles:
+            raise InvalidTradingPairError(f"No triangles through {self.config.holding_asset} found on "
+                                          f"{self.config.connector_name}!")
+        self.logger.info(f"Discovered {len(self.triangles)} triangles through {self.config.holding_asset}.")
+
+    def get_warm_start_key(self) -> Dict[str, object]:
+        """
+        The settings the cached cycles and fees depend on.
+        """
+        return {"connector_name": self.config.connector_name, "holding_asset": self.config.holding_asset,
+                "pairs": sorted(self.config.market_pairs), "route_pairs": self.config.route_pair_list,
+                "scan_all_triangles": self.config.scan_all_triangles, "fee_overrides": self.config.fee_overrides}
+
+    def get_cycles(self) -> List[Triangle]:
+        if self.config.scan_all_triangles:
+            return list(self.triangles)
+        return [Triangle(self.config.holding_asset, self.trading_pair["direct"], self.order_side["direct"],
+                         self.trading_pair["reverse"], self.order_side["reverse"])]
+
+    def init_from_warm_start_cache(self):
+        """
+        Takes the cycles and pair sides from the warm start cache instead of discovering and deriving them.
+        """
+        cache = self.warm_start_cache
+        if self.config.scan_all_triangles:
+            self.triangles = list(cache.cycles)
+        else:
+            cycle = cache.cycles[0]
+            self.trading_pair = {"direct": cycle.direct_pairs, "reverse": cycle.reverse_pairs}
+            self.order_side = {"direct": cycle.direct_sides, "reverse": cycle.reverse_sides}
+            self.compile_routes()
+        self.logger.info(f"Warm started {len(cache.cycles)} cycles from {cache.path}; checking them against the connector.")
+
+    def check_warm_start_cache(self):
+        """
+        Confirms the cached pairs whose live trading rules have arrived. When the last pair is confirmed,
+        triangles are rediscovered in case the listings changed and the cache is saved again.
+        """
+        cache = self.warm_start_cache
+        if not cache.check(self.connector, self.fee_schedule) or cache.stale:
+            return
+        if cache.loaded and self.config.scan_all_triangles:
+            triangles = TriangleDiscovery(self.config.holding_asset).discover(self.connector.trading_pairs)
+            if set(triangles) != set(self.triangles):
+                self.logger.warning(f"Listed triangles changed since the warm start cache was saved: "
+                                    f"{len(self.triangles)} cached, {len(triangles)} listed.")
+                self.triangles = triangles
+                if self.config.evaluation_mode == "event":
+                    self.init_event_driven_evaluation()
+                if self.config.sharded_workers > 0:
+                    self.init_sharded_evaluation()
+                cache.reset(triangles)
+                return
+        cache.save(self.fee_schedule)
+        self.logger.info(f"Warm start cache checked against the connector and saved to {cache.path}.")
+
+    def init_event_driven_evaluation(self):
+        """
+        Registers every watched triangle with the evaluation scheduler and subscribes to the books it trades.
+        """
+        if self.config.scan_all_triangles:
+            triangles = self.triangles
+        else:
+            triangles = [build_cycle(self.config.holding_asset, self.trading_pair["direct"])]
+        self.evaluation_scheduler.clear()
+        for triangle in triangles:
+            self.evaluation_scheduler.register(triangle, triangle.direct_pairs)
+        for pair in self.evaluation_scheduler.pairs:
+            self.connector.get_order_book(pair).add_listener(OrderBookEvent.TradeEvent, self._order_book_forwarder)
+
+    def init_sharded_evaluation(self):
+        """
+        Starts the worker processes that evaluate the discovered triangles on shared-memory books.
+        """
+        from sharded_evaluation import ShardedEvaluator
+        if self.sharded_evaluator is not None:
+            self.sharded_evaluator.stop()
+        self.sharded_evaluator = ShardedEvaluator(self.triangles, self.config.sharded_workers,
+                                                  self.config.sharded_book_depth)
+        self.sharded_evaluator.start()
+        self._sharded_fee_version = -1
+        self.logger.info(f"Evaluating {len(self.triangles)} triangles in {self.sharded_evaluator.workers} worker processes.")
+
+    def did_update_order_book(self, event_tag: int, order_book, event):
+        if self.market_data_capture is not None:
+            self.market_data_capture.capture_pair(event.trading_pair, self.current_timestamp)
+        self.notify_book_update(event.trading_pair)
+
+    def notify_book_update(self, pair: str):
+        """
+        Queues the triangles that trade the pair for evaluation. Connectors and hosts that see order book
+        diff and snapshot messages call this directly.
+        """
+        if self.config.evaluation_mode == "event":
+            self.evaluation_scheduler.notify(pair)
+
+    def evaluate_missed_updates(self):
+        """
+        Tick fallback of the event-driven mode: notifies the scheduler of every book whose version changed
+        since it was last seen and evaluates the queued triangles right away.
+        """
+        for pair in self.evaluation_scheduler.pairs:
+            self.evaluation_scheduler.notify_if_changed(pair, self.book_version_cache.get_book_version(pair))
+        self.evaluation_scheduler.drain()
+
+    def evaluate_triangle_update(self, triangle: Triangle):
+        if not self.ready_for_new_orders() or not self.get_busy_pairs().isdisjoint(triangle.direct_pairs):
+            return
+        try:
+            opportunity = self.evaluate_triangle(triangle)
+            if opportunity:
+                self.start_arbitrage(opportunity)
+        except Exception as e:
+            self.logger.error(f"Error evaluating {triangle.name}: {str(e)}")
+            self.status = "NOT_ACTIVE"
+
+    def evaluate_triangle(self, triangle: Triangle) -> Optional[ArbitrageOpportunity]:
+        best_opportunity = None
+        for direction in ("direct", "reverse"):
+            route = self.route_compiler.get_route(triangle.pairs(direction), triangle.sides(direction))
+            profit, amounts, size = self.get_profit(route)
+            if profit >= self.config.min_profitability and (best_opportunity is None or profit > best_opportunity.profit):
+                best_opportunity = self.create_opportunity(direction, route, profit, amounts, size)
+        return best_opportunity
+
+    @staticmethod
+    def create_opportunity(direction: str, route: Route, profit: Decimal, amounts: List[Decimal],
+                           size: Decimal) -> ArbitrageOpportunity:
+        return ArbitrageOpportunity(direction, profit, amounts, route.trading_pairs, route.order_sides, size, route)
 
     def find_arbitrage_opportunity(self) -> Optional[ArbitrageOpportunity]:
-        direct_profit, direct_amounts = self.calculate_profit(self.trading_pair["direct"], self.order_side["direct"])
-        reverse_profit, reverse_amounts = self.calculate_profit(self.trading_pair["reverse"], self.order_side["reverse"])
+        if self.sharded_evaluator is not None:
+            return self.find_sharded_opportunity()
+        if self.config.scan_all_triangles:
+            return self.find_triangle_opportunity()
+
+        if not self.get_busy_pairs().isdisjoint(self.routes["direct"].trading_pairs):
+            return None
+        direct_profit, direct_amounts, direct_size = self.get_profit(self.routes["direct"])
+        reverse_profit, reverse_amounts, reverse_size = self.get_profit(self.routes["reverse"])
 
-        self.logger.info(f"Direct profit: {round(direct_profit, 2)}%, Reverse profit: {round(reverse_profit, 2)}%")
+        self.log_sampler.log(self.logger, logging.INFO, "Direct profit: %.2f%%, Reverse profit: %.2f%%",
+                             direct_profit, reverse_profit)
 
         if direct_profit >= self.config.min_profitability and direct_profit >= reverse_profit:
-            return ArbitrageOpportunity("direct", direct_profit, direct_amounts)
+            return ArbitrageOpportunity("direct", direct_profit, direct_amounts, order_size=direct_size)
         elif reverse_profit >= self.config.min_profitability:
-            return ArbitrageOpportunity("reverse", reverse_profit, reverse_amounts)
+            return ArbitrageOpportunity("reverse", reverse_profit, reverse_amounts, order_size=reverse_size)
         return None
 
-    def calculate_profit(self, trading_pair: Tuple[str, str, str], order_side: Tuple[TradeType, TradeType, TradeType]) -> Tuple[Decimal, List[Decimal]]:
-        exchanged_amount = self.config.order_amount_in_holding_asset
+    def find_triangle_opportunity(self) -> Optional[ArbitrageOpportunity]:
+        """
+        Ranks every discovered triangle by its top-of-book rate and walks the depth of the best
+        max_depth_walks_per_tick directions only.
+
+        :return: The most profitable opportunity above min_profitability, if any
+        """
+        busy_pairs = self.get_busy_pairs()
+        triangles = [triangle for triangle in self.triangles if busy_pairs.isdisjoint(triangle.direct_pairs)] \
+            if busy_pairs else self.triangles
+        self.triangle_ranking = self.triangle_ranker.rank(triangles, self.config.max_depth_walks_per_tick)
+        best_opportunity = None
+        for ranked in self.triangle_ranking:
+            route = self.route_compiler.get_route(ranked.triangle.pairs(ranked.direction), ranked.triangle.sides(ranked.direction))
+            profit, amounts, size = self.get_profit(route)
+            if profit >= self.config.min_profitability and (best_opportunity is None or profit > best_opportunity.profit):
+                best_opportunity = self.create_opportunity(ranked.direction, route, profit, amounts, size)
+
+        if best_opportunity:
+            self.log_sampler.log(self.logger, logging.INFO, "Best triangle %s profit: %.2f%%",
+                                 best_opportunity.route.name, best_opportunity.profit)
+        return best_opportunity
+
+    def find_sharded_opportunity(self) -> Optional[ArbitrageOpportunity]:
+        """
+        Publishes the changed books to the shard workers, collects the routes they estimate above
+        min_profitability and evaluates the best max_depth_walks_per_tick of them exactly.
+
+        :return: The most profitable opportunity above min_profitability, if any
+        """
+        evaluator = self.sharded_evaluator
+        started = self.latency_profiler.now()
+        evaluator.publish_books(self.connector)
+        if self._sharded_fee_version != self.fee_schedule.version:
+            multipliers = {}
+            for route_id in range(2 * len(evaluator.triangles)):
+                triangle, direction = evaluator.get_route(route_id)
+                multipliers[route_id] = self.fee_schedule.get_multipliers(triangle.pairs(direction), triangle.sides(direction))
+            evaluator.set_fee_multipliers(multipliers)
+            self._sharded_fee_version = self.fee_schedule.version
+        lap = self.latency_profiler.lap("shard.publish", started)
+        candidates = evaluator.evaluate(float(self.config.order_amount_in_holding_asset),
+                                        float(self.config.min_profitability))
+        self.latency_profiler.lap("shard.evaluate", lap)
+
+        busy_pairs = self.get_busy_pairs()
+        if busy_pairs:
+            candidates = [candidate for candidate in candidates
+                          if busy_pairs.isdisjoint(evaluator.get_route(candidate.route_id)[0].direct_pairs)]
+        best_opportunity = None
+        for candidate in candidates[:self.config.max_depth_walks_per_tick]:
+            triangle, direction = evaluator.get_route(candidate.route_id)
+            route = self.route_compiler.get_route(triangle.pairs(direction), triangle.sides(direction))
+            profit, amounts, size = self.get_profit(route)
+            if profit >= self.config.min_profitability and (best_opportunity is None or profit > best_opportunity.profit):
+                best_opportunity = self.create_opportunity(direction, route, profit, amounts, size)
+
+        if best_opportunity:
+            self.log_sampler.log(self.logger, logging.INFO, "Best triangle %s profit: %.2f%%",
+                                 best_opportunity.route.name, best_opportunity.profit)
+        return best_opportunity
+
+    def get_profit(self, route: Route) -> Tuple[Decimal, List[Decimal], Decimal]:
+        """
+        Returns evaluate_route for the route, reusing the last result while none of its order books changed.
+        Routes whose top-of-book bound is below min_profitability are not walked; they return the bound
+        as profit and no order amounts. Routes through pairs the warm start cache has not confirmed yet
+        return -100 like other routes that cannot be traded.
+        """
+        if self.config.top_of_book_filter_enabled:
+            started = self.latency_profiler.now()
+            passed, bound = self.top_of_book_filter.check(route, float(self.config.min_profitability))
+            self.latency_profiler.lap("profit.bound", started)
+            if not passed:
+                result = Decimal(repr(bound)), [], Decimal("0")
+                self.journal_evaluation(route, result, bound=True)
+                return result
+
+        if self.warm_start_cache is not None and not self.warm_start_cache.is_confirmed(route.trading_pairs):
+            # The depth walk quantizes with trading rules the connector has not loaded yet.
+            return Decimal("-100"), [], Decimal("0")
+
+        if not self.config.evaluation_cache_enabled:
+            result = self.evaluate_route(route)
+            self.journal_evaluation(route, result)
+            return result
+
+        key = (route.trading_pairs, route.order_sides, self.get_order_size_bound(), self.fee_schedule.version)
+        started = self.latency_profiler.now()
+        versions = self.book_version_cache.get_versions(route.trading_pairs)
+        self.latency_profiler.lap("profit.book_versions", started)
+        result = self.book_version_cache.lookup(key, versions)
+        if result is None:
+            result = self.evaluate_route(route)
+            self.book_version_cache.store(key, versions, result)
+        self.journal_evaluation(route, result)
+        return result
+
+    def journal_evaluation(self, route: Route, result: Tuple[Decimal, List[Decimal], Decimal], bound: bool = False):
+        if self.opportunity_journal is not None:
+            profit, order_amounts, order_size = result
+            self.opportunity_journal.record(self.current_timestamp, route, profit, order_amounts, order_size,
+                                            self.book_version_cache.get_versions(route.trading_pairs), bound)
+
+    def evaluate_route(self, route: Route) -> Tuple[Decimal, List[Decimal], Decimal]:
+        """
+        Picks the order size for the route and calculates its profit at that size.
+
+        :return: The profit in percent, the order amount of each leg and the order size in the holding asset
+        """
+        order_size = self.config.order_amount_in_holding_asset
+        if self.config.optimal_sizing_enabled:
+            started = self.latency_profiler.now()
+            sizing = self.trade_sizer.get_optimal_size(route.trading_pairs, route.order_sides,
+                                                       self.fee_schedule.get_multipliers(route.trading_pairs, route.order_sides),
+                                                       self.get_order_size_bound(), self.config.min_profitability)
+            self.latency_profiler.lap("profit.sizing", started)
+            if sizing is None:
+                self.logger.debug(f"No order size on {route.name} satisfies the trading rules.")
+                return Decimal("-100"), [], Decimal("0")
+            order_size = Decimal(str(sizing.input_amount))
+        profit, order_amounts = self.calculate_route_profit(route, order_size)
+        return profit, order_amounts, order_size
+
+    def get_order_size_bound(self) -> Decimal:
+        if not self.config.optimal_sizing_enabled:
+            return self.config.order_amount_in_holding_asset
+        if self.config.max_order_amount > 0:
+            return min(self.available_holding_balance, self.config.max_order_amount)
+        return self.available_holding_balance
+
+    def calculate_profit(self, trading_pair: Tuple[str, ...], order_side: Tuple[TradeType, ...],
+                         order_size: Optional[Decimal] = None) -> Tuple[Decimal, List[Decimal]]:
+        """
+        calculate_route_profit for the route through the given pairs and sides, compiled on first use.
+        """
+        return self.calculate_route_profit(self.route_compiler.get_route(tuple(trading_pair), tuple(order_side)), order_size)
+
+    def calculate_route_profit(self, route: Route, order_size: Optional[Decimal] = None) -> Tuple[Decimal, List[Decimal]]:
+        """
+        :return: The profit in percent and the order amount of each leg, for routes of any length
+        """
+        start_amount = order_size if order_size is not None else self.config.order_amount_in_holding_asset
+        # Stage times are summed over the legs and recorded once per call to keep the overhead low.
+        clock = self.latency_profiler.clock
+        started = clock()
+        fee_multipliers = self.fee_schedule.get_multipliers(route.trading_pairs, route.order_sides)
+        fee_time = clock() - started
+        if isinstance(self.order_book_analyzer, FixedPointOrderBookAnalyzer):
+            started = self.latency_profiler.now()
+            result = self.order_book_analyzer.calculate_route(route.trading_pairs, route.order_sides, start_amount,
+                                                              fee_multipliers)
+            self.latency_profiler.lap("profit.fixed_point", started)
+            if result is not None:
+                return result
+        exchanged_amount = start_amount
         order_amounts = []
+        order_amount_time = depth_walk_time = 0.0
 
-        for i in range(3):
-            pair = trading_pair[i]
-            side = order_side[i]
-            amount = self.order_book_analyzer.get_order_amount_from_exchanged_amount(pair, side, exchanged_amount)
+        for leg, fee_multiplier in zip(route.legs, fee_multipliers):
+            started = clock()
+            # Walks the depth for BUY legs and quantizes the amount to the trading rules.
+            amount = leg.get_order_amount(leg.trading_pair, leg.side, exchanged_amount)
+            lap = clock()
+            order_amount_time += lap - started
             if amount == Decimal("0"):
-                self.logger.debug(f"Order amount on {pair} is too low after quantization.")
+                self.logger.debug(f"Order amount on {leg.trading_pair} is too low after quantization.")
                 return Decimal("-100"), []
             order_amounts.append(amount)
-            exchanged_amount = self.connector.get_quote_volume_for_base_amount(pair, side, amount).result_volume
+            if leg.is_buy:
+                exchanged_amount = amount * fee_multiplier
+            else:
+                exchanged_amount = leg.get_quote_volume(leg.trading_pair, leg.side, amount) * fee_multiplier
+                depth_walk_time += clock() - lap
+        self.latency_profiler.record("profit.order_amount", order_amount_time)
+        self.latency_profiler.record("profit.depth_walk", depth_walk_time)
+        self.latency_profiler.record("profit.fees", fee_time)
 
-            fee = estimate_fee(self.config.connector_name, is_maker=False)
-            exchanged_amount -= fee.percent * exchanged_amount
-
-        start_amount = self.config.order_amount_in_holding_asset
         end_amount = exchanged_amount
         profit = ((end_amount - start_amount) / start_amount) * 100
 
         return profit, order_amounts
 
     def start_arbitrage(self, opportunity: ArbitrageOpportunity):
-        self.logger.info(f"Starting arbitrage in {opportunity.direction} direction with expected profit {opportunity.profit}%")
-        self.profitable_direction = opportunity.direction
-        self.pending_orders = []
-
-        for i in range(3):
-            pair = self.trading_pair[opportunity.direction][i]
-            side = self.order_side[opportunity.direction][i]
-            amount = opportunity.order_amounts[i]
-            candidate = self.create_order_candidate(pair, side, amount)
+        self.logger.info(f"Starting arbitrage in {opportunity.direction} direction with expected profit {opportunity.profit}% "
+                         f"on {opportunity.order_size} {self.config.holding_asset}")
+        route = self.get_opportunity_route(opportunity)
+        candidates = []
+        for leg, amount in zip(route.legs, opportunity.order_amounts):
+            candidate = self.create_order_candidate(leg.trading_pair, leg.side, amount)
             if candidate is None:
-                self.logger.error(f"Could not create order candidate for pair {pair}. Aborting arbitrage.")
+                self.logger.error(f"Could not create order candidate for pair {leg.trading_pair}. Aborting arbitrage.")
                 return
-            self.pending_orders.append(candidate)
+            candidates.append(candidate)
+
+        concurrent = (self.config.execution_mode == "concurrent"
+                      and self.has_balance_for_all_legs(route, candidates))
+        cycle = ArbitrageCycle(opportunity.direction, candidates, concurrent, route, self.current_timestamp)
+        # Sequential cycles spend inventory on the first leg only; later legs spend what the previous one bought.
+        for leg_index, (leg, candidate) in enumerate(zip(route.legs, candidates)):
+            if concurrent or leg_index == 0:
+                cycle.reserve(leg_index, leg.spent_asset, self.get_spent_amount(leg, candidate))
+        self.cycles.append(cycle)
+        self.cycles_started += 1
+        self.peak_cycles = max(self.peak_cycles, len(self.cycles))
+        self.update_status()
+        if concurrent:
+            self.place_all_orders(cycle)
+        else:
+            self.place_next_order(cycle)
 
-        self.current_order_index = 0
-        self.status = "ARBITRAGE_STARTED"
-        self.place_next_order()
+    def get_opportunity_route(self, opportunity: ArbitrageOpportunity) -> Route:
+        if opportunity.route is not None:
+            return opportunity.route
+        if opportunity.trading_pair:
+            return self.route_compiler.get_route(opportunity.trading_pair, opportunity.order_side)
+        return self.routes[opportunity.direction]
 
     def create_order_candidate(self, pair: str, side: TradeType, amount: Decimal) -> Optional[OrderCandidate]:
-        price = self.connector.get_price_for_volume(pair, side, amount).result_price
-        price_quantized = self.connector.quantize_order_price(pair, Decimal(price))
-        amount_quantized = self.connector.quantize_order_amount(pair, Decimal(amount))
+        started = self.latency_profiler.now()
+        price = self.connector.get_price_for_volume(pair, side == TradeType.BUY, amount).result_price
+        lap = self.latency_profiler.lap("candidate.price_for_volume", started)
+        # The fixed-point analyzer quantizes exactly like the connector, without Decimal division.
+        quantizer = self.order_book_analyzer if isinstance(self.order_book_analyzer, FixedPointOrderBookAnalyzer) else self.connector
+        price_quantized = quantizer.quantize_order_price(pair, Decimal(price))
+        amount_quantized = quantizer.quantize_order_amount(pair, Decimal(amount))
+        self.latency_profiler.lap("candidate.quantize", lap)
 
         if amount_quantized == Decimal("0"):
             self.logger.info(f"Order amount on {pair} is too low to place an order after quantization.")
@@ -198,36 +713,299 @@ class EnhancedTriangularArbitrage(StrategyBase):
             price=price_quantized
         )
 
-    def place_next_order(self):
+    @staticmethod
+    def get_spent_amount(leg: RouteLeg, candidate: OrderCandidate) -> Decimal:
+        return candidate.amount * candidate.price if leg.is_buy else candidate.amount
+
+    def has_balance_for_all_legs(self, route: Route, candidates: List[OrderCandidate]) -> bool:
         """
-        Places the next order in the arbitrage sequence.
+        Checks whether the balances of every asset the cycle spends cover all legs at once,
+        which is required to submit the legs concurrently. Balances committed to other cycles
+        in flight do not count.
         """
-        if self.current_order_index >= len(self.pending_orders):
-            self.logger.info("All orders have been placed.")
-            self.status = "ACTIVE"
-            self.calculate_total_profit()
+        required: Dict[str, Decimal] = {}
+        for leg, candidate in zip(route.legs, candidates):
+            required[leg.spent_asset] = required.get(leg.spent_asset, Decimal("0")) + self.get_spent_amount(leg, candidate)
+        return all(self.get_free_balance(asset) >= amount for asset, amount in required.items())
+
+    def get_free_balance(self, asset: str) -> Decimal:
+        """
+        :return: The ledger balance of the asset minus what the cycles in flight on the account committed of it
+        """
+        balance = self.balance_ledger.get_available_balance(asset)
+        for cycle in self.get_account_cycles():
+            balance -= cycle.get_committed(asset)
+        return balance
+
+    def get_account_cycles(self) -> List[ArbitrageCycle]:
+        """
+        :return: The cycles in flight on the account the strategy trades, which are its own unless it shares the account
+        """
+        return self.cycles
+
+    def get_busy_pairs(self) -> Set[str]:
+        """
+        :return: The pairs a cycle in flight has still to trade. Routes through them are not evaluated,
+                 since their books still hold the liquidity those legs are sized to take.
+        """
+        busy: Set[str] = set()
+        for cycle in self.cycles:
+            busy |= cycle.open_pairs
+        return busy
+
+    def place_all_orders(self, cycle: ArbitrageCycle):
+        """
+        Submits every leg of the cycle at once. If a leg cannot be placed, the legs already placed are
+        cancelled and the cycle is unwound.
+        """
+        for leg_index, candidate in enumerate(cycle.candidates):
+            order_id = self.process_candidate(candidate)
+            if order_id is None:
+                self.logger.error(f"Failed to process order candidate for {candidate.trading_pair}. Unwinding cycle.")
+                cycle.failed = True
+                self.abort_cycle(cycle)
+                return
+            self.add_cycle_order(cycle, order_id, leg_index)
+
+    def add_cycle_order(self, cycle: ArbitrageCycle, order_id: str, leg_index: Optional[int] = None):
+        """
+        Registers an order of the cycle, a leg or, without leg_index, an unwind or recovery order.
+        """
+        if leg_index is None:
+            cycle.add_unwind_order(order_id, self.current_timestamp)
+        else:
+            cycle.add_order(order_id, leg_index, self.current_timestamp)
+        self.cycle_by_order_id[order_id] = cycle
+
+    def get_cycle(self, order_id: str) -> Optional[ArbitrageCycle]:
+        return self.cycle_by_order_id.get(order_id)
+
+    def finish_cycle(self, cycle: ArbitrageCycle):
+        """
+        Records the latency of the completed cycle and frees its slot for the next one.
+        """
+        mode = "concurrent" if cycle.concurrent else "sequential"
+        self.cycle_latency[mode].record(cycle.latency)
+        self.logger.info(f"All orders have been completed in {cycle.latency * 1000:.1f}ms ({mode}).")
+        self.calculate_total_profit(cycle)
+        self.remove_cycle(cycle)
+
+    def abort_cycle(self, cycle: ArbitrageCycle):
+        """
+        Cancels the open legs of a failed concurrent cycle and reverts the legs that already completed.
+        The strategy stops once every cancel and unwind order has settled.
+        """
+        for order_id in list(cycle.open_order_ids):
+            self.cancel_order(order_id)
+            self.logger.info(f"Cancelling order {order_id} of failed cycle.")
+        for leg_index in sorted(cycle.completed_legs):
+            self.unwind_leg(cycle, leg_index)
+        cycle.completed_legs.clear()
+        self.settle_failed_cycle(cycle)
+
+    def settle_failed_cycle(self, cycle: ArbitrageCycle):
+        if cycle.is_settled:
+            self.logger.info("Failed cycle settled. Stopping new arbitrages.")
+            self.status = "NOT_ACTIVE"
+            self.close_cycle(cycle)
+
+    def unwind_leg(self, cycle: ArbitrageCycle, leg_index: int):
+        """
+        Places the opposite order of a completed leg to return its assets.
+        """
+        leg = cycle.candidates[leg_index]
+        side = TradeType.SELL if leg.order_side == TradeType.BUY else TradeType.BUY
+        candidate = self.create_order_candidate(leg.trading_pair, side, leg.amount)
+        order_id = self.process_candidate(candidate) if candidate is not None else None
+        if order_id is None:
+            self.logger.error(f"Could not unwind leg on {leg.trading_pair}. Manual intervention required.")
+            return
+        self.add_cycle_order(cycle, order_id)
+        self.logger.info(f"Unwinding leg on {leg.trading_pair} with {side.name} {candidate.amount}.")
+
+    def check_cycle_timeouts(self) -> bool:
+        """
+        Starts the recovery of each cycle whose oldest open leg is older than leg_timeout or which is
+        older than cycle_timeout, and drives running recoveries that wait for cancels or unwind orders.
+
+        :return: True if a cycle was recovering during the call
+        """
+        recovering = False
+        for cycle in list(self.cycles):
+            if cycle.timed_out:
+                self.advance_recovery(cycle)
+                recovering = True
+            elif self.current_timestamp >= cycle.get_deadline(self.config.leg_timeout, self.config.cycle_timeout):
+                self.start_recovery(cycle)
+                recovering = True
+        return recovering
+
+    def start_recovery(self, cycle: ArbitrageCycle):
+        """
+        Cancels the open orders of a timed out cycle. Once they settled, or leg_timeout later, the position
+        is checked against the connector and converted back to the holding asset by advance_recovery.
+        """
+        now = self.current_timestamp
+        self.cycle_timeouts += 1
+        cycle.timed_out_at = now
+        cycle.recovery_deadline = now + self.config.leg_timeout
+        self.update_status()
+        self.logger.warning(f"Arbitrage cycle timed out after {now - cycle.started_timestamp:.1f}s with "
+                            f"{len(cycle.completed_legs)} of {len(cycle.candidates)} legs completed. Recovering position.")
+        for order_id in sorted(cycle.open_order_ids | cycle.unwind_order_ids):
+            self.cancel_order(order_id)
+            self.logger.info(f"Cancelling order {order_id} of timed out cycle.")
+        self.advance_recovery(cycle)
+
+    def advance_recovery(self, cycle: ArbitrageCycle):
+        """
+        Places the next order that converts what the timed out cycle holds back to the holding asset,
+        or ends the recovery once only dust is left.
+        """
+        if not cycle.timed_out or cycle not in self.cycles:
+            return
+        now = self.current_timestamp
+        pending = cycle.open_order_ids | cycle.unwind_order_ids
+        if pending:
+            if now < cycle.recovery_deadline:
+                return
+            self.logger.warning(f"Orders {', '.join(sorted(pending))} did not settle in time. Checking balances.")
+            cycle.open_order_ids.clear()
+            cycle.unwind_order_ids.clear()
+        if self.config.cycle_timeout > 0 and now >= cycle.timed_out_at + self.config.cycle_timeout:
+            self.fail_recovery(cycle, "Timed out cycle could not be recovered within cycle_timeout.")
+            return
+
+        # Fills whose events never arrived only show up in the connector's balances. While other cycles
+        # are in flight the difference could be theirs, so it is only attributed to a cycle running alone.
+        if len(self.get_account_cycles()) == 1:
+            route_assets = {leg.spent_asset for leg in cycle.route.legs}
+            drift = {asset: amount for asset, amount in self.balance_ledger.reconcile(now).items() if asset in route_assets}
+            if drift:
+                cycle.record_fill(drift)
+
+        for leg in cycle.route.legs:
+            asset = leg.spent_asset
+            if asset == self.config.holding_asset:
+                continue
+            position = min(cycle.asset_deltas.get(asset, Decimal("0")), self.balance_ledger.get_available_balance(asset))
+            step = self.plan_recovery_order(cycle, asset, position) if position > 0 else None
+            if step is None:
+                continue
+            pair, side, amount = step
+            candidate = self.create_order_candidate(pair, side, amount)
+            if candidate is None:
+                continue
+            order_id = self.process_candidate(candidate)
+            if order_id is None:
+                self.fail_recovery(cycle, f"Could not place recovery order on {pair}.")
+                return
+            self.add_cycle_order(cycle, order_id)
+            cycle.recovery_deadline = now + self.config.leg_timeout
+            self.logger.info(f"Recovering {position} {asset} ({cycle.recovery_action}) with {side.name} "
+                             f"{candidate.amount} on {pair}.")
+            return
+        self.finish_recovery(cycle)
+
+    def plan_recovery_order(self, cycle: ArbitrageCycle, asset: str,
+                            amount: Decimal) -> Optional[Tuple[str, TradeType, Decimal]]:
+        """
+        Chooses between completing the remaining legs from the asset and reverting the legs that led to it.
+        With timeout_action auto the path that returns more of the holding asset at the current books wins,
+        and the choice is kept for the rest of the recovery.
+
+        :return: The pair, side and amount of the next recovery order, None if the amount is dust
+        """
+        legs = cycle.route.legs
+        index = next(index for index, leg in enumerate(legs) if leg.spent_asset == asset)
+        paths = {
+            "complete": [(leg.trading_pair, leg.side) for leg in legs[index:]],
+            "unwind": [(leg.trading_pair, TradeType.SELL if leg.is_buy else TradeType.BUY) for leg in reversed(legs[:index])],
+        }
+        action = cycle.recovery_action or self.config.timeout_action
+        if action in paths:
+            _, order_amount = self.estimate_recovery(paths[action], amount)
+        else:
+            estimates = {name: self.estimate_recovery(path, amount) for name, path in paths.items()}
+            action = max(estimates, key=lambda name: estimates[name][0])
+            order_amount = estimates[action][1]
+            self.logger.info(f"Recovery estimates for {amount} {asset}: " + ", ".join(
+                f"{name} {proceeds} {self.config.holding_asset}" for name, (proceeds, _) in estimates.items()))
+        cycle.recovery_action = action
+        if order_amount == Decimal("0"):
+            return None
+        pair, side = paths[action][0]
+        return pair, side, order_amount
+
+    def estimate_recovery(self, path: List[Tuple[str, TradeType]], amount: Decimal) -> Tuple[Decimal, Decimal]:
+        """
+        :return: The holding asset the path returns for amount at the current books after fees, and the
+                 quantized order amount of its first step
+        """
+        pairs, sides = zip(*path)
+        exchanged_amount = amount
+        first_amount: Optional[Decimal] = None
+        for (pair, side), fee_multiplier in zip(path, self.fee_schedule.get_multipliers(pairs, sides)):
+            order_amount = self.order_book_analyzer.get_order_amount_from_exchanged_amount(pair, side, exchanged_amount)
+            if first_amount is None:
+                first_amount = order_amount
+            if order_amount == Decimal("0"):
+                return Decimal("0"), first_amount
+            if side == TradeType.BUY:
+                exchanged_amount = order_amount * fee_multiplier
+            else:
+                exchanged_amount = self.order_book_analyzer.get_quote_volume_for_base_amount(pair, side, order_amount) * fee_multiplier
+        return exchanged_amount, first_amount
+
+    def finish_recovery(self, cycle: ArbitrageCycle):
+        """
+        Records the recovery time and the unwind cost, the holding asset the timed out cycle lost, and
+        resumes trading unless the cycle had also failed.
+        """
+        self.recovery_latency.record(self.current_timestamp - cycle.timed_out_at)
+        self.last_unwind_cost = -cycle.asset_deltas.get(self.config.holding_asset, Decimal("0"))
+        self.unwind_cost += self.last_unwind_cost
+        self.logger.info(f"Timed out cycle recovered in {self.current_timestamp - cycle.timed_out_at:.1f}s. "
+                         f"Unwind cost: {self.last_unwind_cost} {self.config.holding_asset}")
+        if cycle.failed:
+            self.status = "NOT_ACTIVE"
+        self.close_cycle(cycle)
+
+    def fail_recovery(self, cycle: ArbitrageCycle, reason: str):
+        self.logger.error(f"{reason} Manual intervention required. Stopping new arbitrages.")
+        self.status = "NOT_ACTIVE"
+        self.close_cycle(cycle)
+
+    def place_next_order(self, cycle: ArbitrageCycle):
+        """
+        Places the next order in the cycle's sequence.
+        """
+        if cycle.next_leg >= len(cycle.candidates):
+            self.finish_cycle(cycle)
             return
 
-        candidate = self.pending_orders[self.current_order_index]
-        self.order_candidate = candidate
+        candidate = cycle.candidates[cycle.next_leg]
         try:
-            success = self.process_candidate(candidate)
-            if not success:
+            order_id = self.process_candidate(candidate)
+            if order_id is None:
                 raise OrderPlacementError(f"Failed to process order candidate for {candidate.trading_pair}")
+            self.add_cycle_order(cycle, order_id, cycle.next_leg)
         except OrderPlacementError as e:
             self.logger.error(str(e))
             self.status = "NOT_ACTIVE"
-            self.reset_arbitrage()
+            self.close_cycle(cycle)
 
-    def process_candidate(self, order_candidate: OrderCandidate) -> bool:
+    def process_candidate(self, order_candidate: OrderCandidate) -> Optional[str]:
         """
         Processes an order candidate and places the order.
 
         :param order_candidate: The order candidate to process
-        :return: True if the order was successfully placed, False otherwise
+        :return: The id of the placed order, None if it could not be placed
         """
         try:
+            started = self.latency_profiler.now()
             adjusted_candidate = self.connector.budget_checker.adjust_candidate(order_candidate, all_or_none=True)
+            lap = self.latency_profiler.lap("order.adjust_candidate", started)
             if adjusted_candidate.amount == Decimal("0"):
                 raise OrderPlacementError(f"Adjusted order amount is zero for {order_candidate.trading_pair}.")
 
@@ -239,13 +1017,12 @@ class EnhancedTriangularArbitrage(StrategyBase):
                 adjusted_candidate.order_type,
                 adjusted_candidate.price
             )
-            self.order_ids.append(order_id)
-            self.active_order_id = order_id
+            self.latency_profiler.lap("order.place", lap)
             self.logger.info(f"Placed order {order_id} for {adjusted_candidate.trading_pair}.")
-            return True
+            return order_id
         except Exception as e:
             self.logger.error(f"Error processing order candidate: {str(e)}")
-            return False
+            return None
 
     def place_order(self, connector_name: str, trading_pair: str, side: TradeType, 
                     amount: Decimal, order_type: OrderType, price: Decimal) -> str:
@@ -260,55 +1037,97 @@ class EnhancedTriangularArbitrage(StrategyBase):
         :param price: The price of the order
         :return: The order ID of the placed order
         """
+        self.request_scheduler.request(ORDER, self.current_timestamp)
         if side == TradeType.BUY:
             order_id = self.buy(connector_name, trading_pair, amount, order_type, price)
         else:
             order_id = self.sell(connector_name, trading_pair, amount, order_type, price)
         return order_id
 
+    def cancel_order(self, order_id: str):
+        """
+        Cancels an order on the strategy's connector. Cancels are never held back by the rate limits.
+        """
+        self.request_scheduler.request(CANCEL, self.current_timestamp)
+        self.cancel(self.config.connector_name, order_id)
+
     def arbitrage_in_progress(self) -> bool:
         """
         Checks if an arbitrage is currently in progress.
 
-        :return: True if an arbitrage is in progress, False otherwise
+        :return: True if at least one cycle is in flight, False otherwise
         """
-        return self.status == "ARBITRAGE_STARTED"
+        return bool(self.cycles)
 
     def ready_for_new_orders(self) -> bool:
         """
-        Checks if the strategy is ready to place new orders.
+        Checks if the strategy is ready to start another cycle: it is trading, fewer than max_concurrent_cycles
+        cycles are in flight and the holding asset not committed to them covers an order. With optimal sizing
+        the free holding balance is split evenly between the free cycle slots.
 
         :return: True if ready for new orders, False otherwise
         """
-        if self.status != "ACTIVE":
+        if self.status not in ("ACTIVE", "ARBITRAGE_STARTED") or self.risk_engine.halted:
+            return False
+        free_slots = self.config.max_concurrent_cycles - len(self.cycles)
+        if free_slots <= 0:
             return False
 
-        available_balance = self.connector.get_available_balance(self.config.holding_asset)
-        if available_balance < self.config.order_amount_in_holding_asset:
-            self.logger.info(f"{self.config.connector_name} {self.config.holding_asset} balance is too low. Cannot place order.")
+        available_balance = self.get_free_balance(self.config.holding_asset)
+        self.available_holding_balance = available_balance / free_slots
+        if available_balance < self.config.order_amount_in_holding_asset and not self.config.optimal_sizing_enabled:
+            self.log_sampler.log(self.logger, logging.INFO, "%s %s balance is too low. Cannot place order.",
+                                 self.config.connector_name, self.config.holding_asset)
             return False
 
         return True
 
-    def calculate_total_profit(self):
+    def update_status(self):
+        """
+        Derives the status from the cycles in flight, unless new arbitrages were stopped.
+        """
+        if self.status == "NOT_ACTIVE":
+            return
+        if any(cycle.timed_out for cycle in self.cycles):
+            self.status = "UNWINDING"
+        elif self.cycles:
+            self.status = "ARBITRAGE_STARTED"
+        else:
+            self.status = "ACTIVE"
+
+    def calculate_total_profit(self, cycle: ArbitrageCycle):
         """
-        Calculates the total profit from the completed arbitrage.
+        Adds the profit of the cycle, taken from the fills the balance ledger recorded for it, to the total.
+        The percentage is relative to the holding asset spent by every cycle so far.
         """
-        final_balance = self.connector.get_available_balance(self.config.holding_asset)
-        self.total_profit = final_balance - self.initial_spent_amount
-        self.total_profit_pct = (self.total_profit / self.initial_spent_amount) * 100
-        self.logger.info(f"Arbitrage completed. Total profit: {self.total_profit} {self.config.holding_asset} ({self.total_profit_pct}%)")
+        holding_asset = self.config.holding_asset
+        self.cycle_profit = cycle.asset_deltas.get(holding_asset, Decimal("0"))
+        spent_amount = cycle.spent_amounts.get(holding_asset, Decimal("0"))
+        self.total_profit += self.cycle_profit
+        self.total_spent_amount += spent_amount
+        self.risk_engine.record_cycle(self.current_timestamp, self.cycle_profit, spent_amount)
+        if self.total_spent_amount:
+            self.total_profit_pct = (self.total_profit / self.total_spent_amount) * 100
+        residuals = ", ".join(f"{asset} {amount:+}" for asset, amount in sorted(cycle.asset_deltas.items())
+                              if asset != holding_asset and amount)
+        self.logger.info(f"Arbitrage completed. Cycle profit: {self.cycle_profit} {holding_asset}"
+                         f"{f' (residual {residuals})' if residuals else ''}. "
+                         f"Total profit: {self.total_profit} {holding_asset} ({self.total_profit_pct}%)")
 
-    def reset_arbitrage(self):
+    def close_cycle(self, cycle: ArbitrageCycle):
         """
-        Resets the arbitrage state.
+        Ends a cycle that did not complete. Its fills still count towards the total profit.
         """
-        self.pending_orders = []
-        self.current_order_index = 0
-        self.order_ids = []
-        self.active_order_id = None
-        self.profitable_direction = ""
-        self.initial_spent_amount = Decimal("0")
+        if cycle.asset_deltas:
+            self.calculate_total_profit(cycle)
+        self.remove_cycle(cycle)
+
+    def remove_cycle(self, cycle: ArbitrageCycle):
+        if cycle in self.cycles:
+            self.cycles.remove(cycle)
+        for order_id in cycle.order_ids:
+            self.cycle_by_order_id.pop(order_id, None)
+        self.update_status()
 
     def did_create_buy_order(self, event: BuyOrderCreatedEvent):
         """
@@ -316,7 +1135,7 @@ class EnhancedTriangularArbitrage(StrategyBase):
 
         :param event: The BuyOrderCreatedEvent
         """
-        if event.order_id == self.active_order_id:
+        if self.get_cycle(event.order_id) is not None:
             self.logger.info(f"Buy order {event.order_id} created for {event.trading_pair}.")
 
     def did_create_sell_order(self, event: SellOrderCreatedEvent):
@@ -325,7 +1144,7 @@ class EnhancedTriangularArbitrage(StrategyBase):
 
         :param event: The SellOrderCreatedEvent
         """
-        if event.order_id == self.active_order_id:
+        if self.get_cycle(event.order_id) is not None:
             self.logger.info(f"Sell order {event.order_id} created for {event.trading_pair}.")
 
     def did_complete_buy_order(self, event: BuyOrderCompletedEvent):
@@ -334,9 +1153,9 @@ class EnhancedTriangularArbitrage(StrategyBase):
 
         :param event: The BuyOrderCompletedEvent
         """
-        if event.order_id == self.active_order_id:
-            self.logger.info(f"Buy order {event.order_id} completed for {event.trading_pair}.")
-            self.handle_order_completed()
+        if self.get_cycle(event.order_id) is not None:
+            self.logger.info(f"Buy order {event.order_id} completed for {event.base_asset}-{event.quote_asset}.")
+            self.handle_order_completed(event.order_id)
 
     def did_complete_sell_order(self, event: SellOrderCompletedEvent):
         """
@@ -344,17 +1163,38 @@ class EnhancedTriangularArbitrage(StrategyBase):
 
         :param event: The SellOrderCompletedEvent
         """
-        if event.order_id == self.active_order_id:
-            self.logger.info(f"Sell order {event.order_id} completed for {event.trading_pair}.")
-            self.handle_order_completed()
+        if self.get_cycle(event.order_id) is not None:
+            self.logger.info(f"Sell order {event.order_id} completed for {event.base_asset}-{event.quote_asset}.")
+            self.handle_order_completed(event.order_id)
 
-    def handle_order_completed(self):
+    def handle_order_completed(self, order_id: str):
         """
-        Handles the completion of an order and prepares for the next order.
+        Handles the completion of an order and places the next order of its cycle.
+
+        :param order_id: The id of the completed order
         """
-        self.active_order_id = None
-        self.current_order_index += 1
-        self.place_next_order()
+        cycle = self.get_cycle(order_id)
+        if cycle is None:
+            return
+        self.risk_engine.record_order(self.current_timestamp, failed=False)
+        leg_index = cycle.mark_completed(order_id)
+        if cycle.timed_out:
+            self.advance_recovery(cycle)
+            return
+        if cycle.failed:
+            if leg_index is not None:
+                cycle.completed_legs.discard(leg_index)
+                self.unwind_leg(cycle, leg_index)
+            self.settle_failed_cycle(cycle)
+            return
+
+        if cycle.concurrent:
+            if cycle.is_complete:
+                self.finish_cycle(cycle)
+            return
+
+        cycle.next_leg += 1
+        self.place_next_order(cycle)
 
     def did_fail_order(self, event: MarketOrderFailureEvent):
         """
@@ -362,11 +1202,45 @@ class EnhancedTriangularArbitrage(StrategyBase):
 
         :param event: The MarketOrderFailureEvent
         """
-        if event.order_id == self.active_order_id:
-            self.logger.error(f"Order {event.order_id} failed for {event.trading_pair}. Aborting arbitrage.")
-            self.status = "NOT_ACTIVE"
-            self.active_order_id = None
-            self.reset_arbitrage()
+        cycle = self.get_cycle(event.order_id)
+        if cycle is None:
+            return
+        self.risk_engine.record_order(self.current_timestamp, failed=True)
+        if cycle.timed_out:
+            self.logger.error(f"Order {event.order_id} of timed out cycle failed.")
+            cycle.open_order_ids.discard(event.order_id)
+            cycle.unwind_order_ids.discard(event.order_id)
+            self.advance_recovery(cycle)
+            return
+        if cycle.concurrent or cycle.failed:
+            self.logger.error(f"Order {event.order_id} failed. Unwinding cycle.")
+            cycle.mark_failed(event.order_id)
+            self.abort_cycle(cycle)
+            return
+        self.logger.error(f"Order {event.order_id} failed. Aborting arbitrage.")
+        self.status = "NOT_ACTIVE"
+        self.close_cycle(cycle)
+
+    def did_cancel_order(self, event: OrderCancelledEvent):
+        """
+        Handles the event when an order is cancelled.
+
+        :param event: The OrderCancelledEvent
+        """
+        cycle = self.get_cycle(event.order_id)
+        if cycle is None:
+            return
+        if cycle.timed_out:
+            if event.order_id in cycle.open_order_ids | cycle.unwind_order_ids:
+                self.logger.info(f"Order {event.order_id} of timed out cycle cancelled.")
+                cycle.open_order_ids.discard(event.order_id)
+                cycle.unwind_order_ids.discard(event.order_id)
+                self.advance_recovery(cycle)
+            return
+        if cycle.failed:
+            self.logger.info(f"Order {event.order_id} of failed cycle cancelled.")
+            cycle.open_order_ids.discard(event.order_id)
+            self.settle_failed_cycle(cycle)
 
     def did_fill_order(self, event: OrderFilledEvent):
         """
@@ -374,7 +1248,14 @@ class EnhancedTriangularArbitrage(StrategyBase):
 
         :param event: The OrderFilledEvent
         """
-        if event.order_id == self.active_order_id:
+        deltas = self.balance_ledger.apply_fill(event)
+        cycle = self.get_cycle(event.order_id)
+        if cycle is not None:
+            cycle.record_fill(deltas)
+            leg_index = cycle.leg_by_order_id.get(event.order_id)
+            if leg_index is not None:
+                self.risk_engine.record_fill(self.current_timestamp, event.trade_type == TradeType.BUY, event.price,
+                                             cycle.candidates[leg_index].price)
             self.logger.info(f"Order {event.order_id} filled for {event.trading_pair}. Amount: {event.amount}, Price: {event.price}")
 
     def format_status(self) -> str:
@@ -385,10 +1266,58 @@ class EnhancedTriangularArbitrage(StrategyBase):
         """
         lines = []
         lines.append(f"Status: {self.status}")
-        if self.status == "ARBITRAGE_STARTED":
-            lines.append(f"Current order index: {self.current_order_index}")
-            if self.active_order_id:
-                lines.append(f"Active order ID: {self.active_order_id}")
+        if self.config.max_concurrent_cycles > 1:
+            lines.append(f"Cycles in flight: {len(self.cycles)} of {self.config.max_concurrent_cycles} "
+                         f"(peak {self.peak_cycles}, {self.cycles_started} started), "
+                         f"free {self.get_free_balance(self.config.holding_asset)} {self.config.holding_asset}")
+        for cycle in self.cycles:
+            name = cycle.route.name if cycle.route is not None else cycle.direction
+            if cycle.timed_out:
+                lines.append(f"Recovering timed out cycle {name} ({cycle.recovery_action or 'cancelling'}): "
+                             f"{', '.join(sorted(cycle.unwind_order_ids | cycle.open_order_ids)) or 'no open orders'}")
+            elif cycle.concurrent:
+                lines.append(f"Cycle {name}: open orders {', '.join(sorted(cycle.open_order_ids))}")
+            else:
+                lines.append(f"Cycle {name}: leg {min(cycle.next_leg + 1, len(cycle.candidates))} of {len(cycle.candidates)}, "
+                             f"open orders {', '.join(sorted(cycle.open_order_ids)) or 'none'}")
+        lines.append(f"Time in state: {self.state_timer.format(self.current_timestamp)}")
+        if self.cycle_timeouts:
+            lines.append(f"Cycle timeouts: {self.cycle_timeouts}, recovery {self.recovery_latency.format()}, "
+                         f"unwind cost {self.unwind_cost} {self.config.holding_asset} (last {self.last_unwind_cost})")
+        for mode, latency in self.cycle_latency.items():
+            if latency.count:
+                lines.append(f"Cycle latency ({mode}): {latency.format()}")
+        if self.config.scan_all_triangles:
+            lines.append(f"Triangles watched: {len(self.triangles)}")
+            for ranked in self.triangle_ranking[:3]:
+                lines.append(f"  {ranked.direction} {ranked.triangle.name}: top-of-book rate {ranked.top_of_book_rate:.6f}")
+        if self.sharded_evaluator is not None:
+            lines.append(f"Sharded evaluation: {self.sharded_evaluator.format()}")
+        if self.config.evaluation_mode == "event":
+            lines.append(f"Event-driven evaluation: {self.evaluation_scheduler.format()}")
+        if self.config.top_of_book_filter_enabled:
+            lines.append(f"Top-of-book prefilter: {self.top_of_book_filter.format()}")
+        if self.config.evaluation_cache_enabled:
+            lines.append(f"Evaluation cache hit rate: {self.book_version_cache.hit_rate:.1%}")
+        if self.latency_profiler.histograms:
+            lines.append("Stage latency:")
+            lines.extend(f"  {line}" for line in self.latency_profiler.format(STATUS_LATENCY_STAGES))
+        if self.market_data_capture is not None:
+            lines.append(f"Market data capture: {self.market_data_capture.format()}")
+        if self.async_logging is not None:
+            lines.append(f"Async logging: {self.async_logging.format()}")
+        if self.log_sampler.enabled:
+            lines.append(f"Log sampling: {self.log_sampler.suppressed} repeated records suppressed")
+        if self.opportunity_journal is not None:
+            lines.append(f"Opportunity journal: {self.opportunity_journal.format()}")
+        if self.warm_start_cache is not None:
+            lines.append(f"Warm start cache: {self.warm_start_cache.format()}")
+        lines.append(f"Balance ledger: {self.balance_ledger.format()}")
+        if self.request_scheduler.enabled:
+            lines.append("Rate limits:")
+            lines.extend(f"  {line}" for line in self.request_scheduler.format(self.current_timestamp))
+        lines.append(f"Risk: {self.risk_engine.format(self.config.holding_asset, self.current_timestamp)}")
+        lines.append(f"Last cycle profit: {self.cycle_profit} {self.config.holding_asset}")
         lines.append(f"Total profit: {self.total_profit} {self.config.holding_asset}")
         lines.append(f"Total profit percentage: {self.total_profit_pct}%")
         return "\n".join(lines)
@@ -400,8 +1329,17 @@ class EnhancedTriangularArbitrage(StrategyBase):
         :param clock: The clock used by the strategy (optional)
         """
         self.logger.info("Stopping Enhanced Triangular Arbitrage strategy...")
-        if self.active_order_id:
-            self.cancel(self.config.connector_name, self.active_order_id)
-            self.logger.info(f"Cancelled active order: {self.active_order_id}")
-        self.reset_arbitrage()
-        super().stop(clock)
\ No newline at end of file
+        for cycle in list(self.cycles):
+            for order_id in cycle.open_order_ids | cycle.unwind_order_ids:
+                self.cancel_order(order_id)
+                self.logger.info(f"Cancelled active order: {order_id}")
+            self.close_cycle(cycle)
+        self.stop_services()
+        if self.sharded_evaluator is not None:
+            self.sharded_evaluator.stop()
+        if self.warm_start_cache is not None and self.warm_start_cache.cycles:
+            self.warm_start_cache.save(self.fee_schedule)
+        super().stop(clock)
+        # Last, so the records logged while stopping are written too.
+        if self.async_logging is not None:
+            self.async_logging.stop()
\ No newline at end of file
@@ -0,0 +1,240 @@
+import contextlib
+import glob
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from hummingbot.connector.connector_base import ConnectorBase
+
+from book_recording import (
+    KIND_DIFF,
+    KIND_SNAPSHOT,
+    SIDE_ASK,
+    SIDE_BID,
+    BookRecording,
+    BookRecordingWriter,
+    make_records,
+    open_recording,
+)
+
+class BookCapture(NamedTuple):
+    timestamp: float
+    pair_id: int
+    snapshot_uid: int
+    update_id: int
+    bid_prices: np.ndarray
+    bid_sizes: np.ndarray
+    ask_prices: np.ndarray
+    ask_sizes: np.ndarray
+
+def capture_file_name(prefix: str, timestamp: float, index: int = 0) -> str:
+    suffix = f"_{index}" if index else ""
+    return f"{prefix}_{time.strftime('%Y%m%d_%H', time.gmtime(timestamp))}{suffix}.bin"
+
+def snapshot_levels(orderbook, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    :return: The top depth bid and ask levels of orderbook as (levels, 2) float64 arrays of price and amount
+    """
+    bids = np.array([(row.price, row.amount) for row in itertools.islice(orderbook.bid_entries(), depth)],
+                    dtype=np.float64).reshape(-1, 2)
+    asks = np.array([(row.price, row.amount) for row in itertools.islice(orderbook.ask_entries(), depth)],
+                    dtype=np.float64).reshape(-1, 2)
+    return bids, asks
+
+def side_changes(previous: Dict[float, float], prices: np.ndarray, sizes: np.ndarray) -> List[Tuple[float, float]]:
+    """
+    :return: (price, amount) levels that differ from previous, with amount 0 for levels that disappeared
+    """
+    current = dict(zip(prices.tolist(), sizes.tolist()))
+    changes = [(price, amount) for price, amount in current.items() if previous.get(price) != amount]
+    changes.extend((price, 0.0) for price in previous if price not in current)
+    return changes
+
+class MarketDataCapture:
+    """
+    Records the watched order books into hourly BookRecording files.
+    The strategy thread only copies the top depth levels of books whose version changed into arrays and
+    queues them. A writer thread turns the copies into snapshot or diff records, batches them in memory
+    and appends them to the current file every flush_interval seconds or batch_size records.
+    Every file starts with a snapshot of each book, so it can be replayed on its own.
+    If writing fails, the writer thread records the error and the capture stops copying books.
+    """
+    def __init__(self, connector: ConnectorBase, trading_pairs: List[str], directory: str, prefix: str = "books",
+                 depth: int = 20, rotation_interval: float = 3600.0, flush_interval: float = 1.0,
+                 batch_size: int = 1 << 16):
+        self.connector = connector
+        self.trading_pairs = sorted(trading_pairs)
+        self.directory = directory
+        self.prefix = prefix
+        self.depth = depth
+        self.rotation_interval = rotation_interval
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+        self.captured_updates: int = 0
+        self.records_written: int = 0
+        self.capture_time: float = 0.0
+        self.error: str = ""
+        self._pair_ids: Dict[str, int] = {pair: index for index, pair in enumerate(self.trading_pairs)}
+        self._seen_versions: Dict[str, Tuple[int, int]] = {}
+        self._queue: "queue.SimpleQueue[Optional[BookCapture]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        # Writer thread state
+        self._writer: Optional[BookRecordingWriter] = None
+        self._file_started_at: float = 0.0
+        self._books: Dict[int, Tuple[int, Dict[float, float], Dict[float, float]]] = {}
+        self._batch: List[Tuple[float, int, float, float, int, int, int]] = []
+        self._last_flush: float = 0.0
+
+    # Strategy thread
+
+    def start(self):
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self.run, name="market-data-capture", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def capture(self, timestamp: float):
+        """
+        Queues a copy of every watched book that changed since the last call.
+        """
+        if self.error:
+            return
+        started = time.perf_counter()
+        for pair in self.trading_pairs:
+            self.capture_pair(pair, timestamp)
+        self.capture_time += time.perf_counter() - started
+
+    def capture_pair(self, pair: str, timestamp: float):
+        if self.error:
+            return
+        orderbook = self.connector.get_order_book(pair)
+        version = (orderbook.snapshot_uid, orderbook.last_diff_uid)
+        if self._seen_versions.get(pair) == version:
+            return
+        self._seen_versions[pair] = version
+        bids, asks = snapshot_levels(orderbook, self.depth)
+        self._queue.put(BookCapture(timestamp, self._pair_ids[pair], version[0], max(version),
+                                    bids[:, 0], bids[:, 1], asks[:, 0], asks[:, 1]))
+        self.captured_updates += 1
+
+    # Writer thread
+
+    def run(self):
+        try:
+            while True:
+                try:
+                    capture = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    capture = False
+                if capture is None:
+                    break
+                if capture:
+                    self.process(capture)
+                if len(self._batch) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                    self.flush()
+            self.flush()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        except OSError as e:
+            self.error = str(e)
+            self.logger.error(f"Market data capture stopped writing to {self.directory}: {str(e)}")
+            self._batch = []
+            self.drop_queued()
+            if self._writer is not None:
+                # Closing flushes the buffered part of the failed write again.
+                with contextlib.suppress(OSError):
+                    self._writer.close()
+                self._writer = None
+
+    def drop_queued(self):
+        while True:
+            try:
+                capture = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if capture is None:
+                return
+
+    def process(self, capture: BookCapture):
+        if self._writer is None or capture.timestamp - self._file_started_at >= self.rotation_interval:
+            self.rotate(capture.timestamp)
+        book = self._books.get(capture.pair_id)
+        if book is None or book[0] != capture.snapshot_uid:
+            self.add_snapshot(capture.timestamp, capture.pair_id, capture.update_id,
+                              list(zip(capture.bid_prices.tolist(), capture.bid_sizes.tolist())),
+                              list(zip(capture.ask_prices.tolist(), capture.ask_sizes.tolist())))
+        else:
+            for side, levels, prices, sizes in ((SIDE_BID, book[1], capture.bid_prices, capture.bid_sizes),
+                                                (SIDE_ASK, book[2], capture.ask_prices, capture.ask_sizes)):
+                for price, amount in side_changes(levels, prices, sizes):
+                    self._batch.append((capture.timestamp, capture.update_id, price, amount, capture.pair_id, side,
+                                        KIND_DIFF))
+        self._books[capture.pair_id] = (capture.snapshot_uid,
+                                        dict(zip(capture.bid_prices.tolist(), capture.bid_sizes.tolist())),
+                                        dict(zip(capture.ask_prices.tolist(), capture.ask_sizes.tolist())))
+
+    def add_snapshot(self, timestamp: float, pair_id: int, update_id: int, bids: List[Tuple[float, float]],
+                     asks: List[Tuple[float, float]]):
+        for side, levels in ((SIDE_BID, bids), (SIDE_ASK, asks)):
+            for price, amount in levels:
+                self._batch.append((timestamp, update_id, price, amount, pair_id, side, KIND_SNAPSHOT))
+
+    def rotate(self, timestamp: float):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+        # Align files to the rotation interval so their names match the period they cover.
+        self._file_started_at = timestamp - timestamp % self.rotation_interval
+        # A restart within the hour continues its file; a file of other pairs gets a numbered sibling.
+        for index in itertools.count():
+            path = os.path.join(self.directory, capture_file_name(self.prefix, self._file_started_at, index))
+            try:
+                self._writer = BookRecordingWriter(path, self.trading_pairs, append=True)
+                break
+            except ValueError as e:
+                self.logger.warning(f"Not appending to {path}: {str(e)}")
+        self.logger.info(f"Capturing order books to {path}")
+        for pair_id, (snapshot_uid, bids, asks) in self._books.items():
+            self.add_snapshot(timestamp, pair_id, snapshot_uid, list(bids.items()), list(asks.items()))
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._batch or self._writer is None:
+            return
+        records = make_records(len(self._batch))
+        columns = list(zip(*self._batch))
+        for name, column in zip(("timestamp", "update_id", "price", "amount", "pair_id", "side", "kind"), columns):
+            records[name] = column
+        self._writer.write(records)
+        self._writer.flush()
+        self.records_written += len(records)
+        self._batch = []
+
+    def format(self) -> str:
+        line = (f"{self.captured_updates} updates, {self.records_written} records written to {self.directory}, "
+                f"{self.capture_time * 1e6 / max(self.captured_updates, 1):.1f}us per update")
+        if self.error:
+            line += f". FAILED: {self.error}"
+        return line
+
+def list_capture_files(directory: str, prefix: str = "books") -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, f"{prefix}_*.bin")))
+
+def open_captures(directory: str, prefix: str = "books") -> List[BookRecording]:
+    """
+    Opens every capture file in the directory as a memory-mapped BookRecording, oldest first.
+    """
+    return [open_recording(path) for path in list_capture_files(directory, prefix)]
@@ -0,0 +1,268 @@
+import argparse
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from book_version_cache import BookVersion
+from route import Route
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    timestamp REAL NOT NULL,
+    route TEXT NOT NULL,
+    profit REAL NOT NULL,
+    order_size REAL NOT NULL,
+    order_amounts TEXT NOT NULL,
+    book_versions TEXT NOT NULL,
+    bound INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS evaluations_route_timestamp ON evaluations (route, timestamp);
+"""
+
+INSERT = "INSERT INTO evaluations VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+# Rows as the strategy thread queues them; conversion to column values happens on the writer thread.
+JournalRow = Tuple[float, str, Decimal, Decimal, List[Decimal], Tuple[BookVersion, ...], bool]
+
+def to_columns(row: JournalRow) -> Tuple[float, str, float, float, str, str, int]:
+    timestamp, route, profit, order_size, order_amounts, versions, bound = row
+    return (timestamp, route, float(profit), float(order_size), ",".join(str(amount) for amount in order_amounts),
+            ",".join(f"{snapshot_uid}:{diff_uid}" for snapshot_uid, diff_uid in versions), int(bound))
+
+class OpportunityJournal:
+    """
+    Records every route evaluation into a SQLite database: timestamp, route, profit, order size, leg amounts,
+    the versions of the books it was computed from and whether the profit is only the top-of-book bound.
+    The strategy thread appends row tuples to a list and hands the list to a writer thread every
+    flush_interval seconds of strategy time or batch_size rows. The writer inserts each batch in one
+    transaction. If the database fails, the journal stops recording and drops the batches still queued.
+    """
+    def __init__(self, path: str, batch_size: int = 10000, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(__name__)
+        self.rows_recorded: int = 0
+        self.rows_written: int = 0
+        self.error: str = ""
+        self._rows: List[JournalRow] = []
+        self._last_handoff: float = 0.0
+        self._queue: "queue.SimpleQueue[Optional[List[JournalRow]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    # Strategy thread
+
+    def start(self):
+        if self._thread is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            self._thread = threading.Thread(target=self.run, name="opportunity-journal", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Writes the rows recorded so far and stops the writer thread.
+        """
+        if self._thread is not None:
+            self.handoff()
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def record(self, timestamp: float, route: Route, profit: Decimal, order_amounts: List[Decimal], order_size: Decimal,
+               versions: Tuple[BookVersion, ...], bound: bool = False):
+        if self.error:
+            return
+        self._rows.append((timestamp, route.name, profit, order_size, order_amounts, versions, bound))
+        self.rows_recorded += 1
+        if len(self._rows) >= self.batch_size or timestamp - self._last_handoff >= self.flush_interval:
+            self._last_handoff = timestamp
+            self.handoff()
+
+    def handoff(self):
+        if self._rows and not self.error:
+            self._queue.put(self._rows)
+            self._rows = []
+
+    # Writer thread
+
+    def run(self):
+        connection: Optional[sqlite3.Connection] = None
+        try:
+            connection = sqlite3.connect(self.path)
+            # WAL lets the query API read while the strategy writes.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            while True:
+                rows = self._queue.get()
+                if rows is None:
+                    break
+                with connection:
+                    connection.executemany(INSERT, map(to_columns, rows))
+                self.rows_written += len(rows)
+        except sqlite3.Error as e:
+            self.error = str(e)
+            self.logger.error(f"Opportunity journal stopped writing to {self.path}: {str(e)}")
+            self.drop_queued()
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def drop_queued(self):
+        while True:
+            try:
+                rows = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if rows is None:
+                return
+
+    def format(self) -> str:
+        line = f"{self.rows_recorded} evaluations recorded, {self.rows_written} written to {self.path}"
+        if self.error:
+            line += f". FAILED: {self.error}"
+        return line
+
+class RouteFrequency(NamedTuple):
+    route: str
+    evaluations: int
+    above_threshold: int
+    max_profit: float
+
+    @property
+    def frequency(self) -> float:
+        return self.above_threshold / self.evaluations if self.evaluations else 0.0
+
+class OpportunityEpisode(NamedTuple):
+    route: str
+    start: float
+    end: float
+    evaluations: int
+    max_profit: float
+    max_order_size: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+class JournalQuery:
+    """
+    Read-only queries over an opportunity journal. Profits are in percent, like min_profitability.
+    Rows holding only the top-of-book bound are excluded unless include_bound is set.
+    """
+    def __init__(self, path: str, include_bound: bool = False):
+        self.connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.include_bound = include_bound
+
+    def close(self):
+        self.connection.close()
+
+    def where(self, route: Optional[str], start: Optional[float], end: Optional[float]) -> Tuple[str, List[object]]:
+        clauses, params = [], []
+        if not self.include_bound:
+            clauses.append("bound = 0")
+        if route is not None:
+            clauses.append("route = ?")
+            params.append(route)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def routes(self) -> List[str]:
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT route FROM evaluations ORDER BY route")]
+
+    def frequency(self, threshold: float, route: Optional[str] = None, start: Optional[float] = None,
+                  end: Optional[float] = None) -> List[RouteFrequency]:
+        """
+        :return: Per route, how many evaluations there were and how many reached the threshold
+        """
+        where, params = self.where(route, start, end)
+        rows = self.connection.execute(
+            f"SELECT route, COUNT(*), SUM(profit >= ?), MAX(profit) FROM evaluations{where} "
+            f"GROUP BY route ORDER BY route", [threshold, *params])
+        return [RouteFrequency(route, count, above or 0, max_profit) for route, count, above, max_profit in rows]
+
+    def iter_rows(self, route: Optional[str] = None, start: Optional[float] = None,
+                  end: Optional[float] = None) -> Iterator[Tuple[str, float, float, float]]:
+        where, params = self.where(route, start, end)
+        return self.connection.execute(
+            f"SELECT route, timestamp, profit, order_size FROM evaluations{where} ORDER BY route, timestamp", params)
+
+    def episodes(self, threshold: float, route: Optional[str] = None, start: Optional[float] = None,
+                 end: Optional[float] = None, max_gap: float = float("inf")) -> List[OpportunityEpisode]:
+        """
+        Groups consecutive evaluations of a route at or above the threshold into episodes. An evaluation
+        below the threshold, or no evaluation for more than max_gap seconds, ends an episode.
+        """
+        episodes: List[OpportunityEpisode] = []
+        current: Optional[List] = None
+        for row_route, timestamp, profit, order_size in self.iter_rows(route, start, end):
+            if current is not None and (row_route != current[0] or timestamp - current[2] > max_gap or profit < threshold):
+                episodes.append(OpportunityEpisode(*current))
+                current = None
+            if profit < threshold:
+                continue
+            if current is None:
+                current = [row_route, timestamp, timestamp, 0, profit, order_size]
+            current[2] = timestamp
+            current[3] += 1
+            current[4] = max(current[4], profit)
+            current[5] = max(current[5], order_size)
+        if current is not None:
+            episodes.append(OpportunityEpisode(*current))
+        return episodes
+
+    def size_distribution(self, threshold: Optional[float] = None, route: Optional[str] = None, bins: int = 10,
+                          start: Optional[float] = None, end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: Histogram counts and bin edges of the order sizes of evaluations at or above the threshold
+        """
+        where, params = self.where(route, start, end)
+        if threshold is not None:
+            where = f"{where} AND profit >= ?" if where else " WHERE profit >= ?"
+            params.append(threshold)
+        sizes = np.fromiter((row[0] for row in self.connection.execute(f"SELECT order_size FROM evaluations{where}", params)),
+                            dtype=np.float64)
+        return np.histogram(sizes, bins=bins)
+
+def format_report(query: JournalQuery, threshold: float, max_gap: float) -> Sequence[str]:
+    lines = []
+    for stats in query.frequency(threshold):
+        episodes = query.episodes(threshold, stats.route, max_gap=max_gap)
+        durations = [episode.duration for episode in episodes]
+        lines.append(f"{stats.route}: {stats.above_threshold} of {stats.evaluations} evaluations >= {threshold}% "
+                     f"({stats.frequency:.2%}), max {stats.max_profit:.4f}%, {len(episodes)} episodes, "
+                     f"mean duration {np.mean(durations) if durations else 0.0:.1f}s, "
+                     f"max duration {max(durations, default=0.0):.1f}s")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize an opportunity journal.")
+    parser.add_argument("path", help="Journal database written by the strategy")
+    parser.add_argument("--threshold", type=float, default=0.0, help="Profit in percent an evaluation must reach")
+    parser.add_argument("--max-gap", type=float, default=5.0, help="Seconds without evaluations that end an episode")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    query = JournalQuery(args.path)
+    try:
+        for line in format_report(query, args.threshold, args.max_gap):
+            print(line)
+    finally:
+        query.close()
+    print(f"Queried in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,10 @@ class OrderBookAnalyzer(ABC):
     def get_order_amount_from_exchanged_amount(self, pair: str, side: TradeType, exchanged_amount: Decimal) -> Decimal:
         pass
 
+    @abstractmethod
+    def get_quote_volume_for_base_amount(self, pair: str, side: TradeType, base_amount: Decimal) -> Decimal:
+        pass
+
 class DefaultOrderBookAnalyzer(OrderBookAnalyzer):
     def __init__(self, connector: ConnectorBase):
         self.connector = connector
@@ -29,4 +33,7 @@ class DefaultOrderBookAnalyzer(OrderBookAnalyzer):
             order_amount = self.get_base_amount_for_quote_volume(orderbook, exchanged_amount)
         else:
             order_amount = exchanged_amount
-        return self.connector.quantize_order_amount(pair, order_amount)
\ No newline at end of file
+        return self.connector.quantize_order_amount(pair, order_amount)
+
+    def get_quote_volume_for_base_amount(self, pair: str, side: TradeType, base_amount: Decimal) -> Decimal:
+        return self.connector.get_quote_volume_for_base_amount(pair, side == TradeType.BUY, base_amount).result_volume
\ No newline at end of file
@@ -0,0 +1,119 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from arbitrage_cycle import LatencyStats
+
+# Endpoint classes of the requests the strategy makes.
+ORDER = "order"
+CANCEL = "cancel"
+BALANCE = "balance"
+FEES = "fees"
+# Bucket every request draws from, for exchanges with one weight limit across endpoints.
+ALL_REQUESTS = "*"
+# Never held back. The connector throttles what it sends, so an order over the limit is delayed, not lost.
+HIGH_PRIORITY = (ORDER, CANCEL)
+
+def parse_rate_limits(limits: str) -> Dict[str, Tuple[float, float]]:
+    """
+    Parses rate limits of the form "CLASS=REQUESTS/SECONDS", separated by commas. CLASS is an endpoint
+    class (order, cancel, balance, fees) or "*" for a limit on all requests.
+    Example: "*=1200/60,order=50/10"
+    """
+    parsed = {}
+    for entry in limits.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        endpoint, limit = entry.split("=")
+        requests, seconds = limit.split("/")
+        parsed[endpoint.strip().lower()] = (float(requests), float(seconds))
+    return parsed
+
+class TokenBucket:
+    """
+    capacity tokens, refilled at capacity per period seconds of strategy time. Taking more than is left
+    leaves the bucket in debt until the refill covers it.
+    """
+    __slots__ = ("capacity", "rate", "tokens", "updated_at")
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated_at: Optional[float] = None
+
+    def refill(self, now: float):
+        if self.updated_at is not None and now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    @property
+    def usage(self) -> float:
+        return 1.0 - self.tokens / self.capacity
+
+class RequestScheduler:
+    """
+    Token buckets per endpoint class of one connector, and optionally one for all requests. Orders and cancels
+    always go out and take their tokens, even into debt. Balance and fee refreshes only go out while every
+    bucket they draw from keeps reserve of its capacity for orders, or is full for a refresh too heavy to leave
+    the reserve; otherwise the caller retries on a later tick. How long held-back requests waited and how close each bucket is to its limit are reported.
+    """
+    def __init__(self, limits: Dict[str, Tuple[float, float]], reserve: float = 0.2):
+        self.buckets: Dict[str, TokenBucket] = {endpoint: TokenBucket(requests, seconds)
+                                                for endpoint, (requests, seconds) in limits.items()}
+        self.reserve = reserve
+        self.logger = logging.getLogger(__name__)
+        self.requests: Dict[str, int] = {}
+        # Orders and cancels sent while a bucket was empty, and refreshes held back.
+        self.over_limit: Dict[str, int] = {}
+        self.held_back: Dict[str, int] = {}
+        self.waits: Dict[str, LatencyStats] = {}
+        self._waiting_since: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.buckets)
+
+    def get_buckets(self, endpoint: str) -> List[TokenBucket]:
+        return [bucket for bucket in (self.buckets.get(endpoint), self.buckets.get(ALL_REQUESTS)) if bucket is not None]
+
+    def request(self, endpoint: str, now: float, weight: float = 1.0) -> bool:
+        """
+        Asks for a request of the endpoint class with the given weight.
+
+        :return: True if the request may go out now; always for orders and cancels
+        """
+        buckets = self.get_buckets(endpoint)
+        for bucket in buckets:
+            bucket.refill(now)
+        if endpoint in HIGH_PRIORITY:
+            if any(bucket.tokens < weight for bucket in buckets):
+                self.over_limit[endpoint] = self.over_limit.get(endpoint, 0) + 1
+                self.logger.warning(f"Sending {endpoint} request over the rate limit; the connector will delay it.")
+        elif any(bucket.tokens < min(weight + bucket.capacity * self.reserve, bucket.capacity) for bucket in buckets):
+            self.held_back[endpoint] = self.held_back.get(endpoint, 0) + 1
+            self._waiting_since.setdefault(endpoint, now)
+            return False
+        for bucket in buckets:
+            bucket.tokens -= weight
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+        waiting_since = self._waiting_since.pop(endpoint, None)
+        if waiting_since is not None:
+            self.waits.setdefault(endpoint, LatencyStats()).record(now - waiting_since)
+        return True
+
+    def format(self, now: float) -> List[str]:
+        lines = []
+        for endpoint, bucket in sorted(self.buckets.items()):
+            bucket.refill(now)
+            lines.append(f"{endpoint}: {bucket.usage:.0%} of {bucket.capacity:.0f} per {bucket.capacity / bucket.rate:.0f}s used")
+        for endpoint in sorted(self.requests.keys() | self.held_back.keys()):
+            line = f"{endpoint}: {self.requests.get(endpoint, 0)} requests"
+            if endpoint in self.over_limit:
+                line += f", {self.over_limit[endpoint]} over the limit"
+            if endpoint in self.held_back:
+                line += f", {self.held_back[endpoint]} held back"
+            if endpoint in self.waits:
+                line += f", waited {self.waits[endpoint].format()}"
+            lines.append(line)
+        return lines
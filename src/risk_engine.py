@@ -0,0 +1,140 @@
+import logging
+from collections import deque
+from decimal import Decimal
+from typing import Deque, Optional, Tuple, Union
+
+# Orders a window must hold before its failure rate can halt trading, so one early failure does not.
+MIN_ORDERS_FOR_FAILURE_RATE = 10
+
+Value = Union[float, Decimal]
+
+class RollingWindow:
+    """
+    Sum and count of the values recorded in the last window seconds. Values expire as later ones are added,
+    so recording is O(1) amortized and reading the sum is O(1).
+    """
+    def __init__(self, window: float, zero: Value):
+        self.window = window
+        self.zero = zero
+        self.total: Value = zero
+        self._values: Deque[Tuple[float, Value]] = deque()
+
+    @property
+    def count(self) -> int:
+        return len(self._values)
+
+    @property
+    def mean(self) -> Value:
+        return self.total / len(self._values) if self._values else self.zero
+
+    def add(self, timestamp: float, value: Value):
+        self._values.append((timestamp, value))
+        self.total += value
+        self.expire(timestamp)
+
+    def expire(self, timestamp: float):
+        values = self._values
+        cutoff = timestamp - self.window
+        while values and values[0][0] <= cutoff:
+            self.total -= values.popleft()[1]
+        if not values:
+            # Drop the rounding error float sums accumulate.
+            self.total = self.zero
+
+class RiskEngine:
+    """
+    Streaming risk metrics: over the last window seconds the P&L of closed cycles relative to the holding asset
+    they spent, fill slippage against the price each leg was sized at and the share of orders that failed, and
+    since the start the drawdown of the cumulative P&L from its peak. Every record is O(1) amortized.
+
+    Limits are checked when a metric changes. With enforcement on, the first breach halts the engine until
+    reset(), and the strategy starts no new cycles while it is halted, so the tick only reads halted.
+    A limit of zero is off; kill_switch_rate is a P&L percentage such as -2.
+    """
+    def __init__(self, window: float, enabled: bool = True, kill_switch_rate: Optional[Decimal] = None,
+                 max_drawdown: Decimal = Decimal("0"), max_fill_slippage: Decimal = Decimal("0"),
+                 max_order_failure_rate: Decimal = Decimal("0")):
+        self.window = window
+        self.enabled = enabled
+        self.kill_switch_rate = kill_switch_rate
+        self.max_drawdown = max_drawdown
+        self.max_fill_slippage = float(max_fill_slippage)
+        self.max_order_failure_rate = float(max_order_failure_rate)
+        self.logger = logging.getLogger(__name__)
+        self.pnl = RollingWindow(window, Decimal("0"))
+        self.spent = RollingWindow(window, Decimal("0"))
+        # Slippage in percent per fill, positive when the fill was worse than expected.
+        self.slippage = RollingWindow(window, 0.0)
+        # 1.0 per failed order, 0.0 per completed one, so the mean is the failure rate.
+        self.orders = RollingWindow(window, 0.0)
+        self.cumulative_pnl: Decimal = Decimal("0")
+        self.peak_pnl: Decimal = Decimal("0")
+        self.max_drawdown_seen: Decimal = Decimal("0")
+        self.halted: bool = False
+        self.halt_reason: str = ""
+
+    @property
+    def pnl_pct(self) -> Decimal:
+        return self.pnl.total / self.spent.total * 100 if self.spent.total else Decimal("0")
+
+    @property
+    def drawdown(self) -> Decimal:
+        return self.peak_pnl - self.cumulative_pnl
+
+    def record_cycle(self, timestamp: float, profit: Decimal, spent: Decimal):
+        self.pnl.add(timestamp, profit)
+        self.spent.add(timestamp, spent)
+        self.cumulative_pnl += profit
+        if self.cumulative_pnl > self.peak_pnl:
+            self.peak_pnl = self.cumulative_pnl
+        self.max_drawdown_seen = max(self.max_drawdown_seen, self.drawdown)
+        self.check()
+
+    def record_fill(self, timestamp: float, is_buy: bool, price: Decimal, expected_price: Decimal):
+        if not expected_price:
+            return
+        slippage = float((price - expected_price) / expected_price) * 100
+        self.slippage.add(timestamp, slippage if is_buy else -slippage)
+        self.check()
+
+    def record_order(self, timestamp: float, failed: bool):
+        self.orders.add(timestamp, 1.0 if failed else 0.0)
+        self.check()
+
+    def get_breach(self) -> Optional[str]:
+        if self.kill_switch_rate is not None and self.spent.count and self.pnl_pct <= self.kill_switch_rate:
+            return f"P&L of {self.pnl_pct:.4f}% over the last {self.window:.0f}s reached the kill switch rate {self.kill_switch_rate}%"
+        if self.max_drawdown > 0 and self.drawdown >= self.max_drawdown:
+            return f"Drawdown of {self.drawdown} reached the limit {self.max_drawdown}"
+        if self.max_fill_slippage > 0 and self.slippage.count and self.slippage.mean >= self.max_fill_slippage:
+            return (f"Mean fill slippage of {self.slippage.mean:.4f}% over the last {self.window:.0f}s reached "
+                    f"the limit {self.max_fill_slippage}%")
+        if (self.max_order_failure_rate > 0 and self.orders.count >= MIN_ORDERS_FOR_FAILURE_RATE
+                and self.orders.mean >= self.max_order_failure_rate):
+            return (f"Order failure rate of {self.orders.mean:.1%} over the last {self.window:.0f}s reached "
+                    f"the limit {self.max_order_failure_rate:.1%}")
+        return None
+
+    def check(self):
+        if not self.enabled or self.halted:
+            return
+        reason = self.get_breach()
+        if reason is not None:
+            self.halted = True
+            self.halt_reason = reason
+            self.logger.error(f"Kill switch: {reason}. No new cycles will be started.")
+
+    def reset(self):
+        self.halted = False
+        self.halt_reason = ""
+
+    def format(self, holding_asset: str, timestamp: float) -> str:
+        for window in (self.pnl, self.spent, self.slippage, self.orders):
+            window.expire(timestamp)
+        line = (f"P&L {self.pnl.total} {holding_asset} ({self.pnl_pct:.4f}%) in {self.pnl.count} cycles over "
+                f"{self.window:.0f}s, drawdown {self.drawdown} (max {self.max_drawdown_seen}), "
+                f"fill slippage {self.slippage.mean:.4f}% over {self.slippage.count} fills, "
+                f"order failure rate {self.orders.mean:.1%} of {self.orders.count}")
+        if self.halted:
+            line += f". HALTED: {self.halt_reason}"
+        return line
@@ -0,0 +1,78 @@
+from decimal import Decimal
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+
+from hummingbot.core.data_type.common import TradeType
+
+from order_book_analyzer import OrderBookAnalyzer
+from triangle_discovery import get_order_sides
+from utils import split_trading_pair
+
+class RouteLeg(NamedTuple):
+    """
+    One leg of a compiled route with its pair metadata and the analyzer methods it is evaluated with.
+    """
+    trading_pair: str
+    side: TradeType
+    is_buy: bool
+    base_asset: str
+    quote_asset: str
+    spent_asset: str
+    received_asset: str
+    # Bound OrderBookAnalyzer methods, so the hot path skips the attribute lookups.
+    get_order_amount: Callable[[str, TradeType, Decimal], Decimal]
+    get_quote_volume: Callable[[str, TradeType, Decimal], Decimal]
+
+class Route(NamedTuple):
+    """
+    An immutable, precompiled cycle of any number of legs that starts and ends in the holding asset.
+    trading_pairs and order_sides are built once, so they can be used as cache keys on every tick.
+    """
+    holding_asset: str
+    trading_pairs: Tuple[str, ...]
+    order_sides: Tuple[TradeType, ...]
+    legs: Tuple[RouteLeg, ...]
+    name: str
+
+    @property
+    def leg_count(self) -> int:
+        return len(self.legs)
+
+def compile_route(analyzer: OrderBookAnalyzer, holding_asset: str, trading_pairs: Sequence[str],
+                  order_sides: Optional[Sequence[TradeType]] = None) -> Route:
+    """
+    :param trading_pairs: The pairs in traversal order, starting from the holding asset
+    :param order_sides: The side of each leg; derived from the pairs when omitted
+    :raises InvalidTradingPairError: If order_sides is omitted and the pairs do not form a cycle through holding_asset
+    """
+    trading_pairs = tuple(trading_pairs)
+    order_sides = tuple(order_sides) if order_sides is not None else get_order_sides(holding_asset, trading_pairs)
+    legs = []
+    for pair, side in zip(trading_pairs, order_sides):
+        base, quote = split_trading_pair(pair)
+        is_buy = side == TradeType.BUY
+        legs.append(RouteLeg(pair, side, is_buy, base, quote, quote if is_buy else base, base if is_buy else quote,
+                             analyzer.get_order_amount_from_exchanged_amount, analyzer.get_quote_volume_for_base_amount))
+    return Route(holding_asset, trading_pairs, order_sides, tuple(legs), "/".join(trading_pairs))
+
+class RouteCompiler:
+    """
+    Compiles each distinct (pairs, sides) route once and returns the same Route object afterwards.
+    """
+    def __init__(self, analyzer: OrderBookAnalyzer, holding_asset: str):
+        self.analyzer = analyzer
+        self.holding_asset = holding_asset
+        self._routes: Dict[Tuple[Tuple[str, ...], Tuple[TradeType, ...]], Route] = {}
+
+    def get_route(self, trading_pairs: Tuple[str, ...], order_sides: Tuple[TradeType, ...]) -> Route:
+        route = self._routes.get((trading_pairs, order_sides))
+        if route is None:
+            route = compile_route(self.analyzer, self.holding_asset, trading_pairs, order_sides)
+            self._routes[(route.trading_pairs, route.order_sides)] = route
+        return route
+
+    def compile(self, trading_pairs: Sequence[str]) -> Route:
+        route = compile_route(self.analyzer, self.holding_asset, trading_pairs)
+        return self._routes.setdefault((route.trading_pairs, route.order_sides), route)
+
+    def clear(self):
+        self._routes.clear()
@@ -0,0 +1,338 @@
+import multiprocessing
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot.core.data_type.common import TradeType
+
+from market_data_capture import snapshot_levels
+from triangle_discovery import Triangle
+from vectorized_order_book_analyzer import BookSideArrays
+
+# Each pair has a header of one 64-byte cache line: sequence, bid level count, ask level count, padding.
+HEADER_WIDTH = 8
+SEQUENCE, BID_COUNT, ASK_COUNT = 0, 1, 2
+SIDE_BID, SIDE_ASK = 0, 1
+DIRECTIONS = ("direct", "reverse")
+
+class SharedBookLayout(NamedTuple):
+    name: str
+    pair_count: int
+    depth: int
+
+    @property
+    def header_bytes(self) -> int:
+        return self.pair_count * HEADER_WIDTH * 8
+
+    @property
+    def size(self) -> int:
+        return self.header_bytes + self.pair_count * 2 * 2 * self.depth * 8
+
+class SharedOrderBooks:
+    """
+    The top depth levels of every watched order book in one shared memory block.
+    A single writer (the strategy process) guards each book with a seqlock: the sequence is odd while the
+    book is being written and is incremented again once it is complete. Readers never lock; they read the
+    sequence, read the levels in place and retry if the sequence was odd or changed in the meantime.
+    """
+    def __init__(self, layout: SharedBookLayout, shared_memory):
+        self.layout = layout
+        self.shared_memory = shared_memory
+        self.headers = np.ndarray((layout.pair_count, HEADER_WIDTH), dtype=np.int64, buffer=shared_memory.buf)
+        # levels[slot, side, 0] are the prices and levels[slot, side, 1] the sizes, best level first.
+        self.levels = np.ndarray((layout.pair_count, 2, 2, layout.depth), dtype=np.float64, buffer=shared_memory.buf,
+                                 offset=layout.header_bytes)
+
+    @classmethod
+    def create(cls, pair_count: int, depth: int) -> "SharedOrderBooks":
+        from multiprocessing import shared_memory
+        size = SharedBookLayout("", pair_count, depth).size
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        books = cls(SharedBookLayout(memory.name, pair_count, depth), memory)
+        books.headers[:] = 0
+        return books
+
+    @classmethod
+    def attach(cls, layout: SharedBookLayout) -> "SharedOrderBooks":
+        from multiprocessing import shared_memory
+        return cls(layout, shared_memory.SharedMemory(name=layout.name))
+
+    def write(self, slot: int, bids: np.ndarray, asks: np.ndarray):
+        """
+        :param bids: (levels, 2) array of price and size, best bid first
+        :param asks: (levels, 2) array of price and size, best ask first
+        """
+        header = self.headers[slot]
+        header[SEQUENCE] += 1
+        for side, levels, count_index in ((SIDE_BID, bids, BID_COUNT), (SIDE_ASK, asks, ASK_COUNT)):
+            count = min(len(levels), self.layout.depth)
+            self.levels[slot, side, :, :count] = levels[:count].T
+            header[count_index] = count
+        header[SEQUENCE] += 1
+
+    def sequence(self, slot: int) -> int:
+        return int(self.headers[slot, SEQUENCE])
+
+    def close(self):
+        # Views into the buffer must be released before the mapping can be closed.
+        self.headers = self.levels = None
+        self.shared_memory.close()
+
+    def unlink(self):
+        self.shared_memory.unlink()
+
+class SharedBookSide(BookSideArrays):
+    """
+    BookSideArrays over one side of the shared books, tagged with the side's sequence. Prices and sizes stay
+    views into shared memory, so results are only valid while the side's sequence is unchanged.
+    """
+    __slots__ = ("sequence",)
+
+    def __init__(self, sequence: int, prices: np.ndarray, sizes: np.ndarray):
+        super().__init__(prices, sizes)
+        self.sequence = sequence
+
+class ShardRoute(NamedTuple):
+    route_id: int
+    slots: Tuple[int, ...]
+    is_buy: Tuple[bool, ...]
+
+class ShardCandidate(NamedTuple):
+    route_id: int
+    profit: float
+
+class ShardResult(NamedTuple):
+    candidates: List[ShardCandidate]
+    routes_evaluated: int
+    retries: int
+    elapsed: float
+
+class ShardEvaluator:
+    """
+    Evaluates one shard of routes on the shared books with float64 depth walks at a fixed start amount.
+    Book sides are only re-derived when their sequence changes; a route whose books were rewritten while
+    it was evaluated is evaluated again.
+    """
+    def __init__(self, books: SharedOrderBooks, routes: Sequence[ShardRoute], max_retries: int = 100):
+        self.books = books
+        self.routes = list(routes)
+        self.max_retries = max_retries
+        self.fee_multipliers: Dict[int, Tuple[float, ...]] = {route.route_id: (1.0,) * len(route.slots)
+                                                              for route in self.routes}
+        self._sides: Dict[Tuple[int, int], SharedBookSide] = {}
+        self.retries: int = 0
+
+    def get_side(self, slot: int, side: int) -> Optional[SharedBookSide]:
+        books = self.books
+        header = books.headers[slot]
+        for _ in range(self.max_retries):
+            sequence = int(header[SEQUENCE])
+            cached = self._sides.get((slot, side))
+            if cached is not None and cached.sequence == sequence:
+                return cached
+            if sequence & 1:
+                self.retries += 1
+                continue
+            count = int(header[ASK_COUNT if side == SIDE_ASK else BID_COUNT])
+            book_side = SharedBookSide(sequence, books.levels[slot, side, 0, :count], books.levels[slot, side, 1, :count])
+            if int(header[SEQUENCE]) == sequence:
+                self._sides[(slot, side)] = book_side
+                return book_side
+            self.retries += 1
+        return None
+
+    def walk_route(self, route: ShardRoute, start_amount: float) -> Optional[Tuple[float, List[SharedBookSide]]]:
+        exchanged_amount = start_amount
+        sides = []
+        for slot, is_buy, multiplier in zip(route.slots, route.is_buy, self.fee_multipliers[route.route_id]):
+            book_side = self.get_side(slot, SIDE_ASK if is_buy else SIDE_BID)
+            if book_side is None or len(book_side.prices) == 0:
+                return None
+            sides.append(book_side)
+            if is_buy:
+                exchanged_amount = book_side.base_for_quote_volume(exchanged_amount)
+            else:
+                exchanged_amount = book_side.quote_for_base_amount(exchanged_amount)
+            exchanged_amount *= multiplier
+        return exchanged_amount, sides
+
+    def evaluate_route(self, route: ShardRoute, start_amount: float) -> Optional[float]:
+        """
+        :return: The profit in percent before quantization, or None if a book side is empty or kept changing
+        """
+        headers = self.books.headers
+        for _ in range(self.max_retries):
+            walked = self.walk_route(route, start_amount)
+            if walked is None:
+                return None
+            end_amount, sides = walked
+            if all(int(headers[slot, SEQUENCE]) == side.sequence for slot, side in zip(route.slots, sides)):
+                return (end_amount - start_amount) / start_amount * 100
+            self.retries += 1
+        return None
+
+    def evaluate(self, start_amount: float, min_profitability: float) -> ShardResult:
+        started = time.perf_counter()
+        retries = self.retries
+        candidates = []
+        for route in self.routes:
+            profit = self.evaluate_route(route, start_amount)
+            if profit is not None and profit >= min_profitability:
+                candidates.append(ShardCandidate(route.route_id, profit))
+        return ShardResult(candidates, len(self.routes), self.retries - retries, time.perf_counter() - started)
+
+def run_shard_worker(connection, layout: SharedBookLayout, routes: List[ShardRoute]):
+    """
+    Worker process loop. Messages are ("fees", {route_id: multipliers}), ("evaluate", start_amount,
+    min_profitability), answered with a ShardResult, and None to exit.
+    """
+    books = SharedOrderBooks.attach(layout)
+    evaluator = ShardEvaluator(books, routes)
+    try:
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            if message[0] == "fees":
+                evaluator.fee_multipliers.update(message[1])
+            elif message[0] == "evaluate":
+                connection.send(evaluator.evaluate(message[1], message[2]))
+    finally:
+        evaluator = None
+        books.close()
+        connection.close()
+
+class ShardedEvaluator:
+    """
+    Spreads the evaluation of many triangles over worker processes. The strategy process copies the top
+    depth levels of every changed book into SharedOrderBooks; each worker owns a fixed subset of the
+    triangles, reads the books in place and sends back only the routes whose estimated profit reaches
+    min_profitability. The estimate is a float walk without quantization, so the strategy re-evaluates
+    the candidates exactly before trading one.
+    Route ids are 2 * triangle index for the direct and 2 * triangle index + 1 for the reverse direction.
+    """
+    def __init__(self, triangles: List[Triangle], workers: int, depth: int = 50, start_method: str = "spawn"):
+        self.triangles = triangles
+        self.workers = max(1, min(workers, len(triangles)))
+        self.depth = depth
+        self.start_method = start_method
+        self.trading_pairs = sorted({pair for triangle in triangles for pair in triangle.direct_pairs})
+        self.slots: Dict[str, int] = {pair: slot for slot, pair in enumerate(self.trading_pairs)}
+        self.books: Optional[SharedOrderBooks] = None
+        self._processes: List[multiprocessing.process.BaseProcess] = []
+        self._connections = []
+        self._shard_routes: List[List[int]] = []
+        self._published_versions: Dict[str, Tuple[int, int]] = {}
+        self.evaluations: int = 0
+        self.routes_evaluated: int = 0
+        self.candidates_found: int = 0
+        self.retries: int = 0
+        self.evaluation_time: float = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self.books is not None
+
+    def get_route(self, route_id: int) -> Tuple[Triangle, str]:
+        return self.triangles[route_id // 2], DIRECTIONS[route_id % 2]
+
+    def make_route(self, route_id: int) -> ShardRoute:
+        triangle, direction = self.get_route(route_id)
+        return ShardRoute(route_id, tuple(self.slots[pair] for pair in triangle.pairs(direction)),
+                          tuple(side == TradeType.BUY for side in triangle.sides(direction)))
+
+    def start(self):
+        if self.started:
+            return
+        self.books = SharedOrderBooks.create(len(self.trading_pairs), self.depth)
+        context = multiprocessing.get_context(self.start_method)
+        for shard in range(self.workers):
+            route_ids = [2 * index + offset for index in range(shard, len(self.triangles), self.workers)
+                         for offset in (0, 1)]
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(target=run_shard_worker, name=f"triangle-shard-{shard}", daemon=True,
+                                      args=(child_connection, self.books.layout,
+                                            [self.make_route(route_id) for route_id in route_ids]))
+            process.start()
+            child_connection.close()
+            self._processes.append(process)
+            self._connections.append(parent_connection)
+            self._shard_routes.append(route_ids)
+
+    def stop(self):
+        if not self.started:
+            return
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self._connections:
+            connection.close()
+        self._processes, self._connections, self._shard_routes = [], [], []
+        self._published_versions.clear()
+        self.books.close()
+        self.books.unlink()
+        self.books = None
+
+    def publish_book(self, pair: str, orderbook):
+        bids, asks = snapshot_levels(orderbook, self.depth)
+        self.books.write(self.slots[pair], bids, asks)
+
+    def publish_books(self, connector: ConnectorBase) -> int:
+        """
+        Copies every book whose version changed since it was last published into shared memory.
+
+        :return: The number of books written
+        """
+        written = 0
+        for pair in self.trading_pairs:
+            orderbook = connector.get_order_book(pair)
+            version = (orderbook.snapshot_uid, orderbook.last_diff_uid)
+            if self._published_versions.get(pair) != version:
+                self.publish_book(pair, orderbook)
+                self._published_versions[pair] = version
+                written += 1
+        return written
+
+    def set_fee_multipliers(self, multipliers: Dict[int, Iterable[float]]):
+        """
+        :param multipliers: Route id -> (1 - fee) multiplier of each leg
+        """
+        for connection, route_ids in zip(self._connections, self._shard_routes):
+            connection.send(("fees", {route_id: tuple(float(value) for value in multipliers[route_id])
+                                      for route_id in route_ids if route_id in multipliers}))
+
+    def evaluate(self, start_amount: float, min_profitability: float) -> List[ShardCandidate]:
+        """
+        Evaluates every route in parallel on the published books.
+
+        :return: The candidates of all shards, most profitable first
+        """
+        started = time.perf_counter()
+        for connection in self._connections:
+            connection.send(("evaluate", start_amount, min_profitability))
+        candidates = []
+        for connection in self._connections:
+            result: ShardResult = connection.recv()
+            candidates.extend(result.candidates)
+            self.routes_evaluated += result.routes_evaluated
+            self.retries += result.retries
+        candidates.sort(key=lambda candidate: candidate.profit, reverse=True)
+        self.evaluations += 1
+        self.candidates_found += len(candidates)
+        self.evaluation_time += time.perf_counter() - started
+        return candidates
+
+    @property
+    def triangles_per_second(self) -> float:
+        return self.routes_evaluated / 2 / self.evaluation_time if self.evaluation_time else 0.0
+
+    def format(self) -> str:
+        return (f"{self.workers} workers, {len(self.triangles)} triangles, {self.triangles_per_second:,.0f} triangles/s, "
+                f"{self.candidates_found} candidates, {self.retries} seqlock retries")
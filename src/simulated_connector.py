@@ -0,0 +1,362 @@
+import copy
+import heapq
+import itertools
+import random
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from hummingbot.connector.trading_rule import TradingRule
+from hummingbot.core.data_type.common import OrderType, TradeType
+from hummingbot.core.data_type.order_book_query_result import OrderBookQueryResult
+from hummingbot.core.data_type.order_book_row import OrderBookRow
+from hummingbot.core.data_type.order_candidate import OrderCandidate
+from hummingbot.core.data_type.trade_fee import DeductedFromReturnsTradeFee, TradeFeeSchema
+from hummingbot.core.event.events import (
+    BuyOrderCompletedEvent,
+    BuyOrderCreatedEvent,
+    MarketOrderFailureEvent,
+    OrderCancelledEvent,
+    OrderFilledEvent,
+    SellOrderCompletedEvent,
+    SellOrderCreatedEvent,
+)
+
+from book_recording import KIND_SNAPSHOT, SIDE_ASK
+from utils import split_trading_pair
+
+class SimulatedOrderBook:
+    """
+    An order book kept as price -> amount maps. Sorted entries are rebuilt lazily after an update and
+    snapshot_uid/last_diff_uid follow the replayed update ids, like a live OrderBook.
+    """
+    def __init__(self, trading_pair: str):
+        self.trading_pair = trading_pair
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self.snapshot_uid: int = 0
+        self.last_diff_uid: int = 0
+        self._bid_entries: Optional[List[OrderBookRow]] = None
+        self._ask_entries: Optional[List[OrderBookRow]] = None
+
+    def apply_snapshot(self, bids: List[Tuple[float, float]], asks: List[Tuple[float, float]], update_id: int):
+        self.bids = {price: amount for price, amount in bids if amount > 0}
+        self.asks = {price: amount for price, amount in asks if amount > 0}
+        self.snapshot_uid = update_id
+        self._bid_entries = self._ask_entries = None
+
+    def apply_diff(self, is_ask: bool, price: float, amount: float, update_id: int):
+        levels = self.asks if is_ask else self.bids
+        if amount > 0:
+            levels[price] = amount
+        else:
+            levels.pop(price, None)
+        self.last_diff_uid = update_id
+        if is_ask:
+            self._ask_entries = None
+        else:
+            self._bid_entries = None
+
+    def bid_entries(self) -> List[OrderBookRow]:
+        if self._bid_entries is None:
+            self._bid_entries = [OrderBookRow(price, self.bids[price], self.last_diff_uid)
+                                 for price in sorted(self.bids, reverse=True)]
+        return self._bid_entries
+
+    def ask_entries(self) -> List[OrderBookRow]:
+        if self._ask_entries is None:
+            self._ask_entries = [OrderBookRow(price, self.asks[price], self.last_diff_uid) for price in sorted(self.asks)]
+        return self._ask_entries
+
+    def get_price(self, is_buy: bool) -> float:
+        entries = self._ask_entries if is_buy else self._bid_entries
+        if entries is not None:
+            return entries[0].price if entries else float("nan")
+        # A linear scan is cheaper than sorting the whole side for the best price only.
+        levels = self.asks if is_buy else self.bids
+        if not levels:
+            return float("nan")
+        return min(levels) if is_buy else max(levels)
+
+    def add_listener(self, event_tag, listener):
+        pass
+
+    def remove_listener(self, event_tag, listener):
+        pass
+
+@dataclass
+class FillModel:
+    """
+    How the simulated exchange executes market orders. The defaults fill every order in one piece,
+    without taking the liquidity off the book.
+    """
+    # Matched levels are reduced or removed from the book, as a matching engine would.
+    consume_liquidity: bool = False
+    # Fill events an order is split into before it completes.
+    fills_per_order: int = 1
+    # Probability that the exchange rejects an order.
+    failure_rate: float = 0.0
+    # Uniform random latency in seconds added to order_latency.
+    latency_jitter: float = 0.0
+    seed: int = 0
+
+@dataclass
+class SimulatedOrder:
+    order_id: str
+    trading_pair: str
+    is_buy: bool
+    amount: Decimal
+    order_type: OrderType
+    price: Decimal
+    submitted_at: float
+
+class SimulatedBudgetChecker:
+    def __init__(self, connector: "SimulatedConnector"):
+        self.connector = connector
+
+    def adjust_candidate(self, order_candidate: OrderCandidate, all_or_none: bool = True) -> OrderCandidate:
+        base, quote = split_trading_pair(order_candidate.trading_pair)
+        if order_candidate.order_side == TradeType.BUY:
+            asset, required = quote, order_candidate.amount * order_candidate.price
+        else:
+            asset, required = base, order_candidate.amount
+        available = self.connector.get_available_balance(asset)
+        adjusted = copy.copy(order_candidate)
+        if required > available:
+            adjusted.amount = Decimal("0") if all_or_none or required == 0 else adjusted.amount * available / required
+        return adjusted
+
+class SimulatedConnector:
+    """
+    Connector replacement that fills market orders against simulated order books and reports the results
+    through the same order events a live connector emits. Orders execute when process_orders is called
+    with a timestamp at or past their submission time plus order_latency; fill_model sets how.
+    """
+    def __init__(self, trading_pairs: List[str], balances: Dict[str, Decimal], fee_percent: Decimal = Decimal("0.001"),
+                 trading_rules: Optional[Dict[str, TradingRule]] = None, order_latency: float = 0.0,
+                 fill_model: Optional[FillModel] = None):
+        self.trading_pairs = list(trading_pairs)
+        self.order_books: Dict[str, SimulatedOrderBook] = {pair: SimulatedOrderBook(pair) for pair in self.trading_pairs}
+        self.balances: Dict[str, Decimal] = dict(balances)
+        self.fee_percent = fee_percent
+        # Same attribute exchange connectors use, so FeeSchedule prices routes with the simulated fee.
+        self._trading_fees: Dict[str, TradeFeeSchema] = {
+            pair: TradeFeeSchema(maker_percent_fee_decimal=fee_percent, taker_percent_fee_decimal=fee_percent)
+            for pair in self.trading_pairs
+        }
+        self.trading_rules: Dict[str, TradingRule] = trading_rules or {
+            pair: TradingRule(pair, min_order_size=Decimal("0"), min_price_increment=Decimal("1e-8"),
+                              min_base_amount_increment=Decimal("1e-8"), min_notional_size=Decimal("0"))
+            for pair in self.trading_pairs
+        }
+        self.order_latency = order_latency
+        self.fill_model = fill_model or FillModel()
+        self._rng = random.Random(self.fill_model.seed)
+        self.budget_checker = SimulatedBudgetChecker(self)
+        self.current_timestamp: float = 0.0
+        self.listeners: List[object] = []
+        self.filled_orders: int = 0
+        self.failed_orders: int = 0
+        self._order_queue: List[Tuple[float, int, SimulatedOrder]] = []
+        self._order_seq = itertools.count()
+
+    def add_listener(self, listener: object):
+        self.listeners.append(listener)
+
+    def emit(self, handler_name: str, event):
+        for listener in self.listeners:
+            handler = getattr(listener, handler_name, None)
+            if handler is not None:
+                handler(event)
+
+    # Market data
+
+    def get_order_book(self, trading_pair: str) -> SimulatedOrderBook:
+        return self.order_books[trading_pair]
+
+    def apply_records(self, records: np.ndarray, trading_pairs: List[str]):
+        """
+        Applies recorded order book updates. Consecutive snapshot rows with the same pair and update id
+        form one snapshot.
+        """
+        snapshot_key = None
+        snapshot_bids: List[Tuple[float, float]] = []
+        snapshot_asks: List[Tuple[float, float]] = []
+
+        def flush_snapshot():
+            pair_id, update_id = snapshot_key
+            self.order_books[trading_pairs[pair_id]].apply_snapshot(snapshot_bids, snapshot_asks, update_id)
+
+        columns = zip(records["pair_id"].tolist(), records["side"].tolist(), records["kind"].tolist(),
+                      records["price"].tolist(), records["amount"].tolist(), records["update_id"].tolist())
+        for pair_id, side, kind, price, amount, update_id in columns:
+            if kind == KIND_SNAPSHOT:
+                if snapshot_key != (pair_id, update_id):
+                    if snapshot_key is not None:
+                        flush_snapshot()
+                    snapshot_key, snapshot_bids, snapshot_asks = (pair_id, update_id), [], []
+                (snapshot_asks if side == SIDE_ASK else snapshot_bids).append((price, amount))
+                continue
+            if snapshot_key is not None:
+                flush_snapshot()
+                snapshot_key = None
+            self.order_books[trading_pairs[pair_id]].apply_diff(side == SIDE_ASK, price, amount, update_id)
+        if snapshot_key is not None:
+            flush_snapshot()
+
+    def get_price(self, trading_pair: str, is_buy: bool) -> Decimal:
+        return Decimal(str(self.order_books[trading_pair].get_price(is_buy)))
+
+    def walk_book(self, trading_pair: str, is_buy: bool, base_amount: Decimal) -> Tuple[Decimal, Decimal, Decimal]:
+        """
+        :return: The base amount available up to base_amount, its quote volume and the price of the last level used
+        """
+        entries = self.order_books[trading_pair].ask_entries() if is_buy else self.order_books[trading_pair].bid_entries()
+        remaining = float(base_amount)
+        filled = quote_volume = 0.0
+        last_price = float("nan")
+        for price, amount, _ in entries:
+            if remaining <= 0:
+                break
+            take = min(amount, remaining)
+            filled += take
+            quote_volume += take * price
+            remaining -= take
+            last_price = price
+        filled_amount = base_amount if remaining <= float(base_amount) * 1e-12 else Decimal(str(filled))
+        return filled_amount, Decimal(str(quote_volume)), Decimal(str(last_price))
+
+    def get_price_for_volume(self, trading_pair: str, is_buy: bool, volume: Decimal) -> OrderBookQueryResult:
+        _, _, last_price = self.walk_book(trading_pair, is_buy, volume)
+        return OrderBookQueryResult(None, volume, last_price, volume)
+
+    def get_quote_volume_for_base_amount(self, trading_pair: str, is_buy: bool, base_amount: Decimal) -> OrderBookQueryResult:
+        _, quote_volume, _ = self.walk_book(trading_pair, is_buy, base_amount)
+        return OrderBookQueryResult(None, base_amount, None, quote_volume)
+
+    # Trading rules and balances
+
+    def quantize_order_amount(self, trading_pair: str, amount: Decimal) -> Decimal:
+        trading_rule = self.trading_rules[trading_pair]
+        quantized = (amount // trading_rule.min_base_amount_increment) * trading_rule.min_base_amount_increment
+        return quantized if quantized >= trading_rule.min_order_size else Decimal("0")
+
+    def quantize_order_price(self, trading_pair: str, price: Decimal) -> Decimal:
+        increment = self.trading_rules[trading_pair].min_price_increment
+        return (price // increment) * increment
+
+    def get_balance(self, asset: str) -> Decimal:
+        return self.balances.get(asset, Decimal("0"))
+
+    def get_available_balance(self, asset: str) -> Decimal:
+        return self.balances.get(asset, Decimal("0"))
+
+    # Orders
+
+    def buy(self, trading_pair: str, amount: Decimal, order_type: OrderType = OrderType.MARKET,
+            price: Decimal = Decimal("NaN"), **kwargs) -> str:
+        return self.submit_order(trading_pair, True, amount, order_type, price)
+
+    def sell(self, trading_pair: str, amount: Decimal, order_type: OrderType = OrderType.MARKET,
+             price: Decimal = Decimal("NaN"), **kwargs) -> str:
+        return self.submit_order(trading_pair, False, amount, order_type, price)
+
+    def submit_order(self, trading_pair: str, is_buy: bool, amount: Decimal, order_type: OrderType, price: Decimal) -> str:
+        seq = next(self._order_seq)
+        order_id = f"{'buy' if is_buy else 'sell'}-{trading_pair}-{seq}"
+        order = SimulatedOrder(order_id, trading_pair, is_buy, amount, order_type, price, self.current_timestamp)
+        latency = self.order_latency
+        if self.fill_model.latency_jitter:
+            latency += self._rng.uniform(0, self.fill_model.latency_jitter)
+        heapq.heappush(self._order_queue, (self.current_timestamp + latency, seq, order))
+        return order_id
+
+    def cancel(self, trading_pair: str, order_id: str) -> str:
+        for index, (_, _, order) in enumerate(self._order_queue):
+            if order.order_id == order_id:
+                self._order_queue.pop(index)
+                heapq.heapify(self._order_queue)
+                self.emit("did_cancel_order", OrderCancelledEvent(self.current_timestamp, order_id))
+                break
+        return order_id
+
+    def cancel_order(self, order_id: str) -> str:
+        trading_pair = next((order.trading_pair for _, _, order in self._order_queue if order.order_id == order_id), "")
+        return self.cancel(trading_pair, order_id)
+
+    @property
+    def has_pending_orders(self) -> bool:
+        return bool(self._order_queue)
+
+    def process_orders(self, timestamp: float):
+        """
+        Executes every order due at the timestamp, including orders placed by event handlers meanwhile.
+        """
+        self.current_timestamp = timestamp
+        while self._order_queue and self._order_queue[0][0] <= timestamp:
+            _, _, order = heapq.heappop(self._order_queue)
+            self.execute_order(order)
+
+    def execute_order(self, order: SimulatedOrder):
+        base, quote = split_trading_pair(order.trading_pair)
+        created_event_class = BuyOrderCreatedEvent if order.is_buy else SellOrderCreatedEvent
+        self.emit("did_create_buy_order" if order.is_buy else "did_create_sell_order", created_event_class(
+            timestamp=self.current_timestamp, type=order.order_type, trading_pair=order.trading_pair,
+            amount=order.amount, price=order.price, order_id=order.order_id, creation_timestamp=order.submitted_at))
+
+        filled, quote_volume, _ = self.walk_book(order.trading_pair, order.is_buy, order.amount)
+        spent_asset, spent_amount = (quote, quote_volume) if order.is_buy else (base, order.amount)
+        rejected = self.fill_model.failure_rate > 0 and self._rng.random() < self.fill_model.failure_rate
+        if filled < order.amount or self.get_balance(spent_asset) < spent_amount or rejected:
+            self.failed_orders += 1
+            self.emit("did_fail_order", MarketOrderFailureEvent(self.current_timestamp, order.order_id, order.order_type))
+            return
+        if self.fill_model.consume_liquidity:
+            self.match(order.trading_pair, order.is_buy, float(order.amount))
+
+        fee = DeductedFromReturnsTradeFee(percent=self.fee_percent)
+        if order.is_buy:
+            self.balances[quote] = self.get_balance(quote) - quote_volume
+            self.balances[base] = self.get_balance(base) + order.amount * (1 - self.fee_percent)
+        else:
+            self.balances[base] = self.get_balance(base) - order.amount
+            self.balances[quote] = self.get_balance(quote) + quote_volume * (1 - self.fee_percent)
+        self.filled_orders += 1
+
+        trade_type = TradeType.BUY if order.is_buy else TradeType.SELL
+        for amount in self.split_fill(order.amount):
+            self.emit("did_fill_order", OrderFilledEvent(
+                timestamp=self.current_timestamp, order_id=order.order_id, trading_pair=order.trading_pair,
+                trade_type=trade_type, order_type=order.order_type, price=quote_volume / order.amount,
+                amount=amount, trade_fee=fee))
+        completed_event_class = BuyOrderCompletedEvent if order.is_buy else SellOrderCompletedEvent
+        self.emit("did_complete_buy_order" if order.is_buy else "did_complete_sell_order", completed_event_class(
+            timestamp=self.current_timestamp, order_id=order.order_id, base_asset=base, quote_asset=quote,
+            base_asset_amount=order.amount, quote_asset_amount=quote_volume, order_type=order.order_type))
+
+    def split_fill(self, amount: Decimal) -> List[Decimal]:
+        """
+        :return: The amounts of the fill events of an order, fills_per_order equal parts with the remainder in the last
+        """
+        count = max(self.fill_model.fills_per_order, 1)
+        if count == 1:
+            return [amount]
+        part = amount / count
+        return [part] * (count - 1) + [amount - part * (count - 1)]
+
+    def match(self, trading_pair: str, is_buy: bool, amount: float):
+        """
+        Takes amount off the opposite side of the book, best level first, as diffs with a new update id.
+        """
+        book = self.order_books[trading_pair]
+        update_id = max(book.snapshot_uid, book.last_diff_uid) + 1
+        entries = book.ask_entries() if is_buy else book.bid_entries()
+        remaining = amount
+        for price, level_amount, _ in list(entries):
+            if remaining <= 0:
+                break
+            take = min(level_amount, remaining)
+            remaining -= take
+            book.apply_diff(is_buy, price, level_amount - take if level_amount - take > level_amount * 1e-12 else 0.0,
+                            update_id)
@@ -0,0 +1,345 @@
+import json
+import logging
+import os
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from hummingbot.core.clock import Clock
+from hummingbot.core.data_type.common import OrderType
+from hummingbot.core.event.events import (
+    BuyOrderCompletedEvent,
+    BuyOrderCreatedEvent,
+    MarketOrderFailureEvent,
+    OrderCancelledEvent,
+    OrderFilledEvent,
+    SellOrderCompletedEvent,
+    SellOrderCreatedEvent,
+)
+from hummingbot.strategy.strategy_base import StrategyBase
+
+from arbitrage_cycle import ArbitrageCycle
+from async_logging import AsyncLogging
+from balance_ledger import BalanceLedger
+from config import StrategyHostConfig, TriangularArbitrageConfig, config_from_dict
+from main import EnhancedTriangularArbitrage
+from order_book_analyzer import OrderBookAnalyzer
+from request_scheduler import RequestScheduler
+from vectorized_order_book_analyzer import VectorizedOrderBookAnalyzer
+
+if TYPE_CHECKING:
+    from market_data_capture import MarketDataCapture
+    from opportunity_journal import OpportunityJournal
+
+def load_strategy_configs(path: str) -> Dict[str, TriangularArbitrageConfig]:
+    """
+    Reads a strategy host file of the form {"defaults": {...}, "strategies": {"name": {...}, ...}}.
+    Each strategy's fields are layered over the defaults, which are layered over the environment.
+
+    :raises OSError: If the file cannot be read
+    :raises ValueError: If the file is not valid JSON or a field is unknown or invalid
+    """
+    with open(path) as f:
+        document = json.load(f)
+    if not isinstance(document, dict):
+        raise ValueError(f"{path} must hold a JSON object")
+    defaults = config_from_dict(document.get("defaults", {}))
+    strategies = document.get("strategies")
+    if not isinstance(strategies, dict) or not strategies:
+        raise ValueError(f"{path} defines no strategies")
+    configs = {}
+    for name, values in strategies.items():
+        try:
+            configs[name] = config_from_dict(values, defaults)
+        except ValueError as e:
+            raise ValueError(f"Strategy {name}: {str(e)}") from e
+    return configs
+
+class HostedStrategy(EnhancedTriangularArbitrage):
+    """
+    EnhancedTriangularArbitrage run by a StrategyHost. The host owns the market subscriptions, the clock and order
+    placement; the strategy takes its connectors, timestamp, depth arrays and analyzer from the host and counts the
+    cycles of the other hosted strategies on its connector against the shared balances. Market data capture, the
+    opportunity journal and async logging are process-wide services that the host owns, starts and stops.
+    """
+    def __init__(self, name: str, config: TriangularArbitrageConfig, host: "StrategyHost"):
+        self.name = name
+        self.host = host
+        super().__init__(config)
+
+    @property
+    def connectors(self):
+        return self.host.connectors
+
+    @property
+    def current_timestamp(self) -> float:
+        return self.host.current_timestamp
+
+    def _add_markets(self, markets):
+        pass
+
+    def create_depth_arrays(self) -> VectorizedOrderBookAnalyzer:
+        return self.host.get_shared((self.config.connector_name, "depth_arrays"), super().create_depth_arrays)
+
+    def create_request_scheduler(self) -> RequestScheduler:
+        # One set of buckets per connector, since the exchange counts the requests of the whole account.
+        return self.host.get_shared((self.config.connector_name, "request_scheduler"), super().create_request_scheduler)
+
+    def create_order_book_analyzer(self) -> OrderBookAnalyzer:
+        return self.host.get_shared((self.config.connector_name, self.config.order_book_analyzer),
+                                    super().create_order_book_analyzer)
+
+    def create_market_data_capture(self) -> Optional["MarketDataCapture"]:
+        # The host captures the books of all strategies into one set of files.
+        return None
+
+    def create_opportunity_journal(self) -> Optional["OpportunityJournal"]:
+        if not self.config.opportunity_journal_path:
+            return None
+        return self.host.get_service(("opportunity_journal", self.config.opportunity_journal_path),
+                                     super().create_opportunity_journal)
+
+    def create_async_logging(self) -> Optional[AsyncLogging]:
+        return None
+
+    def start_services(self):
+        pass
+
+    def stop_services(self):
+        pass
+
+    def get_account_cycles(self) -> List[ArbitrageCycle]:
+        return [cycle for strategy in self.host.children if strategy.config.connector_name == self.config.connector_name
+                for cycle in strategy.cycles]
+
+    def buy(self, connector_name: str, trading_pair: str, amount: Decimal, order_type: OrderType, price: Decimal) -> str:
+        return self.host.buy(connector_name, trading_pair, amount, order_type, price)
+
+    def sell(self, connector_name: str, trading_pair: str, amount: Decimal, order_type: OrderType, price: Decimal) -> str:
+        return self.host.sell(connector_name, trading_pair, amount, order_type, price)
+
+    def cancel(self, connector_name: str, order_id: str):
+        self.host.cancel(connector_name, order_id)
+
+class StrategyHost(StrategyBase):
+    """
+    Runs the triangle strategies of a host file in one process. The markets of all strategies are registered once,
+    so every pair has a single book, and the strategies on a connector share one set of depth arrays and one
+    analyzer per kind. Order events are forwarded to every strategy, which ignores the orders of the others.
+    Market data capture runs once per connector over all subscribed pairs, strategies journaling to the same path
+    share one journal, and async logging is set up once if any strategy asks for it.
+
+    The file is checked for changes every reload_interval seconds. A changed or removed strategy stops starting
+    cycles and is replaced or dropped once its cycles in flight are done; unchanged strategies keep running.
+    Pairs that are not yet subscribed cannot be added by a reload, since markets are registered at startup.
+    """
+    def __init__(self, host_config: Optional[StrategyHostConfig] = None):
+        super().__init__()
+        self.host_config = host_config or StrategyHostConfig()
+        self.logger = logging.getLogger(__name__)
+        self.configs = load_strategy_configs(self.host_config.config_path)
+        self._config_stamp = self.get_config_stamp()
+        self._last_reload_check: float = 0.0
+        self.reloads: int = 0
+        self.rejected_reloads: int = 0
+        self.markets: Dict[str, Set[str]] = {}
+        for config in self.configs.values():
+            self.markets.setdefault(config.connector_name, set()).update(config.market_pairs)
+        self.shared: Dict[Tuple[str, str], Any] = {}
+        self.strategies: Dict[str, HostedStrategy] = {}
+        # Strategies finishing their cycles after a reload, and the configs waiting for them.
+        self.draining: Dict[str, HostedStrategy] = {}
+        self.pending: Dict[str, TriangularArbitrageConfig] = {}
+        # Started with the first tick, and stopped after the strategies.
+        self.services: List[Any] = []
+        self.market_data_captures: List["MarketDataCapture"] = []
+        self._services_started: bool = False
+        self.async_logging: Optional[AsyncLogging] = None
+        async_configs = [config for config in self.configs.values() if config.log_mode == "async"]
+        if async_configs:
+            self.async_logging = AsyncLogging([logging.getLogger(EnhancedTriangularArbitrage.__module__),
+                                               logging.getLogger(BalanceLedger.__module__), self.logger],
+                                              async_configs[0].log_queue_size)
+        self._add_markets(self.markets)
+        for name, config in self.configs.items():
+            self.start_strategy(name, config)
+
+    @property
+    def children(self) -> List[HostedStrategy]:
+        return [*self.strategies.values(), *self.draining.values()]
+
+    def get_shared(self, key: Tuple[str, str], factory: Callable[[], Any]) -> Any:
+        """
+        :return: The object shared by the strategies under key, created by the first strategy that asks for it
+        """
+        shared = self.shared.get(key)
+        if shared is None:
+            shared = self.shared[key] = factory()
+        return shared
+
+    def get_service(self, key: Tuple[str, str], factory: Callable[[], Any]) -> Any:
+        """
+        :return: The shared object under key, which the host starts and stops with its other services
+        """
+        service = self.shared.get(key)
+        if service is None:
+            service = self.get_shared(key, factory)
+            self.services.append(service)
+            if self._services_started:
+                service.start()
+        return service
+
+    def create_services(self, config: TriangularArbitrageConfig):
+        if config.market_data_capture_enabled:
+            key = (config.connector_name, "market_data_capture")
+            if key not in self.shared:
+                from market_data_capture import MarketDataCapture
+                self.market_data_captures.append(self.get_service(key, lambda: MarketDataCapture(
+                    self.connectors[config.connector_name], sorted(self.markets[config.connector_name]),
+                    config.market_data_capture_dir, depth=config.market_data_capture_depth)))
+
+    def start_services(self):
+        if self.async_logging is not None:
+            self.async_logging.start()
+        for service in self.services:
+            service.start()
+        self._services_started = True
+
+    def create_strategy(self, name: str, config: TriangularArbitrageConfig) -> HostedStrategy:
+        return HostedStrategy(name, config, self)
+
+    def start_strategy(self, name: str, config: TriangularArbitrageConfig):
+        self.create_services(config)
+        self.strategies[name] = self.create_strategy(name, config)
+        self.logger.info(f"Started strategy {name}: {config.first_pair}, {config.second_pair}, {config.third_pair} "
+                         f"on {config.connector_name}.")
+
+    def drain(self, name: str):
+        strategy = self.strategies.pop(name)
+        strategy.status = "NOT_ACTIVE"
+        self.draining[name] = strategy
+
+    def on_tick(self):
+        if not self._services_started:
+            self.start_services()
+        for capture in self.market_data_captures:
+            capture.capture(self.current_timestamp)
+        self.maybe_reload()
+        for strategy in self.children:
+            try:
+                strategy.on_tick()
+            except Exception as e:
+                self.logger.error(f"Error in strategy {strategy.name}: {str(e)}")
+                strategy.status = "NOT_ACTIVE"
+        for name, strategy in list(self.draining.items()):
+            if not strategy.arbitrage_in_progress():
+                strategy.stop()
+                del self.draining[name]
+                self.logger.info(f"Stopped strategy {name}.")
+        for name in [name for name in self.pending if name not in self.draining]:
+            self.start_strategy(name, self.pending.pop(name))
+
+    def get_config_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.host_config.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def maybe_reload(self):
+        if self.current_timestamp - self._last_reload_check < self.host_config.reload_interval:
+            return
+        self._last_reload_check = self.current_timestamp
+        stamp = self.get_config_stamp()
+        if stamp is not None and stamp != self._config_stamp:
+            self._config_stamp = stamp
+            self.reload()
+
+    def reload(self):
+        """
+        Applies the host file to the running strategies. If the file cannot be read, the running configs are kept.
+        """
+        path = self.host_config.config_path
+        try:
+            configs = load_strategy_configs(path)
+        except (OSError, ValueError) as e:
+            self.rejected_reloads += 1
+            self.logger.error(f"Could not reload {path}, keeping the running strategies: {str(e)}")
+            return
+        for name, config in list(configs.items()):
+            unsubscribed = config.market_pairs - self.markets.get(config.connector_name, set())
+            if not unsubscribed:
+                continue
+            self.rejected_reloads += 1
+            self.logger.error(f"Strategy {name} trades {', '.join(sorted(unsubscribed))}, which are not subscribed on "
+                              f"{config.connector_name}. Restart the host to add markets.")
+            if name in self.configs:
+                configs[name] = self.configs[name]
+            else:
+                del configs[name]
+
+        changed = sorted(name for name in self.configs.keys() | configs.keys()
+                         if self.configs.get(name) != configs.get(name))
+        for name in changed:
+            self.pending.pop(name, None)
+            if name in self.strategies:
+                self.drain(name)
+            if name in configs:
+                self.pending[name] = configs[name]
+        self.configs = configs
+        self.reloads += 1
+        self.logger.info(f"Reloaded {path}: {', '.join(changed) or 'no changes'}.")
+
+    def forward(self, handler: Callable[[HostedStrategy], None]):
+        for strategy in self.children:
+            handler(strategy)
+
+    def did_create_buy_order(self, event: BuyOrderCreatedEvent):
+        self.forward(lambda strategy: strategy.did_create_buy_order(event))
+
+    def did_create_sell_order(self, event: SellOrderCreatedEvent):
+        self.forward(lambda strategy: strategy.did_create_sell_order(event))
+
+    def did_complete_buy_order(self, event: BuyOrderCompletedEvent):
+        self.forward(lambda strategy: strategy.did_complete_buy_order(event))
+
+    def did_complete_sell_order(self, event: SellOrderCompletedEvent):
+        self.forward(lambda strategy: strategy.did_complete_sell_order(event))
+
+    def did_fail_order(self, event: MarketOrderFailureEvent):
+        self.forward(lambda strategy: strategy.did_fail_order(event))
+
+    def did_cancel_order(self, event: OrderCancelledEvent):
+        self.forward(lambda strategy: strategy.did_cancel_order(event))
+
+    def did_fill_order(self, event: OrderFilledEvent):
+        # Every strategy's ledger tracks the shared balances, so fills of the others are applied too.
+        self.forward(lambda strategy: strategy.did_fill_order(event))
+
+    def format_status(self) -> str:
+        lines = []
+        lines.append(f"Strategies: {len(self.strategies)} running, {len(self.draining)} draining, "
+                     f"{len(self.pending)} waiting to start")
+        for connector_name, pairs in sorted(self.markets.items()):
+            depth_arrays = self.shared.get((connector_name, "depth_arrays"))
+            sides = f", {depth_arrays.cached_sides} book sides in shared depth arrays" if depth_arrays is not None else ""
+            lines.append(f"Markets: {len(pairs)} pairs on {connector_name}{sides}")
+        lines.append(f"Config reloads: {self.reloads} from {self.host_config.config_path}, {self.rejected_reloads} rejected")
+        for capture in self.market_data_captures:
+            lines.append(f"Market data capture: {capture.format()}")
+        if self.async_logging is not None:
+            lines.append(f"Async logging: {self.async_logging.format()}")
+        for name, strategy in [*self.strategies.items(), *((f"{name} (draining)", strategy)
+                                                           for name, strategy in self.draining.items())]:
+            lines.append(f"[{name}]")
+            lines.extend(f"  {line}" for line in strategy.format_status().splitlines())
+        return "\n".join(lines)
+
+    def stop(self, clock: Optional[Clock] = None):
+        for strategy in self.children:
+            strategy.stop(clock)
+        for service in self.services:
+            service.stop()
+        super().stop(clock)
+        # Last, so the records logged while stopping are written too.
+        if self.async_logging is not None:
+            self.async_logging.stop()
@@ -0,0 +1,97 @@
+import math
+from typing import Dict, Tuple
+
+from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot.core.data_type.common import TradeType
+
+from book_version_cache import BookVersion, BookVersionCache
+from fee_schedule import FeeSchedule
+from route import Route
+
+def get_best_price(orderbook, is_buy: bool) -> float:
+    """
+    :return: The best ask or bid of the book, NaN if that side is empty
+    """
+    try:
+        return float(orderbook.get_price(is_buy))
+    except EnvironmentError:
+        # Hummingbot's order books raise instead of returning NaN for an empty side.
+        return math.nan
+
+class TopOfBookFilter:
+    """
+    First stage of route evaluation. The best price of every leg times the leg's fee multiplier bounds
+    the profit from above: walking deeper into a book only reaches worse prices and quantization only
+    rounds amounts down. Routes whose bound is below min_profitability skip the depth walk.
+    Best prices are read once per book version and fee products once per fee schedule version.
+    """
+    def __init__(self, connector: ConnectorBase, fee_schedule: FeeSchedule, book_version_cache: BookVersionCache,
+                 tolerance: float = 1e-9):
+        self.connector = connector
+        self.fee_schedule = fee_schedule
+        self.book_version_cache = book_version_cache
+        # The bound is computed in floats; routes within tolerance of the threshold are walked anyway.
+        self.tolerance = tolerance
+        self.evaluations: int = 0
+        self.pruned: int = 0
+        self._best_prices: Dict[str, Tuple[BookVersion, float, float]] = {}
+        self._fee_products: Dict[Tuple[Tuple[str, ...], Tuple[TradeType, ...]], Tuple[int, float]] = {}
+
+    def get_best_prices(self, pair: str) -> Tuple[float, float]:
+        """
+        :return: The best bid and best ask, NaN for an empty side
+        """
+        version = self.book_version_cache.get_book_version(pair)
+        cached = self._best_prices.get(pair)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        orderbook = self.connector.get_order_book(pair)
+        best_bid, best_ask = get_best_price(orderbook, False), get_best_price(orderbook, True)
+        self._best_prices[pair] = (version, best_bid, best_ask)
+        return best_bid, best_ask
+
+    def get_fee_product(self, route: Route) -> float:
+        key = (route.trading_pairs, route.order_sides)
+        cached = self._fee_products.get(key)
+        if cached is not None and cached[0] == self.fee_schedule.version:
+            return cached[1]
+        product = 1.0
+        for multiplier in self.fee_schedule.get_multipliers(route.trading_pairs, route.order_sides):
+            product *= float(multiplier)
+        self._fee_products[key] = (self.fee_schedule.version, product)
+        return product
+
+    def upper_bound(self, route: Route) -> float:
+        """
+        :return: The highest profit in percent the route can reach, -100 if a book side is empty
+        """
+        rate = self.get_fee_product(route)
+        for leg in route.legs:
+            best_bid, best_ask = self.get_best_prices(leg.trading_pair)
+            if leg.is_buy:
+                if not best_ask > 0:
+                    return -100.0
+                rate /= best_ask
+            else:
+                if not best_bid > 0:
+                    return -100.0
+                rate *= best_bid
+        return (rate - 1) * 100
+
+    def check(self, route: Route, min_profitability: float) -> Tuple[bool, float]:
+        """
+        :return: Whether the route can reach min_profitability and its upper bound
+        """
+        self.evaluations += 1
+        bound = self.upper_bound(route)
+        if bound < min_profitability - self.tolerance:
+            self.pruned += 1
+            return False, bound
+        return True, bound
+
+    @property
+    def pruned_rate(self) -> float:
+        return self.pruned / self.evaluations if self.evaluations else 0.0
+
+    def format(self) -> str:
+        return f"pruned {self.pruned} of {self.evaluations} evaluations ({self.pruned_rate:.1%})"
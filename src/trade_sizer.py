@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot.core.data_type.common import TradeType
+
+from vectorized_order_book_analyzer import BookSideArrays, VectorizedOrderBookAnalyzer
+
+@dataclass
+class SizingResult:
+    input_amount: float
+    output_amount: float
+    profit_pct: float
+
+class SizingLeg:
+    """
+    One leg of a route as a piecewise-linear map from the amount spent to the amount received after fees.
+    BUY legs spend quote and walk the asks, SELL legs spend base and walk the bids.
+    """
+    __slots__ = ("arrays", "is_buy", "fee_multiplier", "min_input")
+
+    def __init__(self, arrays: BookSideArrays, is_buy: bool, fee_multiplier: float, min_input: float = 0.0):
+        self.arrays = arrays
+        self.is_buy = is_buy
+        self.fee_multiplier = fee_multiplier
+        self.min_input = min_input
+
+    @property
+    def knots(self) -> np.ndarray:
+        return self.arrays.cum_quote if self.is_buy else self.arrays.cum_base
+
+    def forward(self, spent: np.ndarray) -> np.ndarray:
+        if self.is_buy:
+            return self.arrays.base_for_quote_volumes(spent) * self.fee_multiplier
+        return self.arrays.quote_for_base_amounts(spent) * self.fee_multiplier
+
+    def inverse(self, received: np.ndarray) -> np.ndarray:
+        if self.is_buy:
+            return self.arrays.quote_for_base_amounts(received / self.fee_multiplier)
+        return self.arrays.base_for_quote_volumes(received / self.fee_multiplier)
+
+class TradeSizer:
+    """
+    Finds the profit-maximizing input size of a route. Every leg is piecewise linear in its input and the
+    composition is concave, so the optimum lies on one of the legs' level boundaries mapped back to the
+    input domain, or on the size where profitability drops to min_profitability.
+    """
+    def __init__(self, connector: ConnectorBase, analyzer: Optional[VectorizedOrderBookAnalyzer] = None):
+        self.connector = connector
+        self.analyzer = analyzer or VectorizedOrderBookAnalyzer(connector)
+
+    def build_legs(self, trading_pair: Sequence[str], order_side: Sequence[TradeType],
+                   fee_multipliers: Sequence[Decimal]) -> List[SizingLeg]:
+        legs = []
+        for pair, side, fee_multiplier in zip(trading_pair, order_side, fee_multipliers):
+            is_buy = side == TradeType.BUY
+            arrays = self.analyzer.get_side_arrays(pair, is_buy)
+            leg = SizingLeg(arrays, is_buy, float(fee_multiplier))
+            leg.min_input = self.get_min_leg_input(pair, leg)
+            legs.append(leg)
+        return legs
+
+    def get_min_leg_input(self, pair: str, leg: SizingLeg) -> float:
+        trading_rule = self.connector.trading_rules.get(pair)
+        if trading_rule is None:
+            return 0.0
+        min_order_size = float(trading_rule.min_order_size)
+        min_notional = float(trading_rule.min_notional_size)
+        if leg.is_buy:
+            return max(min_notional, float(leg.arrays.quote_for_base_amount(min_order_size)))
+        return max(min_order_size, float(leg.arrays.base_for_quote_volume(min_notional)))
+
+    @staticmethod
+    def to_input_domain(legs: Sequence[SizingLeg], leg_index: int, amounts: np.ndarray) -> np.ndarray:
+        for leg in reversed(legs[:leg_index]):
+            amounts = leg.inverse(amounts)
+        return amounts
+
+    @staticmethod
+    def evaluate(legs: Sequence[SizingLeg], amounts: np.ndarray) -> np.ndarray:
+        for leg in legs:
+            amounts = leg.forward(amounts)
+        return amounts
+
+    def solve(self, legs: Sequence[SizingLeg], max_input: float, min_profitability: float) -> Optional[SizingResult]:
+        """
+        :param legs: The legs of the route in traversal order
+        :param max_input: Upper bound on the input size (balance or configured maximum)
+        :param min_profitability: Minimum profit in percent the chosen size has to keep
+        :return: The chosen size, or None when no size satisfies the min order size and notional of every leg
+        """
+        min_input = max(float(self.to_input_domain(legs, i, np.array([leg.min_input]))[0]) for i, leg in enumerate(legs))
+        if max_input <= 0 or min_input > max_input:
+            return None
+
+        candidates = [np.array([min_input, max_input])]
+        for i, leg in enumerate(legs):
+            candidates.append(self.to_input_domain(legs, i, leg.knots))
+        inputs = np.unique(np.clip(np.concatenate(candidates), min_input, max_input))
+        inputs = inputs[inputs > 0]
+        if len(inputs) == 0:
+            return None
+
+        outputs = self.evaluate(legs, inputs)
+        best = int(np.argmax(outputs - inputs))
+        target_rate = 1 + min_profitability / 100
+        if outputs[best] < target_rate * inputs[best]:
+            best_input, best_output = self.find_min_profitability_size(inputs[:best + 1], outputs[:best + 1], target_rate)
+        else:
+            best_input, best_output = float(inputs[best]), float(outputs[best])
+        return SizingResult(best_input, best_output, (best_output - best_input) / best_input * 100)
+
+    @staticmethod
+    def find_min_profitability_size(inputs: np.ndarray, outputs: np.ndarray, target_rate: float) -> Tuple[float, float]:
+        # outputs / inputs decreases with size, so the feasible sizes form a prefix of the candidates.
+        feasible = np.nonzero(outputs >= target_rate * inputs)[0]
+        if len(feasible) == 0:
+            return float(inputs[0]), float(outputs[0])
+        low = int(feasible[-1])
+        if low == len(inputs) - 1:
+            return float(inputs[low]), float(outputs[low])
+        slope = (outputs[low + 1] - outputs[low]) / (inputs[low + 1] - inputs[low])
+        size = (outputs[low] - slope * inputs[low]) / (target_rate - slope)
+        return float(size), float(outputs[low] + slope * (size - inputs[low]))
+
+    def get_optimal_size(self, trading_pair: Sequence[str], order_side: Sequence[TradeType],
+                         fee_multipliers: Sequence[Decimal], max_input: Decimal,
+                         min_profitability: Decimal) -> Optional[SizingResult]:
+        legs = self.build_legs(trading_pair, order_side, fee_multipliers)
+        return self.solve(legs, float(max_input), float(min_profitability))
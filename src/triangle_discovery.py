@@ -0,0 +1,169 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot.core.data_type.common import TradeType
+
+from exceptions import InvalidTradingPairError
+from utils import split_trading_pair
+
+@dataclass(frozen=True)
+class Triangle:
+    """
+    A cycle of trading pairs that starts and ends in the holding asset, three pairs long unless built
+    with build_cycle. Both traversal directions are stored so they are only computed once.
+    """
+    holding_asset: str
+    direct_pairs: Tuple[str, ...]
+    direct_sides: Tuple[TradeType, ...]
+    reverse_pairs: Tuple[str, ...]
+    reverse_sides: Tuple[TradeType, ...]
+
+    @property
+    def name(self) -> str:
+        return "/".join(self.direct_pairs)
+
+    def pairs(self, direction: str) -> Tuple[str, ...]:
+        return self.direct_pairs if direction == "direct" else self.reverse_pairs
+
+    def sides(self, direction: str) -> Tuple[TradeType, ...]:
+        return self.direct_sides if direction == "direct" else self.reverse_sides
+
+@dataclass
+class RankedDirection:
+    triangle: Triangle
+    direction: str
+    top_of_book_rate: Decimal
+
+def get_order_sides(holding_asset: str, pairs: Iterable[str]) -> Tuple[TradeType, ...]:
+    """
+    Walks the pairs starting from the holding asset and returns the side to trade on each of them.
+
+    :param holding_asset: The asset the cycle starts from
+    :param pairs: The trading pairs in traversal order
+    :return: A tuple of TradeType, one per pair
+    """
+    sides = []
+    current_asset = holding_asset
+    for pair in pairs:
+        base, quote = split_trading_pair(pair)
+        if base == current_asset:
+            sides.append(TradeType.SELL)
+            current_asset = quote
+        elif quote == current_asset:
+            sides.append(TradeType.BUY)
+            current_asset = base
+        else:
+            raise InvalidTradingPairError(f"Current asset {current_asset} not in pair {pair}")
+    if current_asset != holding_asset:
+        raise InvalidTradingPairError(f"Pairs {', '.join(pairs)} do not return to {holding_asset}")
+    return tuple(sides)
+
+def build_triangle(holding_asset: str, first_pair: str, middle_pair: str, last_pair: str) -> Triangle:
+    """
+    Builds a Triangle from three pairs already in cycle order (holding pair, cross pair, holding pair).
+    """
+    return build_cycle(holding_asset, (first_pair, middle_pair, last_pair))
+
+def build_cycle(holding_asset: str, pairs: Iterable[str]) -> Triangle:
+    """
+    Builds a cycle of any length from pairs already in traversal order, starting from the holding asset.
+    """
+    direct_pairs = tuple(pairs)
+    reverse_pairs = tuple(reversed(direct_pairs))
+    return Triangle(
+        holding_asset=holding_asset,
+        direct_pairs=direct_pairs,
+        direct_sides=get_order_sides(holding_asset, direct_pairs),
+        reverse_pairs=reverse_pairs,
+        reverse_sides=get_order_sides(holding_asset, reverse_pairs),
+    )
+
+class TriangleDiscovery:
+    """
+    Builds an asset graph from a list of trading pairs and enumerates every 3-cycle through the holding asset.
+    """
+    def __init__(self, holding_asset: str):
+        self.holding_asset = holding_asset
+
+    def build_asset_graph(self, trading_pairs: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        graph: Dict[str, Dict[str, str]] = defaultdict(dict)
+        for pair in trading_pairs:
+            parts = split_trading_pair(pair)
+            if len(parts) != 2 or parts[0] == parts[1]:
+                continue
+            base, quote = parts
+            graph[base][quote] = pair
+            graph[quote][base] = pair
+        return graph
+
+    def discover(self, trading_pairs: Iterable[str]) -> List[Triangle]:
+        graph = self.build_asset_graph(trading_pairs)
+        neighbours = sorted(graph.get(self.holding_asset, {}))
+        triangles = []
+        for i, first_asset in enumerate(neighbours):
+            for second_asset in neighbours[i + 1:]:
+                middle_pair = graph[first_asset].get(second_asset)
+                if middle_pair is None:
+                    continue
+                triangles.append(build_triangle(
+                    self.holding_asset,
+                    graph[self.holding_asset][first_asset],
+                    middle_pair,
+                    graph[self.holding_asset][second_asset],
+                ))
+        return triangles
+
+class TriangleRanker:
+    """
+    Ranks triangle directions by their top-of-book exchange rate. Best prices are fetched once per pair
+    and shared by every triangle that trades it, so a tick costs one lookup per book, not per leg.
+    """
+    def __init__(self, connector: ConnectorBase):
+        self.connector = connector
+
+    def get_best_price(self, trading_pair: str, is_buy: bool) -> Decimal:
+        """
+        :return: The best ask or bid of the pair, NaN if that side of the book is empty
+        """
+        try:
+            return self.connector.get_price(trading_pair, is_buy)
+        except EnvironmentError:
+            # Hummingbot's order books raise instead of returning NaN for an empty side.
+            return Decimal("NaN")
+
+    def get_best_prices(self, trading_pairs: Iterable[str]) -> Dict[str, Tuple[Decimal, Decimal]]:
+        prices = {}
+        for pair in trading_pairs:
+            prices[pair] = (self.get_best_price(pair, False), self.get_best_price(pair, True))
+        return prices
+
+    @staticmethod
+    def top_of_book_rate(pairs: Tuple[str, ...], sides: Tuple[TradeType, ...],
+                         best_prices: Dict[str, Tuple[Decimal, Decimal]]) -> Decimal:
+        rate = Decimal("1")
+        for pair, side in zip(pairs, sides):
+            best_bid, best_ask = best_prices[pair]
+            if side == TradeType.BUY:
+                if not best_ask or best_ask.is_nan():
+                    return Decimal("0")
+                rate /= best_ask
+            else:
+                if not best_bid or best_bid.is_nan():
+                    return Decimal("0")
+                rate *= best_bid
+        return rate
+
+    def rank(self, triangles: List[Triangle], limit: Optional[int] = None) -> List[RankedDirection]:
+        trading_pairs = {pair for triangle in triangles for pair in triangle.direct_pairs}
+        best_prices = self.get_best_prices(trading_pairs)
+        ranking = [
+            RankedDirection(triangle, direction,
+                            self.top_of_book_rate(triangle.pairs(direction), triangle.sides(direction), best_prices))
+            for triangle in triangles
+            for direction in ("direct", "reverse")
+        ]
+        ranking.sort(key=lambda ranked: ranked.top_of_book_rate, reverse=True)
+        return ranking[:limit] if limit else ranking
@@ -1,15 +1,17 @@
 from decimal import Decimal
-from typing import Tuple, List
+from typing import Sequence, Tuple
 from hummingbot.connector.connector_base import ConnectorBase
 
 def split_trading_pair(trading_pair: str) -> Tuple[str, str]:
     return tuple(trading_pair.split('-'))
 
-def get_base_amount_for_quote_volume(orderbook_entries: List[Tuple[Decimal, Decimal]], quote_volume: Decimal) -> Decimal:
+def get_base_amount_for_quote_volume(orderbook_entries: Sequence[Sequence], quote_volume: Decimal) -> Decimal:
     cumulative_volume = Decimal('0')
     cumulative_base_amount = Decimal('0')
 
-    for price, amount in orderbook_entries:
+    for entry in orderbook_entries:
+        # Live entries are OrderBookRow(price, amount, update_id) with float fields.
+        price, amount = Decimal(str(entry[0])), Decimal(str(entry[1]))
         row_volume = amount * price
         if row_volume + cumulative_volume >= quote_volume:
             row_volume = quote_volume - cumulative_volume
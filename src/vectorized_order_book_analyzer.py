@@ -0,0 +1,106 @@
+from decimal import Decimal
+from itertools import chain
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot.core.data_type.order_book import OrderBook
+from hummingbot.core.data_type.common import TradeType
+
+from order_book_analyzer import OrderBookAnalyzer
+
+class BookSideArrays:
+    """
+    One side of an order book as contiguous float64 arrays. cum_base and cum_quote hold the
+    cumulative size and notional *before* each level, with the book totals as the last element,
+    so both depth queries are a single searchsorted plus one interpolation.
+    """
+    __slots__ = ("prices", "sizes", "cum_base", "cum_quote")
+
+    def __init__(self, prices: np.ndarray, sizes: np.ndarray):
+        self.prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self.sizes = np.ascontiguousarray(sizes, dtype=np.float64)
+        self.cum_base = np.zeros(len(self.sizes) + 1)
+        self.cum_quote = np.zeros(len(self.sizes) + 1)
+        np.cumsum(self.sizes, out=self.cum_base[1:])
+        np.cumsum(self.prices * self.sizes, out=self.cum_quote[1:])
+
+    @classmethod
+    def from_entries(cls, entries: Iterable) -> "BookSideArrays":
+        flat = np.fromiter(chain.from_iterable((row[0], row[1]) for row in entries), dtype=np.float64)
+        levels = flat.reshape(-1, 2)
+        return cls(levels[:, 0], levels[:, 1])
+
+    def base_for_quote_volume(self, quote_volume: float) -> float:
+        if quote_volume >= self.cum_quote[-1]:
+            return float(self.cum_base[-1])
+        level = int(np.searchsorted(self.cum_quote, quote_volume, side="right")) - 1
+        return float(self.cum_base[level] + (quote_volume - self.cum_quote[level]) / self.prices[level])
+
+    def quote_for_base_amount(self, base_amount: float) -> float:
+        if base_amount >= self.cum_base[-1]:
+            return float(self.cum_quote[-1])
+        level = int(np.searchsorted(self.cum_base, base_amount, side="right")) - 1
+        return float(self.cum_quote[level] + (base_amount - self.cum_base[level]) * self.prices[level])
+
+    def base_for_quote_volumes(self, quote_volumes: np.ndarray) -> np.ndarray:
+        if len(self.prices) == 0:
+            return np.zeros_like(quote_volumes)
+        levels = np.minimum(np.searchsorted(self.cum_quote, quote_volumes, side="right") - 1, len(self.prices) - 1)
+        base_amounts = self.cum_base[levels] + (quote_volumes - self.cum_quote[levels]) / self.prices[levels]
+        return np.minimum(base_amounts, self.cum_base[-1])
+
+    def quote_for_base_amounts(self, base_amounts: np.ndarray) -> np.ndarray:
+        if len(self.prices) == 0:
+            return np.zeros_like(base_amounts)
+        levels = np.minimum(np.searchsorted(self.cum_base, base_amounts, side="right") - 1, len(self.prices) - 1)
+        quote_volumes = self.cum_quote[levels] + (base_amounts - self.cum_base[levels]) * self.prices[levels]
+        return np.minimum(quote_volumes, self.cum_quote[-1])
+
+class VectorizedOrderBookAnalyzer(OrderBookAnalyzer):
+    """
+    OrderBookAnalyzer backed by BookSideArrays. Each book side of a trading pair is converted once per book version
+    (snapshot uid, last diff uid) and every later query on that version reuses the arrays. A book the connector
+    replaced, e.g. after a reconnect, is converted again even if its version matches.
+    Results are float64, so use DefaultOrderBookAnalyzer when exact Decimal results are needed.
+    """
+    def __init__(self, connector: ConnectorBase):
+        self.connector = connector
+        self.conversions: int = 0
+        self._arrays: Dict[Tuple[str, bool], Tuple[OrderBook, Tuple[int, int], BookSideArrays]] = {}
+
+    @property
+    def cached_sides(self) -> int:
+        return len(self._arrays)
+
+    def get_side_arrays(self, pair: str, is_ask: bool) -> BookSideArrays:
+        orderbook = self.connector.get_order_book(pair)
+        key = (pair, is_ask)
+        version = (orderbook.snapshot_uid, orderbook.last_diff_uid)
+        cached = self._arrays.get(key)
+        # Keeping the book referenced also keeps its id from being reused by another book.
+        if cached is not None and cached[0] is orderbook and cached[1] == version:
+            return cached[2]
+        entries = orderbook.ask_entries() if is_ask else orderbook.bid_entries()
+        arrays = BookSideArrays.from_entries(entries)
+        self._arrays[key] = (orderbook, version, arrays)
+        self.conversions += 1
+        return arrays
+
+    def get_base_amount_for_quote_volume(self, orderbook: OrderBook, quote_volume: Decimal) -> Decimal:
+        # Without its trading pair the book cannot be cached, so it is converted on every call.
+        entries = orderbook.ask_entries() if quote_volume > 0 else orderbook.bid_entries()
+        arrays = BookSideArrays.from_entries(entries)
+        return Decimal(str(arrays.base_for_quote_volume(float(abs(quote_volume)))))
+
+    def get_order_amount_from_exchanged_amount(self, pair: str, side: TradeType, exchanged_amount: Decimal) -> Decimal:
+        if side == TradeType.BUY:
+            arrays = self.get_side_arrays(pair, exchanged_amount > 0)
+            order_amount = Decimal(str(arrays.base_for_quote_volume(float(abs(exchanged_amount)))))
+        else:
+            order_amount = exchanged_amount
+        return self.connector.quantize_order_amount(pair, order_amount)
+
+    def get_quote_volume_for_base_amount(self, pair: str, side: TradeType, base_amount: Decimal) -> Decimal:
+        arrays = self.get_side_arrays(pair, side == TradeType.BUY)
+        return Decimal(str(arrays.quote_for_base_amount(float(base_amount))))
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Set
+
+from hummingbot.connector.connector_base import ConnectorBase
+from hummingbot.core.data_type.common import TradeType
+
+from fee_schedule import FeeKey, FeeSchedule
+from triangle_discovery import Triangle
+
+CACHE_FORMAT = 2
+
+class WarmStartCache:
+    """
+    The cycles and fee rates of the last run in a JSON file, so that after a restart routes are compiled without
+    discovery or side derivation and priced with the account's fees before the connector has loaded them. key
+    holds the settings the cache depends on; a file saved with other settings is ignored.
+
+    Trading rules are not cached: the connector quantizes and places orders with its own rules, so a cached rule
+    could not make a route tradable. Every pair of the loaded cycles is stale until check() has seen the
+    connector's live trading rule for it, and routes through stale pairs are not walked. Once no pair is stale
+    the cache is saved again.
+    """
+    def __init__(self, path: str, key: Dict[str, Any]):
+        self.path = path
+        self.key = key
+        self.logger = logging.getLogger(__name__)
+        self.cycles: List[Triangle] = []
+        self.fees: Dict[FeeKey, Decimal] = {}
+        self.stale: Set[str] = set()
+        self.loaded: bool = False
+        self.changed_pairs: int = 0
+
+    def load(self) -> bool:
+        """
+        :return: True if the file was saved with the same key and was read completely
+        """
+        try:
+            with open(self.path) as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read warm start cache {self.path}: {str(e)}")
+            return False
+        if not isinstance(document, dict) or document.get("format") != CACHE_FORMAT or document.get("key") != self.key:
+            self.logger.info(f"Warm start cache {self.path} was saved with other settings, starting cold.")
+            return False
+        try:
+            cycles = [Triangle(cycle["holding_asset"], tuple(cycle["direct_pairs"]),
+                               tuple(TradeType[side] for side in cycle["direct_sides"]), tuple(cycle["reverse_pairs"]),
+                               tuple(TradeType[side] for side in cycle["reverse_sides"]))
+                      for cycle in document["cycles"]]
+            fees = {(pair, TradeType[side] if side else None, bool(is_maker)): Decimal(fee)
+                    for pair, side, is_maker, fee in document["fees"]}
+        except (ArithmeticError, KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"Warm start cache {self.path} is malformed, starting cold: {str(e)}")
+            return False
+        self.cycles, self.fees = cycles, fees
+        self.stale = self.get_pairs()
+        self.loaded = True
+        return True
+
+    def reset(self, cycles: List[Triangle]):
+        """
+        Replaces the cycles after a cold start or rediscovery. Their pairs are stale until checked.
+        """
+        self.cycles = list(cycles)
+        self.stale = self.get_pairs()
+
+    def get_pairs(self) -> Set[str]:
+        return {pair for cycle in self.cycles for pair in cycle.direct_pairs}
+
+    def is_confirmed(self, pairs: Iterable[str]) -> bool:
+        return self.stale.isdisjoint(pairs)
+
+    def check(self, connector: ConnectorBase, fee_schedule: FeeSchedule) -> List[str]:
+        """
+        Confirms the stale pairs whose live trading rules have arrived. Where the account fees have arrived
+        too, cached fee rates that differ from the live ones are replaced and logged.
+
+        :return: The pairs confirmed by this call
+        """
+        confirmed = []
+        for pair in sorted(self.stale):
+            if connector.trading_rules.get(pair) is None:
+                continue
+            if (fee_schedule.has_account_fees(pair) and fee_schedule.refresh_pair(pair)
+                    and any(key[0] == pair for key in self.fees)):
+                self.changed_pairs += 1
+                self.logger.warning(f"Fees of {pair} changed since the warm start cache was saved.")
+            self.stale.discard(pair)
+            confirmed.append(pair)
+        return confirmed
+
+    def save(self, fee_schedule: FeeSchedule):
+        """
+        Writes the cycles and the fees of their pairs. The file is replaced atomically.
+        """
+        pairs = self.get_pairs()
+        self.fees = {key: fee for key, fee in fee_schedule.get_fees().items() if key[0] in pairs}
+        document = {
+            "format": CACHE_FORMAT,
+            "key": self.key,
+            "cycles": [{"holding_asset": cycle.holding_asset,
+                        "direct_pairs": list(cycle.direct_pairs), "direct_sides": [side.name for side in cycle.direct_sides],
+                        "reverse_pairs": list(cycle.reverse_pairs), "reverse_sides": [side.name for side in cycle.reverse_sides]}
+                       for cycle in self.cycles],
+            "fees": [[pair, side.name if side else None, is_maker, str(fee)]
+                     for (pair, side, is_maker), fee in sorted(self.fees.items(), key=lambda item: repr(item[0]))],
+        }
+        temporary_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(temporary_path, "w") as f:
+                json.dump(document, f)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            self.logger.error(f"Could not save warm start cache {self.path}: {str(e)}")
+
+    def format(self) -> str:
+        source = "loaded" if self.loaded else "cold start"
+        return (f"{source}, {len(self.cycles)} cycles, {len(self.get_pairs()) - len(self.stale)} pairs confirmed, "
+                f"{len(self.stale)} stale, {self.changed_pairs} changed since saved")
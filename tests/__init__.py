@@ -1,6 +1,35 @@
 import unittest
 from unittest.mock import Mock, patch
 from decimal import Decimal
+from src.backtest import BacktestStrategy
+from src.config import TriangularArbitrageConfig
+from src.simulated_connector import SimulatedConnector
+
+# ADA-USDT/ADA-BTC/BTC-USDT, 4% profitable before fees in the direct direction.
+TRIANGLE_BOOKS = {"ADA-USDT": ([(0.49, 1000)], [(0.50, 1000)]), "ADA-BTC": ([(0.0000104, 1000)], [(0.0000105, 1000)]),
+                  "BTC-USDT": ([(50000, 1)], [(50100, 1)])}
+# The same triangle without an opportunity after fees in either direction.
+FLAT_TRIANGLE_BOOKS = {**TRIANGLE_BOOKS, "ADA-BTC": ([(0.0000100, 1000)], [(0.0000102, 1000)])}
+
+def make_triangle_strategy(books=TRIANGLE_BOOKS, order_latency: float = 0.0, start: bool = True,
+                           **config) -> BacktestStrategy:
+    """
+    Creates a BacktestStrategy trading 10 USDT around ADA-USDT/ADA-BTC/BTC-USDT on a SimulatedConnector
+    holding 1000 USDT, with a snapshot of books applied. The connector is strategy.connector.
+
+    :param config: TriangularArbitrageConfig fields that replace the defaults above
+    :param start: Run the first tick, which initializes the strategy
+    """
+    connector = SimulatedConnector(list(books), {"USDT": Decimal("1000")}, order_latency=order_latency)
+    for pair, (bids, asks) in books.items():
+        connector.get_order_book(pair).apply_snapshot(bids, asks, 1)
+    config = TriangularArbitrageConfig(**{"first_pair": "ADA-USDT", "second_pair": "ADA-BTC", "third_pair": "BTC-USDT",
+                                          "holding_asset": "USDT", "order_amount_in_holding_asset": Decimal("10"),
+                                          **config})
+    strategy = BacktestStrategy(config, connector)
+    if start:
+        strategy.on_tick()
+    return strategy
 
 # TODO: add any common test utilities or setup functions here
 def setup_test_config():
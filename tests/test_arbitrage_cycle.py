@@ -0,0 +1,172 @@
+import unittest
+from unittest.mock import Mock
+from decimal import Decimal
+from src.arbitrage_cycle import ArbitrageCycle, LatencyStats, StateTimer
+from src.backtest import BacktestStrategy
+from src.config import TriangularArbitrageConfig
+from src.simulated_connector import SimulatedConnector
+from tests import TRIANGLE_BOOKS, make_triangle_strategy
+
+class TestArbitrageCycle(unittest.TestCase):
+    def setUp(self):
+        self.cycle = ArbitrageCycle("direct", [Mock(), Mock(), Mock()], concurrent=True)
+        for leg_index, order_id in enumerate(["a", "b", "c"]):
+            self.cycle.add_order(order_id, leg_index)
+
+    def test_complete_after_all_legs(self):
+        self.assertEqual(self.cycle.mark_completed("b"), 1)
+        self.cycle.mark_completed("a")
+        self.assertFalse(self.cycle.is_complete)
+        self.cycle.mark_completed("c")
+        self.assertTrue(self.cycle.is_complete)
+        self.assertTrue(self.cycle.is_settled)
+        self.assertIsNotNone(self.cycle.completed_at)
+
+    def test_unwind_orders_keep_cycle_open(self):
+        self.cycle.mark_failed("a")
+        self.cycle.add_unwind_order("u")
+        self.assertTrue(self.cycle.owns("u"))
+        self.cycle.open_order_ids.clear()
+        self.assertFalse(self.cycle.is_settled)
+        self.assertIsNone(self.cycle.mark_completed("u"))
+        self.assertTrue(self.cycle.is_settled)
+
+    def test_deadline_of_oldest_open_leg(self):
+        cycle = ArbitrageCycle("direct", [Mock(), Mock()], timestamp=10)
+        self.assertEqual(cycle.get_deadline(30, 120), 130)
+        cycle.add_order("a", 0, 12)
+        cycle.add_order("b", 1, 15)
+        self.assertEqual(cycle.get_deadline(30, 120), 42)
+        cycle.mark_completed("a")
+        self.assertEqual(cycle.get_deadline(30, 120), 45)
+        self.assertEqual(cycle.get_deadline(0, 0), float("inf"))
+
+class TestStateTimer(unittest.TestCase):
+    def test_time_per_state(self):
+        timer = StateTimer()
+        timer.enter("ACTIVE", 0)
+        timer.enter("ARBITRAGE_STARTED", 5)
+        timer.enter("ARBITRAGE_STARTED", 6)
+        timer.enter("ACTIVE", 8)
+        self.assertEqual(timer.get_total("ACTIVE", 10), 7)
+        self.assertEqual(timer.get_total("ARBITRAGE_STARTED", 10), 3)
+        self.assertEqual(timer.format(10), "ACTIVE 7.0s (2x), ARBITRAGE_STARTED 3.0s (1x)")
+
+class TestCycleTimeout(unittest.TestCase):
+    def setUp(self):
+        self.strategy = make_triangle_strategy(min_profitability=Decimal("0.5"), leg_timeout=30, cycle_timeout=120,
+                                               timeout_action="auto")
+        self.connector = self.strategy.connector
+
+    def tick(self, timestamp: float):
+        self.strategy.set_timestamp(timestamp)
+        self.strategy.on_tick()
+
+    def stall_second_leg(self):
+        # The first leg fills, the second never executes.
+        self.tick(1)
+        self.connector.order_latency = 1000
+        self.connector.process_orders(1)
+        self.assertEqual(self.connector.filled_orders, 1)
+        self.connector.order_latency = 0
+
+    def test_stuck_first_leg_is_cancelled_and_trading_resumes(self):
+        self.connector.order_latency = 1000
+        self.tick(1)
+        self.tick(30)
+        self.assertEqual(self.strategy.status, "ARBITRAGE_STARTED")
+
+        self.tick(31)
+
+        self.assertEqual(self.strategy.status, "ACTIVE")
+        self.assertFalse(self.connector.has_pending_orders)
+        self.assertEqual(self.strategy.cycle_timeouts, 1)
+        self.assertEqual(self.strategy.last_unwind_cost, Decimal("0"))
+        self.assertEqual(self.strategy.state_timer.get_total("ARBITRAGE_STARTED", 31), 30)
+        self.assertIn("Cycle timeouts: 1", self.strategy.format_status())
+
+    def test_completes_remaining_legs_when_cheaper(self):
+        self.stall_second_leg()
+        self.tick(31)
+        self.assertEqual(self.strategy.status, "UNWINDING")
+
+        self.connector.process_orders(31)
+
+        self.assertEqual(self.strategy.status, "ACTIVE")
+        self.assertEqual(self.connector.filled_orders, 3)
+        self.assertLess(self.connector.get_balance("ADA") * Decimal("0.5") + self.connector.get_balance("BTC") * 50000,
+                        Decimal("0.001"))
+        self.assertEqual(self.strategy.last_unwind_cost, Decimal("1000") - self.connector.get_balance("USDT"))
+        self.assertLess(self.strategy.last_unwind_cost, 0)
+        self.assertEqual(self.strategy.recovery_latency.count, 1)
+
+    def test_unwinds_when_completing_is_worse(self):
+        self.stall_second_leg()
+        self.connector.get_order_book("ADA-BTC").apply_snapshot([(0.000005, 1000)], [(0.0000105, 1000)], 2)
+        self.tick(31)
+        self.assertEqual(self.strategy.cycles[0].recovery_action, "unwind")
+
+        self.connector.process_orders(31)
+
+        self.assertEqual(self.strategy.status, "ACTIVE")
+        self.assertEqual(self.connector.filled_orders, 2)
+        self.assertEqual(self.connector.get_balance("BTC"), Decimal("0"))
+        self.assertGreater(self.strategy.last_unwind_cost, 0)
+        self.assertEqual(self.strategy.unwind_cost, Decimal("1000") - self.connector.get_balance("USDT"))
+
+class TestPipelinedCycles(unittest.TestCase):
+    def setUp(self):
+        # Two triangles without a common pair, both 4% profitable before fees.
+        books = {**TRIANGLE_BOOKS, "XRP-USDT": ([(0.49, 1000)], [(0.50, 1000)]),
+                 "XRP-ETH": ([(0.000208, 1000)], [(0.00021, 1000)]), "ETH-USDT": ([(2500, 10)], [(2505, 10)])}
+        self.connector = SimulatedConnector(list(books), {"USDT": Decimal("1000")}, order_latency=1)
+        for pair, (bids, asks) in books.items():
+            self.connector.get_order_book(pair).apply_snapshot(bids, asks, 1)
+        self.config = TriangularArbitrageConfig(holding_asset="USDT", order_amount_in_holding_asset=Decimal("10"),
+                                                scan_all_triangles=True, max_concurrent_cycles=2)
+
+    def run_strategy(self, until: int) -> BacktestStrategy:
+        strategy = BacktestStrategy(self.config, self.connector)
+        strategy.on_tick()
+        for timestamp in range(1, until + 1):
+            strategy.set_timestamp(timestamp)
+            self.connector.process_orders(timestamp)
+            strategy.on_tick()
+        return strategy
+
+    def test_second_triangle_trades_while_first_is_in_flight(self):
+        strategy = self.run_strategy(2)
+        self.assertEqual(len(strategy.cycles), 2)
+        self.assertEqual(strategy.status, "ARBITRAGE_STARTED")
+        self.assertEqual({cycle.route.trading_pairs[0] for cycle in strategy.cycles}, {"ADA-USDT", "XRP-USDT"})
+        self.assertEqual(strategy.cycles[0].next_leg, 1)
+        self.assertIn("Cycles in flight: 2 of 2", strategy.format_status())
+
+        for timestamp in range(3, 5):
+            strategy.set_timestamp(timestamp)
+            self.connector.process_orders(timestamp)
+        self.assertEqual(len(strategy.cycles), 1)
+        self.assertEqual(strategy.cycle_latency["sequential"].count, 1)
+        self.assertEqual(strategy.peak_cycles, 2)
+        self.assertGreater(strategy.total_profit, 0)
+
+    def test_capital_limits_cycles_in_flight(self):
+        self.connector.balances["USDT"] = Decimal("15")
+        strategy = self.run_strategy(3)
+        self.assertEqual(strategy.cycles_started, 1)
+        self.assertLess(strategy.get_free_balance("USDT"), Decimal("10"))
+
+    def test_cap_of_one_waits_for_the_cycle(self):
+        self.config.max_concurrent_cycles = 1
+        strategy = self.run_strategy(3)
+        self.assertEqual((strategy.cycles_started, len(strategy.cycles)), (1, 1))
+
+class TestLatencyStats(unittest.TestCase):
+    def test_record(self):
+        stats = LatencyStats()
+        for value in (0.1, 0.3, 0.2):
+            stats.record(value)
+        self.assertEqual(stats.count, 3)
+        self.assertAlmostEqual(stats.mean, 0.2)
+        self.assertEqual(stats.max, 0.3)
+        self.assertEqual(stats.last, 0.2)
@@ -0,0 +1,117 @@
+import logging
+import threading
+import unittest
+from src.async_logging import AsyncLogHandler, AsyncLogging, LogSampler
+from tests import FLAT_TRIANGLE_BOOKS, make_triangle_strategy
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+        self.threads.add(threading.current_thread().name)
+
+def make_record(msg: str, *args, sampled: bool = False) -> logging.LogRecord:
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, msg, args, None)
+    if sampled:
+        record.sampled = True
+    return record
+
+class TestLogSampler(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("test_log_sampler")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.output = RecordingHandler()
+        self.logger.addHandler(self.output)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.output)
+
+    def test_interval_per_template(self):
+        now = [0.0]
+        sampler = LogSampler(interval=10, clock=lambda: now[0])
+        for second in range(25):
+            now[0] = second
+            sampler.log(self.logger, logging.INFO, "Direct profit: %s", second)
+            sampler.log(self.logger, logging.INFO, "Best triangle %s", second)
+        self.assertEqual(self.output.messages[:3],
+                         ["Direct profit: 0", "Best triangle 0", "Direct profit: 10 (9 similar suppressed)"])
+        self.assertEqual(len(self.output.messages), 6)
+        self.assertEqual(sampler.suppressed, 44)
+
+    def test_every_nth(self):
+        sampler = LogSampler(every=3)
+        self.assertEqual([sampler.sample("Direct profit: %s") for _ in range(7)], [0, None, None, 2, None, None, 2])
+        self.assertEqual(LogSampler().sample("Direct profit: %s"), 0)
+
+    def test_disabled_level_is_not_sampled(self):
+        sampler = LogSampler(every=2)
+        sampler.log(self.logger, logging.DEBUG, "Depth walk %s", 1)
+        self.assertEqual((self.output.messages, sampler.suppressed), ([], 0))
+
+class TestAsyncLogHandler(unittest.TestCase):
+    def test_drops_only_sampled_records_when_full(self):
+        handler = AsyncLogHandler(queue_size=1)
+        handler.handle(make_record("Direct profit: %s", 1, sampled=True))
+        handler.handle(make_record("Direct profit: %s", 2, sampled=True))
+        self.assertEqual((handler.enqueued, handler.dropped), (1, 1))
+
+        drain = threading.Timer(0.05, handler.queue.get)
+        drain.start()
+        handler.handle(make_record("Order %s failed.", "o1"))
+        drain.join()
+        self.assertEqual((handler.enqueued, handler.dropped), (2, 1))
+        self.assertEqual(handler.queue.get_nowait().getMessage(), "Order o1 failed.")
+
+class TestAsyncLogging(unittest.TestCase):
+    def setUp(self):
+        self.parent = logging.getLogger("test_async_logging")
+        self.parent.setLevel(logging.INFO)
+        self.parent.propagate = False
+        self.output = RecordingHandler()
+        self.parent.addHandler(self.output)
+        self.logger = logging.getLogger("test_async_logging.strategy")
+
+    def tearDown(self):
+        self.parent.removeHandler(self.output)
+
+    def test_records_are_written_by_the_listener_thread(self):
+        async_logging = AsyncLogging([self.logger])
+        async_logging.start()
+        self.assertFalse(self.logger.propagate)
+        for index in range(100):
+            self.logger.info("Placed order %s", index)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.logger.exception("Order failed")
+        async_logging.stop()
+
+        self.assertTrue(self.logger.propagate)
+        self.assertEqual(self.output.messages[:2], ["Placed order 0", "Placed order 1"])
+        self.assertEqual(len(self.output.messages), 101)
+        self.assertNotIn(threading.current_thread().name, self.output.threads)
+
+class TestStrategyLogging(unittest.TestCase):
+    def test_async_sampled_profit_line(self):
+        strategy = make_triangle_strategy(FLAT_TRIANGLE_BOOKS, start=False, top_of_book_filter_enabled=False,
+                                          log_mode="async", log_sample_every=5)
+        level = strategy.logger.level
+        strategy.logger.setLevel(logging.INFO)
+        try:
+            strategy.on_tick()
+            for _ in range(10):
+                strategy.on_tick()
+            status = strategy.format_status()
+        finally:
+            strategy.stop()
+            strategy.logger.setLevel(level)
+
+        self.assertEqual(strategy.log_sampler.suppressed, 8)
+        self.assertIn("Async logging:", status)
+        self.assertIn("Log sampling: 8 repeated records suppressed", status)
+        self.assertNotIn(strategy.async_logging.handler, strategy.logger.handlers)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from src.backtest import Backtester, sweep
+from src.book_recording import BookRecordingWriter, KIND_DIFF, KIND_SNAPSHOT, SIDE_ASK, SIDE_BID, make_records
+from src.config import TriangularArbitrageConfig
+
+class TestBacktester(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "books.bin")
+        # Buying ADA for USDT, selling it for BTC and the BTC for USDT returns about 4% until the
+        # ADA-BTC bid drops at t=5.
+        rows = [
+            (0, 1, 0.49, 1000, 0, SIDE_BID, KIND_SNAPSHOT),
+            (0, 1, 0.50, 1000, 0, SIDE_ASK, KIND_SNAPSHOT),
+            (0, 1, 0.0000100, 1000, 1, SIDE_BID, KIND_SNAPSHOT),
+            (0, 1, 0.0000102, 1000, 1, SIDE_ASK, KIND_SNAPSHOT),
+            (0, 1, 52000, 1, 2, SIDE_BID, KIND_SNAPSHOT),
+            (0, 1, 52100, 1, 2, SIDE_ASK, KIND_SNAPSHOT),
+            (5, 2, 0.0000100, 0, 1, SIDE_BID, KIND_DIFF),
+            (5, 3, 0.0000095, 1000, 1, SIDE_BID, KIND_DIFF),
+            (10, 4, 0.0000095, 900, 1, SIDE_BID, KIND_DIFF),
+        ]
+        records = make_records(len(rows))
+        for record, row in zip(records, rows):
+            for name, value in zip(["timestamp", "update_id", "price", "amount", "pair_id", "side", "kind"], row):
+                record[name] = value
+        with BookRecordingWriter(self.path, ["ADA-USDT", "ADA-BTC", "BTC-USDT"]) as writer:
+            writer.write(records)
+        self.config = TriangularArbitrageConfig(connector_name="kucoin", first_pair="ADA-USDT", second_pair="ADA-BTC",
+                                                third_pair="BTC-USDT", holding_asset="USDT",
+                                                min_profitability=Decimal("0.5"),
+                                                order_amount_in_holding_asset=Decimal("20"))
+        self.balances = {"USDT": Decimal("1000")}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replays_profitable_window(self):
+        result = Backtester(self.config, self.path, self.balances).run()
+        self.assertEqual(result.records, 9)
+        self.assertEqual(result.ticks, 11)
+        # Tick 0 initializes the strategy, ticks 1-4 each run a full cycle.
+        self.assertEqual(result.cycles, 4)
+        self.assertEqual(result.filled_orders, 12)
+        self.assertEqual(result.failed_orders, 0)
+        self.assertGreater(result.profit, Decimal("2.9"))
+
+    def test_order_latency_spans_ticks(self):
+        # Each leg waits for the next tick, so the second cycle sells ADA after the bid dropped and is left
+        # holding BTC it cannot sell at the planned size.
+        result = Backtester(self.config, self.path, self.balances, order_latency=0.5).run()
+        self.assertEqual(result.cycles, 1)
+        self.assertEqual(result.filled_orders, 5)
+        self.assertGreater(result.final_balances["BTC"], Decimal("0.0003"))
+
+    def test_sweep(self):
+        results = sweep(self.config, self.path, self.balances,
+                        {"min_profitability": [Decimal("0.5"), Decimal("10")]}, max_workers=2)
+        self.assertEqual([result.params["min_profitability"] for result in results], [Decimal("0.5"), Decimal("10")])
+        self.assertEqual(results[0].cycles, 4)
+        self.assertEqual(results[1].cycles, 0)
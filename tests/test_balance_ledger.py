@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import Mock
+from decimal import Decimal
+from hummingbot.core.data_type.common import OrderType, TradeType
+from hummingbot.core.data_type.trade_fee import AddedToCostTradeFee, DeductedFromReturnsTradeFee
+from hummingbot.core.event.events import OrderFilledEvent
+from src.balance_ledger import BalanceLedger, fill_deltas
+from tests import make_triangle_strategy
+
+def make_fill(trade_type: TradeType, amount: str, price: str, fee) -> OrderFilledEvent:
+    return OrderFilledEvent(timestamp=0, order_id="o1", trading_pair="ADA-USDT", trade_type=trade_type,
+                            order_type=OrderType.MARKET, price=Decimal(price), amount=Decimal(amount), trade_fee=fee)
+
+class TestFillDeltas(unittest.TestCase):
+    def test_fee_deducted_from_returns(self):
+        buy = make_fill(TradeType.BUY, "100", "0.5", DeductedFromReturnsTradeFee(percent=Decimal("0.001")))
+        self.assertEqual(fill_deltas(buy), {"ADA": Decimal("99.9"), "USDT": Decimal("-50")})
+        sell = make_fill(TradeType.SELL, "100", "0.5", DeductedFromReturnsTradeFee(percent=Decimal("0.001")))
+        self.assertEqual(fill_deltas(sell), {"ADA": Decimal("-100"), "USDT": Decimal("49.95")})
+
+    def test_fee_added_to_cost_and_flat_fees(self):
+        fee = AddedToCostTradeFee(percent=Decimal("0.001"), flat_fees=[Mock(token="BNB", amount=Decimal("0.01"))])
+        deltas = fill_deltas(make_fill(TradeType.BUY, "100", "0.5", fee))
+        self.assertEqual(deltas, {"ADA": Decimal("100"), "USDT": Decimal("-50.05"), "BNB": Decimal("-0.01")})
+
+    def test_fee_in_third_token_is_left_to_reconciliation(self):
+        fee = DeductedFromReturnsTradeFee(percent=Decimal("0.00075"), percent_token="BNB")
+        self.assertEqual(fill_deltas(make_fill(TradeType.BUY, "100", "0.5", fee)),
+                         {"ADA": Decimal("100"), "USDT": Decimal("-50")})
+
+class TestBalanceLedger(unittest.TestCase):
+    def setUp(self):
+        self.connector = Mock()
+        self.connector.get_available_balance.side_effect = lambda asset: {"USDT": Decimal("100")}.get(asset, Decimal("0"))
+        self.ledger = BalanceLedger(self.connector, reconcile_interval=60)
+
+    def test_reads_connector_once_then_applies_fills(self):
+        self.assertEqual(self.ledger.get_available_balance("USDT"), Decimal("100"))
+        self.ledger.apply_fill(make_fill(TradeType.BUY, "100", "0.5", DeductedFromReturnsTradeFee(percent=Decimal("0"))))
+        self.assertEqual(self.ledger.get_available_balance("USDT"), Decimal("50"))
+        self.assertEqual(self.ledger.get_available_balance("ADA"), Decimal("100"))
+        self.assertEqual(self.connector.get_available_balance.call_count, 2)
+
+    def test_reconcile_adopts_connector_balances(self):
+        self.ledger.track(["USDT", "ADA"])
+        self.ledger.reconcile(0)
+        self.ledger.apply_fill(make_fill(TradeType.BUY, "100", "0.5", DeductedFromReturnsTradeFee(percent=Decimal("0"))))
+
+        self.ledger.maybe_reconcile(30)
+        self.assertEqual(self.ledger.reconciliations, 1)
+        self.ledger.maybe_reconcile(60)
+
+        self.assertEqual(self.ledger.last_drift, {"USDT": Decimal("50"), "ADA": Decimal("-100")})
+        self.assertEqual(self.ledger.get_available_balance("USDT"), Decimal("100"))
+        self.assertEqual(self.ledger.drift_corrections, 1)
+
+class TestStrategyProfit(unittest.TestCase):
+    def test_cycle_profit_comes_from_fills(self):
+        strategy = make_triangle_strategy(min_profitability=Decimal("0.5"))
+        connector = strategy.connector
+        strategy.on_tick()
+        # A deposit during the cycle must not show up as profit.
+        connector.balances["USDT"] += Decimal("500")
+        for timestamp in range(3):
+            connector.process_orders(timestamp)
+
+        self.assertEqual(connector.filled_orders, 3)
+        self.assertEqual(strategy.status, "ACTIVE")
+        self.assertEqual(strategy.cycle_profit, strategy.total_profit)
+        self.assertAlmostEqual(strategy.total_profit, connector.get_balance("USDT") - Decimal("1500"), places=20)
+        self.assertAlmostEqual(strategy.total_profit_pct, strategy.total_profit / Decimal("10") * 100, places=10)
+        self.assertIn("Balance ledger: 3 fills", strategy.format_status())
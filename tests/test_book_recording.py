@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from src.book_recording import BookRecordingWriter, KIND_DIFF, SIDE_ASK, make_records, open_recording
+
+class TestBookRecording(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "books.bin")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_records(self, timestamps):
+        records = make_records(len(timestamps))
+        records["timestamp"] = timestamps
+        records["update_id"] = range(len(timestamps))
+        records["price"] = 0.5
+        records["amount"] = 100
+        records["pair_id"] = 1
+        records["side"] = SIDE_ASK
+        records["kind"] = KIND_DIFF
+        with BookRecordingWriter(self.path, ["ADA-USDT", "ADA-BTC"]) as writer:
+            writer.write(records)
+        return records
+
+    def test_round_trip(self):
+        records = self.write_records([1.0, 2.0, 3.0])
+        recording = open_recording(self.path)
+        self.assertEqual(recording.trading_pairs, ["ADA-USDT", "ADA-BTC"])
+        self.assertEqual(recording.pair_id("ADA-BTC"), 1)
+        self.assertEqual(len(recording), 3)
+        self.assertEqual(recording.records.tobytes(), records.tobytes())
+
+    def test_index_at(self):
+        self.write_records([1.0, 2.0, 2.0, 3.0])
+        recording = open_recording(self.path)
+        self.assertEqual(recording.index_at(0.5), 0)
+        self.assertEqual(recording.index_at(2.0), 3)
+        self.assertEqual(recording.index_at(10.0), 4)
+
+    def test_empty_recording(self):
+        BookRecordingWriter(self.path, ["ADA-USDT"]).close()
+        self.assertEqual(len(open_recording(self.path)), 0)
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a recording")
+        with self.assertRaises(ValueError):
+            open_recording(self.path)
+
+    def test_append_continues_a_recording_of_the_same_pairs(self):
+        self.write_records([1.0, 2.0])
+        with open(self.path, "ab") as file:
+            # A record cut short by a crash.
+            file.write(b"\0" * 5)
+        records = make_records(1)
+        records["timestamp"] = 3.0
+        with BookRecordingWriter(self.path, ["ADA-USDT", "ADA-BTC"], append=True) as writer:
+            writer.write(records)
+        self.assertEqual(open_recording(self.path).records["timestamp"].tolist(), [1.0, 2.0, 3.0])
+        with self.assertRaisesRegex(ValueError, "other trading pairs"):
+            BookRecordingWriter(self.path, ["ADA-USDT"], append=True)
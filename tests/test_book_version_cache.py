@@ -0,0 +1,32 @@
+import unittest
+from unittest.mock import Mock
+from src.book_version_cache import BookVersionCache
+
+class TestBookVersionCache(unittest.TestCase):
+    def setUp(self):
+        self.books = {pair: Mock(snapshot_uid=1, last_diff_uid=1) for pair in ('ADA-USDT', 'ADA-BTC', 'BTC-USDT')}
+        self.mock_connector = Mock()
+        self.mock_connector.get_order_book.side_effect = lambda pair: self.books[pair]
+        self.cache = BookVersionCache(self.mock_connector)
+        self.pairs = ('ADA-USDT', 'ADA-BTC', 'BTC-USDT')
+
+    def test_hit_while_books_unchanged(self):
+        versions = self.cache.get_versions(self.pairs)
+        self.assertIsNone(self.cache.lookup('direct', versions))
+        self.cache.store('direct', versions, 'result')
+
+        self.cache.start_tick()
+        self.assertEqual(self.cache.lookup('direct', self.cache.get_versions(self.pairs)), 'result')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_miss_after_book_update(self):
+        self.cache.store('direct', self.cache.get_versions(self.pairs), 'result')
+
+        self.books['ADA-BTC'].last_diff_uid = 2
+        self.cache.start_tick()
+        self.assertIsNone(self.cache.lookup('direct', self.cache.get_versions(self.pairs)))
+
+    def test_versions_read_once_per_tick(self):
+        self.cache.get_versions(self.pairs)
+        self.cache.get_versions(tuple(reversed(self.pairs)))
+        self.assertEqual(self.mock_connector.get_order_book.call_count, 3)
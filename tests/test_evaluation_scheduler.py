@@ -0,0 +1,34 @@
+import unittest
+from unittest.mock import Mock
+from src.evaluation_scheduler import EvaluationScheduler
+
+class TestEvaluationScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduled = []
+        self.evaluate = Mock()
+        self.on_drain = Mock()
+        self.scheduler = EvaluationScheduler(self.evaluate, self.on_drain, schedule=self.scheduled.append)
+        self.scheduler.register("ADA", ["ADA-USDT", "ADA-BTC", "BTC-USDT"])
+        self.scheduler.register("ETH", ["ETH-USDT", "ETH-BTC", "BTC-USDT"])
+
+    def test_burst_is_coalesced(self):
+        for pair in ["ADA-USDT", "ADA-BTC", "ADA-USDT", "BTC-USDT"]:
+            self.scheduler.notify(pair)
+
+        self.assertEqual(len(self.scheduled), 1)
+        self.scheduled[0]()
+        self.assertEqual([call.args[0] for call in self.evaluate.call_args_list], ["ADA", "ETH"])
+        self.assertEqual(self.scheduler.coalesced, 3)
+        self.assertEqual(self.scheduler.update_to_decision.count, 2)
+        self.on_drain.assert_called_once()
+
+    def test_unwatched_pair_is_ignored(self):
+        self.scheduler.notify("XRP-USDT")
+        self.assertEqual(self.scheduled, [])
+
+    def test_notify_if_changed(self):
+        self.scheduler.notify_if_changed("ETH-BTC", (1, 1))
+        self.scheduler.drain()
+        self.scheduler.notify_if_changed("ETH-BTC", (1, 1))
+        self.scheduler.drain()
+        self.evaluate.assert_called_once_with("ETH")
@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import Mock, patch
+from decimal import Decimal
+from hummingbot.core.data_type.common import TradeType
+from src.fee_schedule import FeeSchedule, parse_fee_overrides
+
+class TestParseFeeOverrides(unittest.TestCase):
+    def test_parse(self):
+        overrides = parse_fee_overrides("*:taker=0.0008, BTC-USDT:SELL=0.0005,ADA-USDT:maker=0.0001")
+        self.assertEqual(overrides, {
+            ('*', None, False): Decimal('0.0008'),
+            ('BTC-USDT', TradeType.SELL, False): Decimal('0.0005'),
+            ('ADA-USDT', None, True): Decimal('0.0001'),
+        })
+
+class TestFeeSchedule(unittest.TestCase):
+    def setUp(self):
+        self.mock_connector = Mock()
+        self.mock_connector._trading_fees = {
+            'BTC-USDT': Mock(maker_percent_fee_decimal=Decimal('0.0002'), taker_percent_fee_decimal=Decimal('0.0006')),
+        }
+
+    @patch('src.fee_schedule.estimate_fee')
+    def test_per_pair_and_side_rates(self, mock_estimate_fee):
+        mock_estimate_fee.return_value.percent = Decimal('0.001')
+        schedule = FeeSchedule(self.mock_connector, 'kucoin', parse_fee_overrides("BTC-USDT:SELL=0.0005"))
+        schedule.refresh(['BTC-USDT', 'ADA-USDT'], 0)
+
+        self.assertEqual(schedule.get_fee('BTC-USDT', TradeType.BUY), Decimal('0.0006'))
+        self.assertEqual(schedule.get_fee('BTC-USDT', TradeType.SELL), Decimal('0.0005'))
+        self.assertEqual(schedule.get_fee('BTC-USDT', TradeType.BUY, is_maker=True), Decimal('0.0002'))
+        self.assertEqual(schedule.get_multiplier('ADA-USDT', TradeType.BUY), Decimal('0.999'))
+
+    @patch('src.fee_schedule.estimate_fee')
+    def test_refresh_on_timer(self, mock_estimate_fee):
+        mock_estimate_fee.return_value.percent = Decimal('0.001')
+        schedule = FeeSchedule(self.mock_connector, 'kucoin', refresh_interval=60)
+        schedule.refresh(['ADA-USDT'], 100)
+        self.assertEqual(schedule.version, 1)
+
+        mock_estimate_fee.return_value.percent = Decimal('0.0008')
+        schedule.maybe_refresh(130)
+        self.assertEqual(schedule.get_fee('ADA-USDT', TradeType.BUY), Decimal('0.001'))
+        schedule.maybe_refresh(160)
+        self.assertEqual(schedule.get_fee('ADA-USDT', TradeType.BUY), Decimal('0.0008'))
+        self.assertEqual(schedule.version, 2)
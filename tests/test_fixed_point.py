@@ -0,0 +1,86 @@
+import random
+import unittest
+from decimal import Decimal
+from hummingbot.connector.trading_rule import TradingRule
+from hummingbot.core.data_type.common import TradeType
+from src.backtest import BacktestStrategy
+from src.fixed_point import FixedPointBookSide, PairScale, atoms_to_decimal, to_atoms
+from src.simulated_connector import SimulatedConnector
+from src.utils import get_base_amount_for_quote_volume
+from tests import make_triangle_strategy
+
+class TestPairScale(unittest.TestCase):
+    def test_to_atoms(self):
+        self.assertEqual(to_atoms(0.1), 10 ** 17)
+        self.assertEqual(to_atoms(Decimal("1E-18")), 1)
+        self.assertEqual(to_atoms(Decimal("1.9E-18")), 1)
+        self.assertEqual(atoms_to_decimal(to_atoms(Decimal("52000.5"))), Decimal("52000.5"))
+
+    def test_quantization_is_identical_to_connector(self):
+        rng = random.Random(7)
+        for price_increment, amount_increment, min_order_size in [
+            (Decimal("1E-8"), Decimal("1E-8"), Decimal("0")),
+            (Decimal("0.01"), Decimal("0.001"), Decimal("0.01")),
+            (Decimal("0.5"), Decimal("5"), Decimal("10")),
+            (Decimal("1"), Decimal("0.25"), Decimal("0")),
+        ]:
+            rule = TradingRule("ADA-USDT", min_order_size=min_order_size, min_price_increment=price_increment,
+                               min_base_amount_increment=amount_increment)
+            connector = SimulatedConnector(["ADA-USDT"], {}, trading_rules={"ADA-USDT": rule})
+            scale = PairScale.from_trading_rule(rule)
+            for _ in range(500):
+                value = rng.choice([Decimal(str(rng.uniform(0, 1000))), Decimal(rng.uniform(0, 100)),
+                                    Decimal(rng.randint(0, 100)) * amount_increment])
+                self.assertEqual(scale.quantize_order_amount(value).as_tuple(),
+                                 connector.quantize_order_amount("ADA-USDT", value).as_tuple(), value)
+                self.assertEqual(scale.quantize_order_price(value).as_tuple(),
+                                 connector.quantize_order_price("ADA-USDT", value).as_tuple(), value)
+
+class TestFixedPointBookSide(unittest.TestCase):
+    def test_walks_match_decimal_walk(self):
+        entries = [(0.5, 100.0, 1), (0.51, 50.0, 1), (0.53, 200.0, 1)]
+        side = FixedPointBookSide.from_entries(entries)
+        for quote_volume in (Decimal("10"), Decimal("50"), Decimal("75.5"), Decimal("100"), Decimal("1000")):
+            # Exact up to the last atom, which is rounded down.
+            difference = get_base_amount_for_quote_volume(entries, quote_volume) - \
+                atoms_to_decimal(side.base_for_quote_atoms(to_atoms(quote_volume)))
+            self.assertTrue(Decimal("0") <= difference < Decimal("1E-18"), quote_volume)
+        self.assertEqual(atoms_to_decimal(side.quote_for_base_atoms(to_atoms(Decimal("150")))), Decimal("75.5"))
+        self.assertEqual(atoms_to_decimal(side.quote_for_base_atoms(to_atoms(Decimal("1000")))), Decimal("181.5"))
+
+class TestFixedPointRoute(unittest.TestCase):
+    def make_strategy(self, analyzer: str) -> BacktestStrategy:
+        books = {"ADA-USDT": ([(0.49, 100.0), (0.48, 500.0)], [(0.5, 30.0), (0.51, 500.0)]),
+                 "ADA-BTC": ([(0.00001, 20.0), (0.0000099, 500.0)], [(0.0000102, 500.0)]),
+                 "BTC-USDT": ([(52000.0, 0.0001), (51900.0, 1.0)], [(52100.0, 1.0)])}
+        return make_triangle_strategy(books, connector_name="simulated", order_amount_in_holding_asset=Decimal("20"),
+                                      order_book_analyzer=analyzer)
+
+    def test_matches_decimal_path(self):
+        decimal_strategy, fixed_strategy = self.make_strategy("decimal"), self.make_strategy("fixed")
+        for direction in ("direct", "reverse"):
+            pairs, sides = fixed_strategy.trading_pair[direction], fixed_strategy.order_side[direction]
+            decimal_profit, decimal_amounts = decimal_strategy.calculate_profit(pairs, sides)
+            fixed_profit, fixed_amounts = fixed_strategy.calculate_profit(pairs, sides)
+            self.assertEqual(fixed_amounts, decimal_amounts)
+            self.assertEqual([amount.as_tuple() for amount in fixed_amounts],
+                             [amount.as_tuple() for amount in decimal_amounts])
+            self.assertAlmostEqual(fixed_profit, decimal_profit, places=12)
+        self.assertIn("profit.fixed_point", fixed_strategy.latency_profiler.histograms)
+
+    def test_book_sides_with_and_without_scale_are_cached_apart(self):
+        strategy = self.make_strategy("fixed")
+        analyzer = strategy.order_book_analyzer
+        orderbook = strategy.connector.get_order_book("ADA-USDT")
+        scale = analyzer.get_scale("ADA-USDT")
+        self.assertIsNotNone(scale)
+        analyzer.get_base_amount_for_quote_volume(orderbook, Decimal("10"))
+        scaled = analyzer.get_book_side(orderbook, True, scale)
+        self.assertIsNot(scaled, analyzer.get_book_side(orderbook, True))
+        self.assertIs(scaled, analyzer.get_book_side(orderbook, True, scale))
+
+    def test_candidate_quantization(self):
+        strategy = self.make_strategy("fixed")
+        candidate = strategy.create_order_candidate("ADA-USDT", TradeType.BUY, Decimal("40.123456789"))
+        self.assertEqual(candidate.amount.as_tuple(), Decimal("40.12345678").as_tuple())
+        self.assertEqual(candidate.price, Decimal("0.51000000"))
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.latency_histogram import LatencyHistogram, LatencyProfiler, bucket_indices, bucket_upper_bound
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_keep_relative_precision(self):
+        values = np.array([0, 1, 127, 128, 255, 256, 1000, 123456789, 1 << 40], dtype=np.int64)
+        for value, index in zip(values.tolist(), bucket_indices(values).tolist()):
+            upper = bucket_upper_bound(index)
+            self.assertGreaterEqual(upper, value)
+            self.assertLessEqual(upper - value, value / 64)
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram(fold_size=100)
+        for microseconds in range(1, 1001):
+            histogram.record(microseconds * 1e-6)
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.percentile(50), 500e-6, delta=500e-6 / 64)
+        self.assertAlmostEqual(histogram.percentile(99), 990e-6, delta=990e-6 / 64)
+        self.assertEqual(histogram.percentile(100), histogram.max)
+        self.assertAlmostEqual(histogram.mean, 500.5e-6)
+
+    def test_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(1e-6)
+        second.record(3e-3)
+        first.merge(second)
+        self.assertEqual(first.count, 2)
+        self.assertEqual(first.max, 3e-3)
+
+class TestLatencyProfiler(unittest.TestCase):
+    def test_laps(self):
+        profiler = LatencyProfiler()
+        started = profiler.now()
+        lap = profiler.lap("tick.find_opportunity", started)
+        profiler.lap("tick.total", started)
+        self.assertGreaterEqual(lap, started)
+        self.assertEqual(sorted(profiler.histograms), ["tick.find_opportunity", "tick.total"])
+        self.assertTrue(profiler.format(["tick.total", "missing"])[0].startswith("tick.total: n=1 p50="))
+
+    def test_disabled(self):
+        profiler = LatencyProfiler(enabled=False)
+        self.assertEqual(profiler.lap("tick.total", profiler.now()), 0.0)
+        profiler.record("profit.fees", profiler.clock() - profiler.clock())
+        self.assertEqual(profiler.histograms, {})
+
+    def test_prometheus_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "triarb.prom")
+            profiler = LatencyProfiler(export_path=path, export_interval=15)
+            profiler.record("order.adjust_candidate", 2e-6)
+            profiler.maybe_export(100.0)
+            with open(path) as file:
+                text = file.read()
+            self.assertIn('triarb_stage_latency_seconds{stage="order.adjust_candidate",quantile="0.99"} 0.000002000', text)
+            self.assertIn('triarb_stage_latency_seconds_count{stage="order.adjust_candidate"} 1', text)
+            self.assertIn('triarb_stage_latency_seconds_max{stage="order.adjust_candidate"} 0.000002000', text)
+
+            os.remove(path)
+            profiler.maybe_export(110.0)
+            self.assertFalse(os.path.exists(path))
+
+    def test_prometheus_export_creates_directory_and_survives_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics", "triarb.prom")
+            profiler = LatencyProfiler(export_path=path, export_interval=15)
+            profiler.maybe_export(100.0)
+            self.assertTrue(os.path.exists(path))
+
+            blocker = os.path.join(directory, "file")
+            open(blocker, "w").close()
+            profiler.export_path = os.path.join(blocker, "triarb.prom")
+            with self.assertLogs(profiler.logger, "ERROR"):
+                profiler.maybe_export(200.0)
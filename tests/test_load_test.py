@@ -0,0 +1,49 @@
+import unittest
+from decimal import Decimal
+from src.config import TriangularArbitrageConfig
+from src.load_test import DEFAULT_PRICES, LoadTest, SyntheticMarket
+from src.simulated_connector import FillModel, SimulatedConnector
+
+PAIRS = ["ADA-USDT", "ADA-BTC", "BTC-USDT"]
+
+class TestSyntheticMarket(unittest.TestCase):
+    def setUp(self):
+        self.connector = SimulatedConnector(PAIRS, {"USDT": Decimal("1000")})
+        self.market = SyntheticMarket(self.connector, DEFAULT_PRICES, update_rate=20, volatility=0.001,
+                                      mispricing=0.002, depth=5, seed=1)
+        self.market.seed_books()
+
+    def test_update_rate(self):
+        self.assertEqual(self.market.advance(0.0), 0)
+        self.assertEqual(self.market.advance(0.05), 3)
+        self.assertEqual(self.market.advance(10.0), 597)
+        self.assertEqual(self.market.updates, 600)
+
+    def test_books_stay_uncrossed_and_bounded(self):
+        for step in range(1, 201):
+            self.market.advance(step * 0.1)
+            for pair in PAIRS:
+                book = self.connector.get_order_book(pair)
+                self.assertLess(max(book.bids), min(book.asks))
+                self.assertLessEqual(len(book.bids), 5)
+                self.assertLessEqual(len(book.asks), 5)
+        book = self.connector.get_order_book("BTC-USDT")
+        self.assertGreater(book.last_diff_uid, book.snapshot_uid)
+        self.assertAlmostEqual(book.get_price(True) / self.market.get_mid("BTC-USDT"), 1, delta=0.02)
+
+class TestLoadTest(unittest.TestCase):
+    def test_run_reports_latency_and_throughput(self):
+        connector = SimulatedConnector(PAIRS, {"USDT": Decimal("1000")}, order_latency=0.05,
+                                       fill_model=FillModel(consume_liquidity=True, fills_per_order=2))
+        market = SyntheticMarket(connector, DEFAULT_PRICES, update_rate=20, mispricing=0.003, seed=2)
+        market.seed_books()
+        config = TriangularArbitrageConfig(first_pair=PAIRS[0], second_pair=PAIRS[1], third_pair=PAIRS[2],
+                                           holding_asset="USDT", order_amount_in_holding_asset=Decimal("10"))
+        result = LoadTest(config, connector, market, duration=30, tick_interval=0.1).run()
+
+        self.assertEqual(result.ticks, 300)
+        self.assertEqual(result.book_updates, 1800)
+        self.assertGreater(result.ticks_per_second, 0)
+        self.assertFalse(connector.has_pending_orders)
+        self.assertIn("on_tick latency: n=300", "\n".join(result.format()))
+        self.assertEqual(result.event_latency.count, 600)
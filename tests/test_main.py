@@ -1,7 +1,9 @@
 import unittest
 from unittest.mock import Mock, patch
 from decimal import Decimal
-from src.main import EnhancedTriangularArbitrage
+from hummingbot.core.data_type.common import TradeType
+from hummingbot.core.data_type.order_candidate import OrderCandidate
+from src.main import ArbitrageOpportunity, EnhancedTriangularArbitrage
 from src.config import TriangularArbitrageConfig
 from src.exceptions import InvalidTradingPairError
 
@@ -34,32 +36,74 @@ class TestEnhancedTriangularArbitrage(unittest.TestCase):
     def test_set_trading_pair(self, mock_split):
         mock_split.side_effect = lambda x: tuple(x.split('-'))
         self.strategy.set_trading_pair()
-        self.assertEqual(self.strategy.trading_pair["direct"], ('ADA-USDT', 'BTC-USDT', 'ADA-BTC'))
-        self.assertEqual(self.strategy.trading_pair["reverse"], ('ADA-BTC', 'BTC-USDT', 'ADA-USDT'))
+        self.assertEqual(self.strategy.trading_pair["direct"], ('ADA-USDT', 'ADA-BTC', 'BTC-USDT'))
+        self.assertEqual(self.strategy.trading_pair["reverse"], ('BTC-USDT', 'ADA-BTC', 'ADA-USDT'))
 
     def test_calculate_profit(self):
+        self.strategy.fee_schedule.overrides = {("*", None, False): Decimal('0.001')}
         self.strategy.order_book_analyzer.get_order_amount_from_exchanged_amount = Mock(return_value=Decimal('1'))
-        self.strategy.connector.get_quote_volume_for_base_amount = Mock()
-        self.strategy.connector.get_quote_volume_for_base_amount.return_value.result_volume = Decimal('100')
+        self.strategy.order_book_analyzer.get_quote_volume_for_base_amount = Mock(return_value=Decimal('100'))
         
         profit, amounts = self.strategy.calculate_profit(
             ('BTC-USDT', 'ETH-BTC', 'ETH-USDT'),
-            (True, False, False)
+            (TradeType.BUY, TradeType.SELL, TradeType.SELL),
+            order_size=Decimal('20')
         )
         
-        self.assertAlmostEqual(profit, Decimal('397.9'), places=1)
+        # The mocked depth walk ends in 100 USDT, less the 0.1% taker fee of the last leg.
+        self.assertEqual(profit, Decimal('399.5'))
         self.assertEqual(amounts, [Decimal('1'), Decimal('1'), Decimal('1')])
+        self.assertEqual(self.strategy.fee_schedule.get_multiplier('ETH-USDT', TradeType.SELL), Decimal('0.999'))
 
     @patch('src.main.ArbitrageOpportunity')
     def test_find_arbitrage_opportunity(self, mock_opportunity):
-        self.strategy.calculate_profit = Mock(side_effect=[
-            (Decimal('1.0'), [Decimal('1'), Decimal('1'), Decimal('1')]),
-            (Decimal('0.5'), [Decimal('1'), Decimal('1'), Decimal('1')])
+        self.strategy.routes = {"direct": Mock(trading_pairs=('ADA-USDT', 'ADA-BTC', 'BTC-USDT')),
+                                "reverse": Mock(trading_pairs=('BTC-USDT', 'ADA-BTC', 'ADA-USDT'))}
+        self.strategy.get_profit = Mock(side_effect=[
+            (Decimal('1.0'), [Decimal('1'), Decimal('1'), Decimal('1')], Decimal('20')),
+            (Decimal('0.5'), [Decimal('1'), Decimal('1'), Decimal('1')], Decimal('20'))
         ])
         
         self.strategy.find_arbitrage_opportunity()
         
-        mock_opportunity.assert_called_once_with("direct", Decimal('1.0'), [Decimal('1'), Decimal('1'), Decimal('1')])
+        mock_opportunity.assert_called_once_with("direct", Decimal('1.0'), [Decimal('1'), Decimal('1'), Decimal('1')],
+                                                 order_size=Decimal('20'))
+
+    def start_concurrent_arbitrage(self):
+        self.strategy.config.execution_mode = "concurrent"
+        self.strategy.create_order_candidate = Mock(side_effect=lambda pair, side, amount: OrderCandidate(
+            trading_pair=pair, is_maker=False, order_type=None, order_side=side, amount=amount, price=Decimal('1')))
+        self.strategy.connector.get_available_balance.return_value = Decimal('1000')
+        self.strategy.process_candidate = Mock(side_effect=["a", "b", "c", "unwind"])
+        opportunity = ArbitrageOpportunity("direct", Decimal('1'), [Decimal('1')] * 3,
+                                           ('ADA-USDT', 'ADA-BTC', 'BTC-USDT'),
+                                           (TradeType.BUY, TradeType.SELL, TradeType.SELL))
+        self.strategy.start_arbitrage(opportunity)
+
+    def test_concurrent_execution_places_all_legs(self):
+        self.start_concurrent_arbitrage()
+        self.assertEqual(self.strategy.process_candidate.call_count, 3)
+        self.assertEqual(self.strategy.cycles[0].open_order_ids, {"a", "b", "c"})
+
+        self.strategy.calculate_total_profit = Mock()
+        for order_id in ("c", "a", "b"):
+            self.strategy.handle_order_completed(order_id)
+        self.assertEqual(self.strategy.status, "ACTIVE")
+        self.assertEqual(self.strategy.cycle_latency["concurrent"].count, 1)
+
+    def test_concurrent_failure_cancels_and_unwinds(self):
+        self.start_concurrent_arbitrage()
+        self.strategy.cancel = Mock()
+        self.strategy.handle_order_completed("a")
+
+        self.strategy.did_fail_order(Mock(order_id="b", trading_pair="ADA-BTC"))
+
+        self.strategy.cancel.assert_called_once_with(self.config.connector_name, "c")
+        self.assertEqual(self.strategy.cycles[0].unwind_order_ids, {"unwind"})
+        self.strategy.did_cancel_order(Mock(order_id="c"))
+        self.strategy.handle_order_completed("unwind")
+        self.assertEqual(self.strategy.status, "NOT_ACTIVE")
+        self.assertEqual(self.strategy.cycles, [])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
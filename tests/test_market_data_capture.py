@@ -0,0 +1,93 @@
+import errno
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+from src.book_recording import KIND_DIFF, KIND_SNAPSHOT
+from src.market_data_capture import MarketDataCapture, capture_file_name, list_capture_files, open_captures
+from src.simulated_connector import SimulatedConnector
+
+class TestMarketDataCapture(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.connector = SimulatedConnector(["ADA-USDT", "BTC-USDT"], {"USDT": Decimal("100")})
+        self.connector.get_order_book("ADA-USDT").apply_snapshot([(0.49, 100.0)], [(0.50, 100.0), (0.51, 50.0)], 1)
+        self.connector.get_order_book("BTC-USDT").apply_snapshot([(52000.0, 1.0)], [(52100.0, 1.0)], 1)
+        self.capture = MarketDataCapture(self.connector, ["BTC-USDT", "ADA-USDT"], self.directory.name, depth=2)
+
+    def tearDown(self):
+        self.capture.stop()
+        self.directory.cleanup()
+
+    def replay(self, recording):
+        connector = SimulatedConnector(recording.trading_pairs, {})
+        connector.apply_records(recording.records, recording.trading_pairs)
+        return connector
+
+    def test_snapshot_then_diffs(self):
+        self.capture.start()
+        self.capture.capture(7200.0)
+        book = self.connector.get_order_book("ADA-USDT")
+        book.apply_diff(True, 0.50, 0.0, 2)
+        book.apply_diff(True, 0.52, 10.0, 3)
+        self.capture.capture(7201.0)
+        self.capture.capture(7202.0)
+        self.capture.stop()
+
+        self.assertEqual(self.capture.captured_updates, 3)
+        [recording] = open_captures(self.directory.name)
+        self.assertEqual(os.path.basename(recording.path), capture_file_name("books", 7200.0))
+        diffs = recording.records[recording.records["kind"] == KIND_DIFF]
+        # 0.50 was removed and 0.52 entered the top two levels.
+        self.assertEqual(sorted(diffs["price"].tolist()), [0.50, 0.52])
+        replayed = self.replay(recording).get_order_book("ADA-USDT")
+        self.assertEqual([(row.price, row.amount) for row in replayed.ask_entries()], [(0.51, 50.0), (0.52, 10.0)])
+
+    def test_hourly_rotation_starts_with_snapshots(self):
+        self.capture.start()
+        self.capture.capture(3599.0)
+        self.connector.get_order_book("BTC-USDT").apply_diff(False, 52000.0, 2.0, 2)
+        self.capture.capture(3600.5)
+        self.capture.stop()
+
+        files = list_capture_files(self.directory.name)
+        self.assertEqual(len(files), 2)
+        second = open_captures(self.directory.name)[1]
+        self.assertEqual(set(second.records["kind"][:5].tolist()), {KIND_SNAPSHOT})
+        replayed = self.replay(second)
+        self.assertEqual(replayed.get_order_book("ADA-USDT").get_price(True), 0.50)
+        self.assertEqual(replayed.get_order_book("BTC-USDT").bid_entries()[0].amount, 2.0)
+
+    def test_restart_within_the_hour_appends(self):
+        self.capture.start()
+        self.capture.capture(7200.0)
+        self.capture.stop()
+        restarted = MarketDataCapture(self.connector, ["BTC-USDT", "ADA-USDT"], self.directory.name, depth=2)
+        restarted.start()
+        restarted.capture(7300.0)
+        restarted.stop()
+        other_pairs = MarketDataCapture(self.connector, ["ADA-USDT"], self.directory.name, depth=2)
+        other_pairs.start()
+        other_pairs.capture(7400.0)
+        other_pairs.stop()
+
+        self.assertEqual([os.path.basename(path) for path in list_capture_files(self.directory.name)],
+                         [capture_file_name("books", 7200.0), capture_file_name("books", 7200.0, 1)])
+        first, second = open_captures(self.directory.name)
+        self.assertEqual(sorted(set(first.records["timestamp"].tolist())), [7200.0, 7300.0])
+        self.assertEqual(second.trading_pairs, ["ADA-USDT"])
+
+    def test_write_failure_stops_capturing(self):
+        full = OSError(errno.ENOSPC, "No space left on device")
+        with patch("src.market_data_capture.BookRecordingWriter.write", side_effect=full):
+            self.capture.start()
+            self.capture.capture(7200.0)
+            self.capture._thread.join(timeout=5)
+        self.assertIn("No space left on device", self.capture.error)
+        self.connector.get_order_book("ADA-USDT").apply_diff(True, 0.52, 10.0, 2)
+        self.capture.capture(7201.0)
+        self.capture.capture_pair("ADA-USDT", 7202.0)
+        self.capture.stop()
+        self.assertEqual((self.capture.captured_updates, self.capture.records_written), (2, 0))
+        self.assertIn("FAILED: ", self.capture.format())
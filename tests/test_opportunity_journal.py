@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from types import SimpleNamespace
+from src.opportunity_journal import JournalQuery, OpportunityJournal
+from tests import FLAT_TRIANGLE_BOOKS, make_triangle_strategy
+
+DIRECT = SimpleNamespace(name="ADA-USDT/ADA-BTC/BTC-USDT")
+REVERSE = SimpleNamespace(name="BTC-USDT/ADA-BTC/ADA-USDT")
+
+class TestOpportunityJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "journal", "opportunities.db")
+        journal = OpportunityJournal(self.path, batch_size=4)
+        journal.start()
+        # Direct reaches 0.5% from t=2 to t=4 and at t=9, after a gap in the evaluations.
+        direct_profits = {0: "0.1", 1: "0.3", 2: "0.5", 3: "0.7", 4: "0.6", 9: "0.8"}
+        for timestamp, profit in direct_profits.items():
+            journal.record(timestamp, DIRECT, Decimal(profit), [Decimal("20"), Decimal("0.0002")], Decimal(10 * timestamp),
+                           ((1, timestamp), (1, 1), (1, 1)))
+            journal.record(timestamp, REVERSE, Decimal("0.9"), [], Decimal("0"), ((1, 1), (1, 1), (1, timestamp)),
+                           bound=True)
+        journal.stop()
+        self.assertEqual(journal.rows_written, 12)
+        self.query = JournalQuery(self.path)
+
+    def tearDown(self):
+        self.query.close()
+        self.directory.cleanup()
+
+    def test_frequency_excludes_bound_rows(self):
+        self.assertEqual(self.query.frequency(0.5), [(DIRECT.name, 6, 4, 0.8)])
+        self.assertEqual(self.query.frequency(0.5)[0].frequency, 4 / 6)
+        self.assertEqual(self.query.routes(), [DIRECT.name, REVERSE.name])
+        query = JournalQuery(self.path, include_bound=True)
+        self.assertEqual(query.frequency(0.5, route=REVERSE.name)[0].above_threshold, 6)
+        query.close()
+
+    def test_episodes_split_on_gaps(self):
+        episodes = self.query.episodes(0.5, max_gap=2)
+        self.assertEqual([(episode.start, episode.end, episode.evaluations) for episode in episodes], [(2, 4, 3), (9, 9, 1)])
+        self.assertEqual(episodes[0].duration, 2)
+        self.assertEqual(episodes[0].max_profit, 0.7)
+        self.assertEqual(len(self.query.episodes(0.5)), 1)
+
+    def test_size_distribution(self):
+        counts, edges = self.query.size_distribution(0.5, bins=2)
+        self.assertEqual(counts.tolist(), [3, 1])
+        self.assertEqual(edges.tolist(), [20, 55, 90])
+
+    def test_database_failure_stops_recording(self):
+        path = os.path.join(self.directory.name, "broken.db")
+        with open(path, "wb") as f:
+            f.write(b"not a database" * 100)
+        journal = OpportunityJournal(path, batch_size=1)
+        journal.start()
+        journal._thread.join()
+        self.assertTrue(journal.error)
+        journal.record(0, DIRECT, Decimal("0.1"), [], Decimal("0"), ())
+        journal.stop()
+        self.assertEqual((journal.rows_recorded, journal.rows_written), (0, 0))
+        self.assertIn("FAILED: ", journal.format())
+
+class TestStrategyJournal(unittest.TestCase):
+    def test_every_evaluation_is_recorded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "opportunities.db")
+            strategy = make_triangle_strategy(FLAT_TRIANGLE_BOOKS, top_of_book_filter_enabled=False,
+                                              opportunity_journal_path=path)
+            for timestamp in range(1, 6):
+                strategy.set_timestamp(timestamp)
+                strategy.on_tick()
+            strategy.stop()
+
+            self.assertIn("Opportunity journal: 10 evaluations recorded, 10 written", strategy.format_status())
+            query = JournalQuery(path)
+            rows = query.connection.execute("SELECT route, book_versions, order_amounts FROM evaluations").fetchall()
+            query.close()
+        self.assertEqual({row[0] for row in rows}, {"ADA-USDT/ADA-BTC/BTC-USDT", "BTC-USDT/ADA-BTC/ADA-USDT"})
+        self.assertEqual(rows[0][1], "1:0,1:0,1:0")
+        self.assertEqual(len(rows[0][2].split(",")), 3)
+
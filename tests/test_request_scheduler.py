@@ -0,0 +1,75 @@
+import unittest
+from src.request_scheduler import BALANCE, CANCEL, ORDER, RequestScheduler, TokenBucket, parse_rate_limits
+from tests import make_triangle_strategy
+
+class TestRateLimits(unittest.TestCase):
+    def test_parse_rate_limits(self):
+        self.assertEqual(parse_rate_limits("*=1200/60, Order=50/10,"), {"*": (1200.0, 60.0), "order": (50.0, 10.0)})
+        self.assertEqual(parse_rate_limits(""), {})
+
+    def test_bucket_refills_up_to_capacity(self):
+        bucket = TokenBucket(10, 5)
+        bucket.refill(0)
+        bucket.tokens -= 12
+        bucket.refill(3)
+        self.assertEqual(bucket.tokens, 4)
+        self.assertAlmostEqual(bucket.usage, 0.6)
+        bucket.refill(100)
+        self.assertEqual(bucket.tokens, 10)
+
+class TestRequestScheduler(unittest.TestCase):
+    def test_orders_go_out_over_the_limit(self):
+        scheduler = RequestScheduler({ORDER: (2, 10)})
+        for _ in range(3):
+            self.assertTrue(scheduler.request(ORDER, 0))
+        self.assertEqual(scheduler.requests[ORDER], 3)
+        self.assertEqual(scheduler.over_limit, {ORDER: 1})
+        self.assertEqual(scheduler.buckets[ORDER].tokens, -1)
+
+    def test_refreshes_wait_for_the_reserve(self):
+        scheduler = RequestScheduler({"*": (10, 10)}, reserve=0.2)
+        for _ in range(6):
+            scheduler.request(CANCEL, 0)
+        self.assertTrue(scheduler.request(BALANCE, 0, weight=2))
+        self.assertFalse(scheduler.request(BALANCE, 0, weight=2))
+        self.assertFalse(scheduler.request(BALANCE, 1, weight=2))
+        self.assertTrue(scheduler.request(BALANCE, 2, weight=2))
+        self.assertEqual(scheduler.held_back, {BALANCE: 2})
+        self.assertEqual(scheduler.waits[BALANCE].count, 1)
+        self.assertEqual(scheduler.waits[BALANCE].max, 2)
+        self.assertEqual(scheduler.format(2), ["*: 80% of 10 per 10s used",
+                                               "balance: 2 requests, 2 held back, waited n=1 mean=2000.0ms "
+                                               "max=2000.0ms last=2000.0ms",
+                                               "cancel: 6 requests"])
+
+    def test_refresh_heavier_than_the_reserve_waits_for_a_full_bucket(self):
+        scheduler = RequestScheduler({BALANCE: (10, 10)}, reserve=0.2)
+        scheduler.request(BALANCE, 0, weight=12)
+        self.assertFalse(scheduler.request(BALANCE, 5, weight=12))
+        self.assertFalse(scheduler.request(BALANCE, 11, weight=12))
+        self.assertTrue(scheduler.request(BALANCE, 12, weight=12))
+        self.assertEqual(scheduler.buckets[BALANCE].tokens, -2)
+
+    def test_unlimited_scheduler_only_counts(self):
+        scheduler = RequestScheduler({})
+        self.assertFalse(scheduler.enabled)
+        self.assertTrue(scheduler.request(BALANCE, 0, weight=1000))
+        self.assertEqual(scheduler.requests, {BALANCE: 1})
+
+class TestStrategyRateLimits(unittest.TestCase):
+    def test_reconciliation_waits_while_orders_use_the_limit(self):
+        # The triangle stays profitable, so a new cycle starts as soon as the last one completed.
+        strategy = make_triangle_strategy(order_latency=1, rate_limits="*=6/10", balance_reconcile_interval=0)
+        connector = strategy.connector
+        for timestamp in range(1, 8):
+            strategy.set_timestamp(timestamp)
+            connector.process_orders(timestamp)
+            strategy.on_tick()
+
+        scheduler = strategy.request_scheduler
+        self.assertEqual(strategy.cycles_started, 3)
+        self.assertEqual(scheduler.requests, {BALANCE: 1, ORDER: 7})
+        self.assertEqual(scheduler.held_back, {BALANCE: 2})
+        self.assertEqual(scheduler.over_limit, {ORDER: 1})
+        self.assertIn("Rate limits:\n  *: 107% of 6 per 10s used", strategy.format_status())
+        strategy.stop()
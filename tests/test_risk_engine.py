@@ -0,0 +1,78 @@
+import unittest
+from decimal import Decimal
+from src.risk_engine import RiskEngine, RollingWindow
+from tests import make_triangle_strategy
+
+class TestRollingWindow(unittest.TestCase):
+    def test_values_expire(self):
+        window = RollingWindow(10, 0.0)
+        for timestamp, value in ((0, 1.0), (5, 2.0), (9, 3.0)):
+            window.add(timestamp, value)
+        self.assertEqual((window.total, window.count), (6.0, 3))
+        window.add(12, 4.0)
+        self.assertEqual((window.total, window.count, window.mean), (9.0, 3, 3.0))
+        window.expire(30)
+        self.assertEqual((window.total, window.count, window.mean), (0.0, 0, 0.0))
+
+class TestRiskEngine(unittest.TestCase):
+    def test_kill_switch_rate_on_window_pnl(self):
+        engine = RiskEngine(60, kill_switch_rate=Decimal("-2"))
+        engine.record_cycle(0, Decimal("-1"), Decimal("100"))
+        engine.record_cycle(10, Decimal("-0.5"), Decimal("100"))
+        self.assertFalse(engine.halted)
+        engine.record_cycle(70, Decimal("-2.5"), Decimal("100"))
+        self.assertTrue(engine.halted)
+        self.assertIn("P&L of -2.5000% over the last 60s", engine.halt_reason)
+        self.assertEqual(engine.drawdown, Decimal("4"))
+
+    def test_drawdown_from_peak(self):
+        engine = RiskEngine(60, max_drawdown=Decimal("3"))
+        for profit in ("5", "-2", "1", "-1.5"):
+            engine.record_cycle(0, Decimal(profit), Decimal("100"))
+        self.assertFalse(engine.halted)
+        self.assertEqual(engine.max_drawdown_seen, Decimal("2.5"))
+        engine.record_cycle(0, Decimal("-0.5"), Decimal("100"))
+        self.assertEqual(engine.halt_reason, "Drawdown of 3.0 reached the limit 3")
+
+    def test_slippage_is_positive_when_worse(self):
+        engine = RiskEngine(60, max_fill_slippage=Decimal("0.5"))
+        engine.record_fill(0, True, Decimal("101"), Decimal("100"))
+        engine.record_fill(0, False, Decimal("101"), Decimal("100"))
+        self.assertAlmostEqual(engine.slippage.total, 0.0)
+        engine.record_fill(0, False, Decimal("98"), Decimal("100"))
+        self.assertAlmostEqual(engine.slippage.mean, 2 / 3)
+        self.assertTrue(engine.halted)
+
+    def test_failure_rate_needs_enough_orders(self):
+        engine = RiskEngine(60, max_order_failure_rate=Decimal("0.3"))
+        for index in range(9):
+            engine.record_order(index, failed=index % 2 == 0)
+        self.assertFalse(engine.halted)
+        engine.record_order(9, failed=False)
+        self.assertTrue(engine.halted)
+        self.assertIn("Order failure rate of 50.0%", engine.halt_reason)
+
+    def test_disabled_engine_only_measures(self):
+        engine = RiskEngine(60, enabled=False, kill_switch_rate=Decimal("-2"))
+        engine.record_cycle(0, Decimal("-10"), Decimal("100"))
+        self.assertFalse(engine.halted)
+        self.assertIn("P&L -10 USDT (-10.0000%) in 1 cycles over 60s", engine.format("USDT", 30))
+        self.assertIn("P&L 0 USDT (0.0000%) in 0 cycles", engine.format("USDT", 60))
+
+class TestStrategyKillSwitch(unittest.TestCase):
+    def test_breach_blocks_new_cycles(self):
+        # The triangle's 4% before fees stays below the kill switch rate of 10%.
+        strategy = make_triangle_strategy(order_latency=1, kill_switch_enabled=True, kill_switch_rate=Decimal("10"))
+        connector = strategy.connector
+        for timestamp in range(1, 10):
+            strategy.set_timestamp(timestamp)
+            connector.process_orders(timestamp)
+            strategy.on_tick()
+        strategy.stop()
+
+        self.assertEqual(strategy.cycles_started, 1)
+        self.assertGreater(strategy.total_profit, 0)
+        self.assertTrue(strategy.risk_engine.halted)
+        self.assertEqual(strategy.risk_engine.orders.count, 3)
+        self.assertEqual(strategy.risk_engine.slippage.count, 3)
+        self.assertIn("HALTED: P&L of", strategy.format_status())
@@ -0,0 +1,76 @@
+import unittest
+from decimal import Decimal
+from hummingbot.core.data_type.common import TradeType
+from src.backtest import BacktestStrategy
+from src.config import TriangularArbitrageConfig
+from src.order_book_analyzer import DefaultOrderBookAnalyzer
+from src.route import RouteCompiler, compile_route
+from src.simulated_connector import SimulatedConnector
+from src.triangle_discovery import InvalidTradingPairError
+
+# USDT -> ADA -> USDC -> BTC -> USDT, through two stablecoins.
+QUAD_PAIRS = ("ADA-USDT", "ADA-USDC", "BTC-USDC", "BTC-USDT")
+
+def make_connector() -> SimulatedConnector:
+    connector = SimulatedConnector(list(QUAD_PAIRS), {"USDT": Decimal("1000")}, fee_percent=Decimal("0.001"))
+    books = {
+        "ADA-USDT": ([(0.49, 1000)], [(0.50, 1000)]),
+        "ADA-USDC": ([(0.52, 1000)], [(0.53, 1000)]),
+        "BTC-USDC": ([(49000, 1)], [(50000, 1)]),
+        "BTC-USDT": ([(50000, 1)], [(51000, 1)]),
+    }
+    for pair, (bids, asks) in books.items():
+        connector.get_order_book(pair).apply_snapshot(bids, asks, 1)
+    return connector
+
+class TestRoute(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = DefaultOrderBookAnalyzer(make_connector())
+
+    def test_compile_four_leg_route(self):
+        route = compile_route(self.analyzer, "USDT", QUAD_PAIRS)
+        self.assertEqual(route.leg_count, 4)
+        self.assertEqual(route.order_sides, (TradeType.BUY, TradeType.SELL, TradeType.BUY, TradeType.SELL))
+        self.assertEqual([(leg.spent_asset, leg.received_asset) for leg in route.legs],
+                         [("USDT", "ADA"), ("ADA", "USDC"), ("USDC", "BTC"), ("BTC", "USDT")])
+        self.assertEqual(route.name, "ADA-USDT/ADA-USDC/BTC-USDC/BTC-USDT")
+        with self.assertRaises(AttributeError):
+            route.legs[0].is_buy = False
+
+    def test_compile_rejects_open_route(self):
+        with self.assertRaises(InvalidTradingPairError):
+            compile_route(self.analyzer, "USDT", ("ADA-USDT", "ADA-USDC", "BTC-USDC"))
+
+    def test_compiler_returns_the_same_route(self):
+        compiler = RouteCompiler(self.analyzer, "USDT")
+        route = compiler.compile(QUAD_PAIRS)
+        self.assertIs(compiler.get_route(route.trading_pairs, route.order_sides), route)
+
+class TestQuadrangularStrategy(unittest.TestCase):
+    def setUp(self):
+        self.connector = make_connector()
+        config = TriangularArbitrageConfig(route_pairs=",".join(QUAD_PAIRS), holding_asset="USDT",
+                                           order_amount_in_holding_asset=Decimal("10"), min_profitability=Decimal("0.5"))
+        self.strategy = BacktestStrategy(config, self.connector)
+        self.strategy.on_tick()
+
+    def test_profit_of_four_leg_route(self):
+        self.assertEqual(self.strategy.status, "ACTIVE")
+        self.assertEqual(self.strategy.routes["reverse"].trading_pairs, tuple(reversed(QUAD_PAIRS)))
+
+        opportunity = self.strategy.find_arbitrage_opportunity()
+
+        self.assertEqual(opportunity.direction, "direct")
+        self.assertEqual(len(opportunity.order_amounts), 4)
+        expected = Decimal("10") / Decimal("0.5") * Decimal("0.999") * Decimal("0.52") * Decimal("0.999")
+        expected = expected / 50000 * Decimal("0.999") * 50000 * Decimal("0.999")
+        # The BTC amount is quantized to 8 decimals, which costs a few thousandths of a percent.
+        self.assertAlmostEqual(opportunity.profit, (expected - 10) * 10, places=2)
+
+    def test_cycle_places_every_leg(self):
+        self.strategy.on_tick()
+        for timestamp in range(4):
+            self.connector.process_orders(timestamp)
+        self.assertEqual(self.connector.filled_orders, 4)
+        self.assertEqual(self.strategy.status, "ACTIVE")
+        self.assertGreater(self.connector.get_balance("USDT"), Decimal("1000"))
@@ -0,0 +1,109 @@
+import unittest
+from decimal import Decimal
+import numpy as np
+from src.backtest import BacktestStrategy
+from src.config import TriangularArbitrageConfig
+from src.sharded_evaluation import SEQUENCE, ShardEvaluator, ShardedEvaluator, SharedOrderBooks, ShardRoute
+from src.simulated_connector import SimulatedConnector
+from src.triangle_discovery import TriangleDiscovery
+from src.vectorized_order_book_analyzer import BookSideArrays
+
+PAIRS = ["ADA-BTC", "ADA-USDT", "BTC-USDT", "ETH-BTC", "ETH-USDT"]
+
+def make_connector(ada_btc_bid: float = 0.0000099) -> SimulatedConnector:
+    connector = SimulatedConnector(PAIRS, {"USDT": Decimal("1000")})
+    books = {
+        "ADA-USDT": ([(0.49, 1000), (0.48, 1000)], [(0.50, 1000), (0.51, 1000)]),
+        "ADA-BTC": ([(ada_btc_bid, 1000), (0.0000098, 1000)], [(0.0000102, 1000)]),
+        "BTC-USDT": ([(50000, 0.001), (49000, 1)], [(51000, 1)]),
+        "ETH-USDT": ([(2000, 1)], [(2010, 1)]),
+        "ETH-BTC": ([(0.039, 1)], [(0.041, 1)]),
+    }
+    for pair, (bids, asks) in books.items():
+        connector.get_order_book(pair).apply_snapshot(bids, asks, 1)
+    return connector
+
+class TestSharedOrderBooks(unittest.TestCase):
+    def setUp(self):
+        self.books = SharedOrderBooks.create(pair_count=2, depth=4)
+        self.addCleanup(self.books.unlink)
+        self.addCleanup(self.books.close)
+
+    def test_write_truncates_to_depth_and_keeps_sequence_even(self):
+        bids = np.array([(round(0.49 - i * 0.01, 2), 10.0) for i in range(6)])
+        self.books.write(1, bids, np.array([(0.5, 5.0)]))
+        self.assertEqual(self.books.sequence(1), 2)
+        self.assertEqual(self.books.sequence(0), 0)
+        self.assertEqual(self.books.headers[1, 1:3].tolist(), [4, 1])
+        self.assertEqual(self.books.levels[1, 0, 0].tolist(), [0.49, 0.48, 0.47, 0.46])
+
+    def test_reader_skips_book_being_written(self):
+        self.books.write(0, np.array([(0.49, 10.0)]), np.array([(0.5, 10.0)]))
+        evaluator = ShardEvaluator(self.books, [ShardRoute(0, (0,), (True,))], max_retries=3)
+        self.assertAlmostEqual(evaluator.evaluate_route(evaluator.routes[0], 1.0), 100.0)
+
+        self.books.headers[0, SEQUENCE] += 1
+        self.assertIsNone(evaluator.evaluate_route(evaluator.routes[0], 1.0))
+        self.assertEqual(evaluator.retries, 3)
+
+        self.books.headers[0, SEQUENCE] += 1
+        self.assertAlmostEqual(evaluator.evaluate_route(evaluator.routes[0], 1.0), 100.0)
+
+    def test_route_walk_matches_book_side_arrays(self):
+        bids = [(50000.0, 0.001), (49000.0, 1.0)]
+        asks = [(0.50, 10.0), (0.52, 30.0)]
+        self.books.write(0, np.array(asks), np.array(asks))
+        self.books.write(1, np.array(bids), np.array(bids))
+        evaluator = ShardEvaluator(self.books, [ShardRoute(0, (0, 1), (True, False))])
+        evaluator.fee_multipliers[0] = (0.999, 0.999)
+
+        base = BookSideArrays.from_entries(asks).base_for_quote_volume(10.0) * 0.999
+        quote = BookSideArrays.from_entries(bids).quote_for_base_amount(base) * 0.999
+        self.assertAlmostEqual(evaluator.evaluate_route(evaluator.routes[0], 10.0), (quote - 10) / 10 * 100)
+
+class TestShardedEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.triangles = TriangleDiscovery("USDT").discover(PAIRS)
+
+    def test_workers_return_only_profitable_routes(self):
+        connector = make_connector(ada_btc_bid=0.0000104)
+        evaluator = ShardedEvaluator(self.triangles, workers=2, depth=10)
+        evaluator.start()
+        self.addCleanup(evaluator.stop)
+
+        self.assertEqual(evaluator.publish_books(connector), len(PAIRS))
+        self.assertEqual(evaluator.publish_books(connector), 0)
+        evaluator.set_fee_multipliers({route_id: (0.999, 0.999, 0.999) for route_id in range(4)})
+        candidates = evaluator.evaluate(10.0, 0.5)
+
+        self.assertEqual([evaluator.get_route(c.route_id)[0].name for c in candidates], ["ADA-USDT/ADA-BTC/BTC-USDT"])
+        self.assertEqual(evaluator.get_route(candidates[0].route_id)[1], "direct")
+        self.assertAlmostEqual(candidates[0].profit, (10 / 0.5 * 0.999 * 0.0000104 * 0.999 * 50000 * 0.999 - 10) * 10)
+        self.assertEqual(evaluator.routes_evaluated, 4)
+
+        connector.get_order_book("ADA-BTC").apply_diff(False, 0.0000104, 0, 2)
+        self.assertEqual(evaluator.publish_books(connector), 1)
+        self.assertEqual(evaluator.evaluate(10.0, 0.5), [])
+
+    def test_stop_releases_shared_memory(self):
+        evaluator = ShardedEvaluator(self.triangles, workers=4)
+        self.assertEqual(evaluator.workers, 2)
+        evaluator.start()
+        evaluator.stop()
+        self.assertFalse(evaluator.started)
+
+    def test_strategy_verifies_shard_candidates(self):
+        connector = make_connector(ada_btc_bid=0.0000104)
+        config = TriangularArbitrageConfig(scan_all_triangles=True, sharded_workers=2, sharded_book_depth=10,
+                                           order_amount_in_holding_asset=Decimal("10"),
+                                           min_profitability=Decimal("0.5"), evaluation_cache_enabled=False)
+        strategy = BacktestStrategy(config, connector)
+        strategy.on_tick()
+        self.addCleanup(strategy.stop)
+        self.assertEqual(strategy.status, "ACTIVE")
+
+        opportunity = strategy.find_arbitrage_opportunity()
+
+        self.assertEqual(opportunity.trading_pair, ("ADA-USDT", "ADA-BTC", "BTC-USDT"))
+        self.assertEqual(opportunity.order_amounts[0], Decimal("20"))
+        self.assertIn("Sharded evaluation: 2 workers, 2 triangles", strategy.format_status())
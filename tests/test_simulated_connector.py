@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import Mock
+from decimal import Decimal
+from hummingbot.core.data_type.common import OrderType
+from src.book_recording import KIND_DIFF, KIND_SNAPSHOT, SIDE_ASK, SIDE_BID, make_records
+from src.simulated_connector import FillModel, SimulatedConnector
+
+class TestSimulatedConnector(unittest.TestCase):
+    def setUp(self):
+        self.connector = SimulatedConnector(["ADA-USDT"], {"USDT": Decimal("100")}, fee_percent=Decimal("0.001"),
+                                            order_latency=1.0)
+        records = make_records(4)
+        for record, (update_id, price, amount, side, kind) in zip(records, [
+            (1, 0.49, 100, SIDE_BID, KIND_SNAPSHOT),
+            (1, 0.50, 100, SIDE_ASK, KIND_SNAPSHOT),
+            (1, 0.51, 100, SIDE_ASK, KIND_SNAPSHOT),
+            (2, 0.50, 0, SIDE_ASK, KIND_DIFF),
+        ]):
+            record["update_id"], record["price"], record["amount"] = update_id, price, amount
+            record["side"], record["kind"] = side, kind
+        self.connector.apply_records(records[:3], ["ADA-USDT"])
+        self.listener = Mock(spec=["did_create_buy_order", "did_fill_order", "did_complete_buy_order",
+                                   "did_fail_order", "did_cancel_order"])
+        self.connector.add_listener(self.listener)
+
+    def test_snapshot_and_diff(self):
+        book = self.connector.get_order_book("ADA-USDT")
+        self.assertEqual([row.price for row in book.ask_entries()], [0.50, 0.51])
+        self.assertEqual(book.snapshot_uid, 1)
+        self.assertEqual(self.connector.get_quote_volume_for_base_amount("ADA-USDT", True, Decimal("150")).result_volume,
+                         Decimal("75.5"))
+
+    def test_market_buy_fills_after_latency(self):
+        order_id = self.connector.buy("ADA-USDT", Decimal("100"), OrderType.MARKET, Decimal("0.5"))
+        self.connector.process_orders(0.5)
+        self.listener.did_complete_buy_order.assert_not_called()
+
+        self.connector.process_orders(1.0)
+        completed = self.listener.did_complete_buy_order.call_args.args[0]
+        self.assertEqual(completed.order_id, order_id)
+        self.assertEqual(self.connector.get_balance("USDT"), Decimal("50.0"))
+        self.assertEqual(self.connector.get_balance("ADA"), Decimal("99.900"))
+
+    def test_order_fails_without_liquidity_or_balance(self):
+        self.connector.buy("ADA-USDT", Decimal("500"), OrderType.MARKET, Decimal("0.5"))
+        self.connector.sell("ADA-USDT", Decimal("10"), OrderType.MARKET, Decimal("0.5"))
+        self.connector.process_orders(1.0)
+        self.assertEqual(self.listener.did_fail_order.call_count, 2)
+        self.assertEqual(self.connector.failed_orders, 2)
+
+    def test_cancel_pending_order(self):
+        order_id = self.connector.buy("ADA-USDT", Decimal("10"), OrderType.MARKET, Decimal("0.5"))
+        self.connector.cancel_order(order_id)
+        self.assertFalse(self.connector.has_pending_orders)
+        self.listener.did_cancel_order.assert_called_once()
+
+    def test_consume_liquidity_and_split_fills(self):
+        self.connector.fill_model = FillModel(consume_liquidity=True, fills_per_order=3)
+        self.connector.buy("ADA-USDT", Decimal("150"), OrderType.MARKET, Decimal("0.5"))
+        self.connector.process_orders(1.0)
+        book = self.connector.get_order_book("ADA-USDT")
+        self.assertEqual([(row.price, row.amount) for row in book.ask_entries()], [(0.51, 50)])
+        self.assertEqual(book.last_diff_uid, 2)
+        fills = [call.args[0].amount for call in self.listener.did_fill_order.call_args_list]
+        self.assertEqual(len(fills), 3)
+        self.assertEqual(sum(fills), Decimal("150"))
+        self.listener.did_complete_buy_order.assert_called_once()
+
+    def test_failure_rate_and_latency_jitter(self):
+        self.connector.fill_model = FillModel(failure_rate=1.0, latency_jitter=0.5)
+        self.connector.buy("ADA-USDT", Decimal("10"), OrderType.MARKET, Decimal("0.5"))
+        self.connector.process_orders(1.0)
+        self.assertTrue(self.connector.has_pending_orders)
+        self.connector.process_orders(1.5)
+        self.listener.did_fail_order.assert_called_once()
+        self.assertEqual(self.connector.get_balance("USDT"), Decimal("100"))
@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from src.config import StrategyHostConfig
+from src.simulated_connector import SimulatedConnector
+from src.strategy_host import StrategyHost, load_strategy_configs
+from tests import TRIANGLE_BOOKS
+
+# ADA-USDT/ADA-BTC/BTC-USDT is profitable, ETH-USDT/ETH-BTC/BTC-USDT is not. Both trade BTC-USDT.
+BOOKS = {**TRIANGLE_BOOKS, "ETH-USDT": ([(2500, 10)], [(2505, 10)]), "ETH-BTC": ([(0.0499, 10)], [(0.0501, 10)])}
+
+STRATEGIES = {"ada": {"first_pair": "ADA-USDT", "second_pair": "ADA-BTC", "third_pair": "BTC-USDT"},
+              "eth": {"first_pair": "ETH-USDT", "second_pair": "ETH-BTC", "third_pair": "BTC-USDT"}}
+
+class SimulatedStrategyHost(StrategyHost):
+    def __init__(self, host_config: StrategyHostConfig, connector: SimulatedConnector):
+        self._simulated_connector = connector
+        self._timestamp: float = 0.0
+        self.added_markets = []
+        super().__init__(host_config)
+        connector.add_listener(self)
+
+    @property
+    def connectors(self):
+        return {"kucoin": self._simulated_connector}
+
+    @property
+    def current_timestamp(self) -> float:
+        return self._timestamp
+
+    def set_timestamp(self, timestamp: float):
+        self._timestamp = timestamp
+
+    def _add_markets(self, markets):
+        self.added_markets.append(markets)
+
+    def buy(self, connector_name, trading_pair, amount, order_type, price) -> str:
+        return self.connectors[connector_name].buy(trading_pair, amount, order_type, price)
+
+    def sell(self, connector_name, trading_pair, amount, order_type, price) -> str:
+        return self.connectors[connector_name].sell(trading_pair, amount, order_type, price)
+
+    def cancel(self, connector_name, order_id):
+        self.connectors[connector_name].cancel_order(order_id)
+
+class TestStrategyHost(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "strategies.json")
+        self.writes = 0
+        self.write_config(STRATEGIES)
+        self.connector = SimulatedConnector(list(BOOKS), {"USDT": Decimal("1000")}, order_latency=1)
+        for pair, (bids, asks) in BOOKS.items():
+            self.connector.get_order_book(pair).apply_snapshot(bids, asks, 1)
+        self.host = SimulatedStrategyHost(StrategyHostConfig(self.path, reload_interval=0), self.connector)
+        self.timestamp = 0
+
+    def tearDown(self):
+        self.host.stop()
+        self.directory.cleanup()
+
+    def write_config(self, strategies, defaults=None):
+        defaults = defaults or {"connector_name": "kucoin", "holding_asset": "USDT", "order_amount_in_holding_asset": 10,
+                                "order_book_analyzer": "numpy", "top_of_book_filter_enabled": "false"}
+        with open(self.path, "w") as f:
+            json.dump({"defaults": defaults, "strategies": strategies}, f)
+        # Make the change visible even within the file system's timestamp resolution.
+        self.writes += 1
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + self.writes * 1_000_000_000))
+
+    def tick(self, count: int = 1):
+        for _ in range(count):
+            self.timestamp += 1
+            self.host.set_timestamp(self.timestamp)
+            self.connector.process_orders(self.timestamp)
+            self.host.on_tick()
+
+    def test_load_layers_strategies_over_defaults(self):
+        configs = load_strategy_configs(self.path)
+        self.assertEqual(configs["eth"].second_pair, "ETH-BTC")
+        self.assertEqual(configs["eth"].order_amount_in_holding_asset, Decimal("10"))
+        self.assertFalse(configs["ada"].top_of_book_filter_enabled)
+        self.write_config({"ada": {"first_pair": "ADA-USDT", "order_size": 1}})
+        with self.assertRaisesRegex(ValueError, "Strategy ada: Unknown config field: order_size"):
+            load_strategy_configs(self.path)
+
+    def test_markets_and_depth_arrays_are_shared(self):
+        self.assertEqual(self.host.added_markets, [{"kucoin": set(BOOKS)}])
+        ada, eth = self.host.strategies["ada"], self.host.strategies["eth"]
+        self.assertIs(ada.order_book_analyzer, eth.order_book_analyzer)
+        self.assertIs(ada.trade_sizer.analyzer, eth.order_book_analyzer)
+
+        self.tick(2)
+        self.assertEqual(ada.cycles_started, 1)
+        self.assertEqual(eth.cycles_started, 0)
+        # Both strategies read BTC-USDT, but each side of each book version is converted once.
+        depth_arrays = ada.order_book_analyzer
+        self.assertLessEqual(depth_arrays.cached_sides, 2 * len(BOOKS))
+        self.assertEqual(depth_arrays.conversions, depth_arrays.cached_sides)
+        # The cycle of ada holds USDT that eth must not spend.
+        self.assertEqual(eth.get_free_balance("USDT"), ada.get_free_balance("USDT"))
+        self.assertLess(eth.get_free_balance("USDT"), self.connector.get_balance("USDT"))
+        self.assertIn("Strategies: 2 running, 0 draining", self.host.format_status())
+        self.assertIn("[ada]\n  Status: ARBITRAGE_STARTED", self.host.format_status())
+
+    def test_reload_drains_changed_strategies(self):
+        self.tick(2)
+        ada = self.host.strategies["ada"]
+        self.assertEqual(len(ada.cycles), 1)
+
+        self.write_config({"ada": {**STRATEGIES["ada"], "min_profitability": "1"}})
+        self.tick()
+        self.assertEqual(list(self.host.strategies), [])
+        self.assertEqual(list(self.host.draining), ["ada"])
+        self.assertEqual(ada.status, "NOT_ACTIVE")
+        self.assertIn("ada", self.host.pending)
+
+        self.tick(4)
+        self.assertEqual(ada.cycles, [])
+        self.assertGreater(ada.total_profit, 0)
+        self.assertEqual(list(self.host.strategies), ["ada"])
+        self.assertIsNot(self.host.strategies["ada"], ada)
+        self.assertEqual(self.host.strategies["ada"].config.min_profitability, Decimal("1"))
+        self.assertEqual(self.host.reloads, 1)
+
+    def test_reload_keeps_running_configs_on_errors(self):
+        ada = self.host.strategies["ada"]
+        self.write_config({**STRATEGIES, "ada": {**STRATEGIES["ada"], "first_pair": "XRP-USDT"},
+                           "xrp": {"first_pair": "XRP-USDT", "second_pair": "XRP-BTC", "third_pair": "BTC-USDT"}})
+        self.tick()
+        self.assertEqual(self.host.rejected_reloads, 2)
+        self.assertIs(self.host.strategies["ada"], ada)
+        self.assertNotIn("xrp", self.host.strategies)
+
+        with open(self.path, "w") as f:
+            f.write("{")
+        self.tick()
+        self.assertEqual(self.host.rejected_reloads, 3)
+        self.assertEqual(list(self.host.strategies), ["ada", "eth"])
+
+    def test_services_are_owned_by_the_host(self):
+        journal_path = os.path.join(self.directory.name, "journal.db")
+        capture_dir = os.path.join(self.directory.name, "capture")
+        self.host.stop()
+        self.write_config(STRATEGIES, {"connector_name": "kucoin", "holding_asset": "USDT",
+                                       "order_amount_in_holding_asset": 10, "log_mode": "async",
+                                       "opportunity_journal_path": journal_path, "market_data_capture_enabled": "true",
+                                       "market_data_capture_dir": capture_dir})
+        self.host = SimulatedStrategyHost(StrategyHostConfig(self.path, reload_interval=0), self.connector)
+        ada, eth = self.host.strategies["ada"], self.host.strategies["eth"]
+        self.assertIs(ada.opportunity_journal, eth.opportunity_journal)
+        self.assertIsNone(ada.market_data_capture)
+        self.assertIsNone(ada.async_logging)
+        self.assertEqual(len(self.host.market_data_captures), 1)
+        self.assertEqual(self.host.market_data_captures[0].trading_pairs, sorted(BOOKS))
+
+        logger = ada.logger
+        propagate = logger.propagate
+        self.tick(2)
+        self.assertFalse(logger.propagate)
+        self.host.stop()
+        self.assertEqual(logger.propagate, propagate)
+        self.assertNotIn(self.host.async_logging.handler, logger.handlers)
+        self.assertGreater(ada.opportunity_journal.rows_written, 0)
+        self.assertEqual(len(os.listdir(capture_dir)), 1)
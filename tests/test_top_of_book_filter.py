@@ -0,0 +1,57 @@
+import random
+import unittest
+from unittest.mock import Mock
+from decimal import Decimal
+from src.backtest import BacktestStrategy
+from tests import FLAT_TRIANGLE_BOOKS, make_triangle_strategy
+
+def make_strategy(min_profitability: str, books=FLAT_TRIANGLE_BOOKS) -> BacktestStrategy:
+    return make_triangle_strategy(books, min_profitability=Decimal(min_profitability))
+
+class TestTopOfBookFilter(unittest.TestCase):
+    def test_upper_bound_from_best_prices_and_fees(self):
+        strategy = make_strategy("0.5")
+        bound = strategy.top_of_book_filter.upper_bound(strategy.routes["direct"])
+        self.assertAlmostEqual(bound, (1 / 0.5 * 0.00001 * 50000 * 0.999 ** 3 - 1) * 100)
+
+        strategy.connector.get_order_book("BTC-USDT").apply_snapshot([], [(50100, 1)], 2)
+        strategy.top_of_book_filter.book_version_cache.start_tick()
+        self.assertEqual(strategy.top_of_book_filter.upper_bound(strategy.routes["direct"]), -100.0)
+
+    def test_empty_book_that_raises_prunes_the_route(self):
+        strategy = make_strategy("0.5")
+        orderbook = strategy.connector.get_order_book("BTC-USDT")
+        orderbook.apply_snapshot([], [(50100, 1)], 2)
+        # Hummingbot's order books raise on an empty side.
+        orderbook.get_price = Mock(side_effect=EnvironmentError("Bid orderbook for BTC-USDT is empty."))
+        strategy.set_timestamp(1)
+        strategy.on_tick()
+        self.assertEqual(strategy.status, "ACTIVE")
+        self.assertEqual(strategy.top_of_book_filter.upper_bound(strategy.routes["direct"]), -100.0)
+
+    def test_unprofitable_routes_skip_the_depth_walk(self):
+        strategy = make_strategy("0.5")
+        strategy.calculate_route_profit = Mock()
+
+        self.assertIsNone(strategy.find_arbitrage_opportunity())
+
+        strategy.calculate_route_profit.assert_not_called()
+        self.assertEqual((strategy.top_of_book_filter.evaluations, strategy.top_of_book_filter.pruned), (2, 2))
+        self.assertIn("Top-of-book prefilter: pruned 2 of 2 evaluations (100.0%)", strategy.format_status())
+
+    def test_bound_is_never_below_walked_profit(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            books = {}
+            for pair, mid in (("ADA-USDT", 0.5), ("ADA-BTC", 0.00001), ("BTC-USDT", 50000.0)):
+                size = 0.01 if pair == "BTC-USDT" else 50.0
+                bids = [(round(mid * (1 - rng.uniform(0, 0.02) - 0.001 * level), 10), size * rng.uniform(0.1, 2))
+                        for level in range(5)]
+                asks = [(round(mid * (1 + rng.uniform(0, 0.02) + 0.001 * level), 10), size * rng.uniform(0.1, 2))
+                        for level in range(5)]
+                books[pair] = (bids, asks)
+            strategy = make_strategy("-100", books)
+            for route in strategy.routes.values():
+                profit, amounts = strategy.calculate_route_profit(route)
+                if amounts:
+                    self.assertGreaterEqual(strategy.top_of_book_filter.upper_bound(route), float(profit) - 1e-9)
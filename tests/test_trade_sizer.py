@@ -0,0 +1,58 @@
+import unittest
+from unittest.mock import Mock
+from decimal import Decimal
+import numpy as np
+from hummingbot.core.data_type.common import TradeType
+from src.trade_sizer import SizingLeg, TradeSizer
+from src.vectorized_order_book_analyzer import BookSideArrays
+
+def make_side(best_price, step, sizes):
+    prices = best_price + step * np.arange(len(sizes))
+    return BookSideArrays(prices, np.array(sizes, dtype=float))
+
+class TestTradeSizer(unittest.TestCase):
+    def setUp(self):
+        self.sizer = TradeSizer(Mock())
+        # USDT -> ADA -> BTC -> USDT with a ~2% edge at the top of the books that fades with depth.
+        self.legs = [
+            SizingLeg(make_side(0.50, 0.002, [100, 200, 400, 800]), True, 0.999),
+            SizingLeg(make_side(0.0000102, -0.0000001, [150, 300, 600, 1200]), False, 0.999),
+            SizingLeg(make_side(50000.0, -100.0, [0.001, 0.002, 0.01, 0.05]), False, 0.999),
+        ]
+
+    def brute_force(self, max_input, min_profitability):
+        inputs = np.linspace(1e-6, max_input, 200001)
+        outputs = self.sizer.evaluate(self.legs, inputs)
+        feasible = outputs >= (1 + min_profitability / 100) * inputs
+        profits = np.where(feasible, outputs - inputs, -np.inf)
+        return inputs[int(np.argmax(profits))]
+
+    def test_solve_matches_brute_force(self):
+        result = self.sizer.solve(self.legs, 1000.0, 0.0)
+        self.assertAlmostEqual(result.input_amount, self.brute_force(1000.0, 0.0), delta=0.01)
+        self.assertGreater(result.profit_pct, 0)
+
+    def test_solve_keeps_min_profitability(self):
+        result = self.sizer.solve(self.legs, 1000.0, 1.0)
+        self.assertAlmostEqual(result.profit_pct, 1.0, places=6)
+        self.assertAlmostEqual(result.input_amount, self.brute_force(1000.0, 1.0), delta=0.01)
+
+    def test_solve_bounded_by_balance(self):
+        result = self.sizer.solve(self.legs, 10.0, 0.0)
+        self.assertAlmostEqual(result.input_amount, 10.0)
+
+    def test_solve_infeasible_min_notional(self):
+        self.legs[0].min_input = 50.0
+        self.assertIsNone(self.sizer.solve(self.legs, 10.0, 0.0))
+
+    def test_build_legs_uses_trading_rules(self):
+        connector = Mock()
+        orderbook = Mock(snapshot_uid=1, last_diff_uid=1)
+        orderbook.ask_entries.return_value = [(Decimal('100'), Decimal('1')), (Decimal('101'), Decimal('2'))]
+        connector.get_order_book.return_value = orderbook
+        connector.trading_rules = {'BTC-USDT': Mock(min_order_size=Decimal('0.5'), min_notional_size=Decimal('10'))}
+
+        legs = TradeSizer(connector).build_legs(['BTC-USDT'], [TradeType.BUY], [Decimal('0.999')])
+
+        self.assertTrue(legs[0].is_buy)
+        self.assertAlmostEqual(legs[0].min_input, 50.0)
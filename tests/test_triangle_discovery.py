@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import Mock
+from decimal import Decimal
+from hummingbot.core.data_type.common import TradeType
+from src.triangle_discovery import (InvalidTradingPairError, TriangleDiscovery, TriangleRanker, build_triangle,
+                                    get_order_sides)
+
+class TestTriangleDiscovery(unittest.TestCase):
+    def test_discover(self):
+        pairs = ['ADA-USDT', 'ADA-BTC', 'BTC-USDT', 'ETH-USDT', 'ETH-BTC', 'XRP-BTC']
+        triangles = TriangleDiscovery('USDT').discover(pairs)
+        self.assertEqual([t.direct_pairs for t in triangles], [
+            ('ADA-USDT', 'ADA-BTC', 'BTC-USDT'),
+            ('BTC-USDT', 'ETH-BTC', 'ETH-USDT'),
+        ])
+
+    def test_build_triangle_sides(self):
+        triangle = build_triangle('USDT', 'ADA-USDT', 'ADA-BTC', 'BTC-USDT')
+        self.assertEqual(triangle.direct_sides, (TradeType.BUY, TradeType.SELL, TradeType.SELL))
+        self.assertEqual(triangle.reverse_pairs, ('BTC-USDT', 'ADA-BTC', 'ADA-USDT'))
+        self.assertEqual(triangle.reverse_sides, (TradeType.BUY, TradeType.BUY, TradeType.SELL))
+
+    def test_get_order_sides_invalid(self):
+        with self.assertRaises(InvalidTradingPairError):
+            get_order_sides('USDT', ('ADA-USDT', 'BTC-USDT', 'ADA-BTC'))
+
+class TestTriangleRanker(unittest.TestCase):
+    def test_rank(self):
+        prices = {
+            ('ADA-USDT', True): Decimal('0.5'), ('ADA-USDT', False): Decimal('0.49'),
+            ('ADA-BTC', True): Decimal('0.00001'), ('ADA-BTC', False): Decimal('0.0000099'),
+            ('BTC-USDT', True): Decimal('50000'), ('BTC-USDT', False): Decimal('49990'),
+        }
+        connector = Mock()
+        connector.get_price.side_effect = lambda pair, is_buy: prices[(pair, is_buy)]
+        triangle = build_triangle('USDT', 'ADA-USDT', 'ADA-BTC', 'BTC-USDT')
+
+        ranking = TriangleRanker(connector).rank([triangle], limit=1)
+
+        self.assertEqual(len(ranking), 1)
+        self.assertEqual(ranking[0].direction, 'direct')
+        self.assertAlmostEqual(ranking[0].top_of_book_rate, Decimal('0.98980'), places=5)
+        self.assertEqual(connector.get_price.call_count, 6)
+
+    def test_empty_book_side_ranks_last(self):
+        def get_price(pair, is_buy):
+            if pair == 'BTC-USDT' and not is_buy:
+                raise EnvironmentError("Bid orderbook for BTC-USDT is empty.")
+            return Decimal('1')
+        connector = Mock()
+        connector.get_price.side_effect = get_price
+        triangle = build_triangle('USDT', 'ADA-USDT', 'ADA-BTC', 'BTC-USDT')
+
+        ranking = TriangleRanker(connector).rank([triangle])
+
+        self.assertEqual([(ranked.direction, ranked.top_of_book_rate) for ranked in ranking],
+                         [('reverse', Decimal('1')), ('direct', Decimal('0'))])
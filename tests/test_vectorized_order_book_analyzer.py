@@ -0,0 +1,88 @@
+import random
+import unittest
+from unittest.mock import Mock
+from decimal import Decimal
+from hummingbot.core.data_type.common import TradeType
+from hummingbot.core.data_type.order_book import OrderBook
+from hummingbot.core.data_type.order_book_row import OrderBookRow
+from src.utils import get_base_amount_for_quote_volume
+from src.vectorized_order_book_analyzer import BookSideArrays, VectorizedOrderBookAnalyzer
+
+class TestBookSideArrays(unittest.TestCase):
+    def setUp(self):
+        self.entries = [(Decimal('100'), Decimal('1')), (Decimal('101'), Decimal('2')), (Decimal('102'), Decimal('3'))]
+        self.arrays = BookSideArrays.from_entries(self.entries)
+
+    def test_base_for_quote_volume(self):
+        self.assertAlmostEqual(self.arrays.base_for_quote_volume(150), 1.495049505, places=6)
+        self.assertAlmostEqual(self.arrays.base_for_quote_volume(100), 1.0, places=9)
+        self.assertAlmostEqual(self.arrays.base_for_quote_volume(10000), 6.0, places=9)
+
+    def test_quote_for_base_amount(self):
+        self.assertAlmostEqual(self.arrays.quote_for_base_amount(1.5), 150.5, places=9)
+        self.assertAlmostEqual(self.arrays.quote_for_base_amount(100), 608.0, places=9)
+
+    def test_matches_decimal_walker(self):
+        rng = random.Random(7)
+        price = Decimal('100')
+        entries = []
+        for _ in range(200):
+            price += Decimal(str(round(rng.uniform(0.01, 0.5), 2)))
+            entries.append((price, Decimal(str(round(rng.uniform(0.001, 5), 3)))))
+        arrays = BookSideArrays.from_entries(entries)
+        for quote_volume in (Decimal('1'), Decimal('523.17'), Decimal('20000'), Decimal('10000000')):
+            expected = get_base_amount_for_quote_volume(entries, quote_volume)
+            self.assertAlmostEqual(Decimal(str(arrays.base_for_quote_volume(float(quote_volume)))), expected, places=8)
+
+class TestVectorizedOrderBookAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.orderbook = Mock(spec=OrderBook)
+        self.orderbook.snapshot_uid = 1
+        self.orderbook.last_diff_uid = 1
+        self.orderbook.ask_entries.return_value = [
+            OrderBookRow(Decimal('100'), Decimal('1'), 0),
+            OrderBookRow(Decimal('101'), Decimal('2'), 1),
+        ]
+        self.orderbook.bid_entries.return_value = [
+            OrderBookRow(Decimal('99'), Decimal('1'), 0),
+            OrderBookRow(Decimal('98'), Decimal('2'), 1),
+        ]
+        self.mock_connector = Mock()
+        self.mock_connector.get_order_book.return_value = self.orderbook
+        self.mock_connector.quantize_order_amount.side_effect = lambda pair, amount: amount
+        self.analyzer = VectorizedOrderBookAnalyzer(self.mock_connector)
+
+    def test_get_order_amount_from_exchanged_amount(self):
+        result = self.analyzer.get_order_amount_from_exchanged_amount('BTC-USDT', TradeType.BUY, Decimal('150'))
+        self.assertAlmostEqual(result, Decimal('1.495'), places=3)
+        result = self.analyzer.get_order_amount_from_exchanged_amount('BTC-USDT', TradeType.SELL, Decimal('150'))
+        self.assertEqual(result, Decimal('150'))
+
+    def test_get_quote_volume_for_base_amount(self):
+        result = self.analyzer.get_quote_volume_for_base_amount('BTC-USDT', TradeType.SELL, Decimal('2'))
+        self.assertAlmostEqual(result, Decimal('197'), places=6)
+
+    def test_arrays_reused_until_book_version_changes(self):
+        self.analyzer.get_quote_volume_for_base_amount('BTC-USDT', TradeType.BUY, Decimal('1'))
+        self.analyzer.get_quote_volume_for_base_amount('BTC-USDT', TradeType.BUY, Decimal('2'))
+        self.assertEqual(self.orderbook.ask_entries.call_count, 1)
+
+        self.orderbook.last_diff_uid = 2
+        self.analyzer.get_quote_volume_for_base_amount('BTC-USDT', TradeType.BUY, Decimal('2'))
+        self.assertEqual(self.orderbook.ask_entries.call_count, 2)
+
+    def test_arrays_are_cached_per_pair_and_book(self):
+        other = Mock(spec=OrderBook)
+        other.snapshot_uid = 1
+        other.last_diff_uid = 1
+        other.ask_entries.return_value = [OrderBookRow(Decimal('200'), Decimal('1'), 0)]
+        books = {'BTC-USDT': self.orderbook, 'ETH-USDT': other}
+        self.mock_connector.get_order_book.side_effect = books.__getitem__
+        self.assertEqual(self.analyzer.get_side_arrays('BTC-USDT', True).prices.tolist(), [100, 101])
+        self.assertEqual(self.analyzer.get_side_arrays('ETH-USDT', True).prices.tolist(), [200])
+
+        # A book rebuilt with the same version, e.g. after a reconnect, is converted again.
+        rebuilt = books['BTC-USDT'] = Mock(spec=OrderBook, snapshot_uid=1, last_diff_uid=1)
+        rebuilt.ask_entries.return_value = [OrderBookRow(Decimal('102'), Decimal('1'), 0)]
+        self.assertEqual(self.analyzer.get_side_arrays('BTC-USDT', True).prices.tolist(), [102])
+        self.assertEqual(self.analyzer.conversions, 3)
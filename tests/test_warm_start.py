@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+from hummingbot.core.data_type.common import TradeType
+from src.backtest import BacktestStrategy
+from src.warm_start import WarmStartCache
+from tests import make_triangle_strategy
+
+class TestWarmStart(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache", "warm_start.json")
+        self.config_fields = {"warm_start_cache_path": self.path}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def create_strategy(self) -> BacktestStrategy:
+        return make_triangle_strategy(order_latency=1, start=False, **self.config_fields)
+
+    def run_strategy(self, strategy: BacktestStrategy, ticks: int):
+        for timestamp in range(ticks):
+            strategy.set_timestamp(timestamp)
+            strategy.on_tick()
+
+    def save_cache(self):
+        strategy = self.create_strategy()
+        self.run_strategy(strategy, 2)
+        strategy.stop()
+
+    def test_cold_start_saves_once_rules_are_confirmed(self):
+        strategy = self.create_strategy()
+        self.run_strategy(strategy, 1)
+        self.assertEqual(strategy.warm_start_cache.stale, {"ADA-USDT", "ADA-BTC", "BTC-USDT"})
+        self.assertFalse(os.path.exists(self.path))
+        self.run_strategy(strategy, 2)
+        strategy.stop()
+
+        with open(self.path) as f:
+            document = json.load(f)
+        self.assertEqual(document["cycles"][0]["direct_pairs"], ["ADA-USDT", "ADA-BTC", "BTC-USDT"])
+        self.assertEqual(document["cycles"][0]["direct_sides"], ["BUY", "SELL", "SELL"])
+        self.assertNotIn("rules", document)
+        self.assertIn(["BTC-USDT", "SELL", False, "0.001"], document["fees"])
+
+    def test_warm_start_uses_cached_fees_until_checked(self):
+        self.save_cache()
+        with open(self.path) as f:
+            document = json.load(f)
+        document["fees"] = [[pair, side, is_maker, "0.002"] for pair, side, is_maker, _ in document["fees"]]
+        with open(self.path, "w") as f:
+            json.dump(document, f)
+
+        strategy = self.create_strategy()
+        self.run_strategy(strategy, 1)
+        self.assertTrue(strategy.warm_start_cache.loaded)
+        self.assertEqual(strategy.order_side["reverse"], (TradeType.BUY, TradeType.BUY, TradeType.SELL))
+        self.assertEqual(strategy.fee_schedule.get_fee("ADA-BTC", TradeType.SELL), Decimal("0.002"))
+
+        self.run_strategy(strategy, 2)
+        self.assertEqual(strategy.fee_schedule.get_fee("ADA-BTC", TradeType.SELL), Decimal("0.001"))
+        self.assertEqual(strategy.warm_start_cache.changed_pairs, 3)
+        self.assertIn("Warm start cache: loaded, 1 cycles, 3 pairs confirmed, 0 stale", strategy.format_status())
+        strategy.stop()
+
+    def test_routes_through_stale_pairs_are_not_traded(self):
+        self.save_cache()
+        # Even a route that may lose money is not started before its rules are confirmed.
+        self.config_fields["min_profitability"] = Decimal("-1")
+        strategy = self.create_strategy()
+        rule = strategy.connector.trading_rules.pop("BTC-USDT")
+        self.run_strategy(strategy, 3)
+        self.assertEqual(strategy.warm_start_cache.stale, {"BTC-USDT"})
+        self.assertEqual(strategy.cycles_started, 0)
+        self.assertEqual(strategy.get_profit(strategy.routes["direct"])[0], Decimal("-100"))
+
+        strategy.connector.trading_rules["BTC-USDT"] = rule
+        self.run_strategy(strategy, 1)
+        self.assertEqual(strategy.warm_start_cache.stale, set())
+        self.assertEqual(strategy.cycles_started, 1)
+        strategy.stop()
+
+    def test_cache_of_other_settings_is_ignored(self):
+        self.save_cache()
+        cache = WarmStartCache(self.path, {"connector_name": "binance"})
+        self.assertFalse(cache.load())
+        with open(self.path, "w") as f:
+            f.write("not json")
+        self.assertFalse(WarmStartCache(self.path, {}).load())